@@ -2,6 +2,22 @@ import random
 import os
 import time
 import shutil
+import signal
+import asyncio
+import copyreg
+import importlib
+import math
+import pickle
+import re
+import struct
+import sys
+import threading
+import types
+import zlib
+from array import array
+from collections.abc import MutableMapping
+from functools import partial
+from io import BytesIO
 from math import floor
 # Define your logo data ONCE, at the module level:
 logo_data = [
@@ -10,7 +26,585 @@ logo_data = [
     "╚═══════════════════════════╝"
 ]
 
-def display_logo(logo, centered=True):
+class PacingClock:
+    """Central pacing for the pauses that let the player read a message.
+
+    Modes:
+      realtime    - pause for the requested time
+      accelerated - pause for the requested time multiplied by scale
+      coalesced   - merge consecutive pauses into a single pause per screen
+      zero        - never pause
+    """
+    MODES = ("realtime", "accelerated", "coalesced", "zero")
+
+    def __init__(self, mode="realtime", scale=1.0, sleeper=time.sleep):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        self.mode = mode
+        self.scale = scale
+        self.sleeper = sleeper
+        self.pending = 0.0  # Coalesced pause waiting for the end of the screen
+        self.total_paused = 0.0
+
+    def delay_for(self, seconds):
+        """Translate a requested pause into the actual delay for this mode"""
+        if self.mode == "zero" or seconds <= 0:
+            return 0.0
+        if self.mode == "accelerated":
+            return seconds * self.scale
+        return seconds
+
+    def __call__(self, seconds):
+        self.pause(seconds)
+
+    def pause(self, seconds):
+        """Pause (or schedule a coalesced pause) for the given number of seconds"""
+        delay = self.delay_for(seconds)
+        if self.mode == "coalesced":
+            self.pending = max(self.pending, delay)
+            return
+        if delay > 0:
+            self.total_paused += delay
+            self.sleeper(delay)
+
+    async def apause(self, seconds):
+        """Awaitable pause that frees the event loop instead of blocking a thread"""
+        delay = self.delay_for(seconds)
+        if self.mode == "coalesced":
+            self.pending = max(self.pending, delay)
+            return
+        if delay > 0:
+            self.total_paused += delay
+            await asyncio.sleep(delay)
+
+    def take_pending(self):
+        """Return and reset the coalesced pause for the current screen"""
+        delay, self.pending = self.pending, 0.0
+        self.total_paused += delay
+        return delay
+
+    def flush(self):
+        """End of screen: serve the single coalesced pause"""
+        delay = self.take_pending()
+        if delay > 0:
+            self.sleeper(delay)
+
+    async def aflush(self):
+        """Awaitable end of screen"""
+        delay = self.take_pending()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def discard(self):
+        """Drop the coalesced pause (the player is at a prompt and reads at their own pace)"""
+        self.pending = 0.0
+
+class RandomStreams:
+    """Independent, reproducible random streams derived from one root seed.
+
+    Each subsystem draws from its own named stream, so adding a random call
+    in one subsystem never perturbs the sequence seen by another.
+    """
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.streams = {}
+
+    def stream(self, name):
+        """Get (creating on first use) the stream for a subsystem"""
+        if name not in self.streams:
+            self.streams[name] = random.Random(f"{self.seed}/{name}")
+        return self.streams[name]
+
+    def get_state(self):
+        """Capture the state of every stream for snapshots"""
+        return {
+            "seed": self.seed,
+            "streams": {name: rng.getstate() for name, rng in self.streams.items()}
+        }
+
+    def checkpoint(self):
+        """CRC32 over every stream's state, to verify that a replay stayed in step"""
+        checksum = zlib.crc32(str(self.seed).encode())
+        for name in sorted(self.streams):
+            version, internal, gauss = self.streams[name].getstate()
+            checksum = zlib.crc32(array('L', internal).tobytes(), zlib.crc32(name.encode(), checksum))
+        return checksum
+
+    def reseed(self, seed):
+        """Reseed every stream in place from a new root seed, e.g. to sample a fork's future"""
+        self.seed = seed
+        for name, rng in self.streams.items():
+            rng.seed(f"{seed}/{name}")
+
+    def set_state(self, state):
+        """Restore stream states in place, keeping subsystem references valid"""
+        self.seed = state["seed"]
+        for name, rng_state in state["streams"].items():
+            self.stream(name).setstate(rng_state)
+
+# Event bus topics: what changed, not how; publishers carry no payload
+EVENT_MONEY = 0
+EVENT_CARGO = 1
+EVENT_RESEARCH = 2
+EVENT_SHIP = 3  # attack, defense, speed
+EVENT_COMBAT = 4
+EVENT_TRADE = 5
+EVENT_PASSENGERS = 6
+EVENT_BUILDINGS = 7  # buildings and mining platforms
+EVENT_DISCOVERY = 8  # locations found, known or unlocked
+EVENT_QUEST = 9
+EVENT_CONTRACT = 10
+EVENT_STORY = 11
+EVENT_TURN = 12
+EVENT_TOPICS = ("money", "cargo", "research", "ship", "combat", "trade", "passengers",
+                "buildings", "discovery", "quest", "contract", "story", "turn")
+
+class EventBus:
+    """Change notifications between game state and the subsystems derived from it.
+
+    publish() bumps a per-topic version and calls any subscribers; pollers
+    ask changed() whether any of their topics moved since they last ran, so
+    checks over unchanged state can be skipped.
+    """
+    def __init__(self):
+        self.versions = array('Q', bytes(8 * len(EVENT_TOPICS)))
+        self.subscribers = [[] for _ in EVENT_TOPICS]
+        self.seen = {}
+        self.gating = True  # False polls every check every time (for comparisons)
+
+    def publish(self, topic):
+        self.versions[topic] += 1
+        for handler in self.subscribers[topic]:
+            handler(topic)
+
+    def subscribe(self, topic, handler):
+        """Call handler(topic) on every change to topic"""
+        self.subscribers[topic].append(handler)
+
+    def stamp(self, topics):
+        """Sum of versions; grows whenever any of the topics is published"""
+        versions = self.versions
+        total = 0
+        for topic in topics:
+            total += versions[topic]
+        return total
+
+    def changed(self, key, topics):
+        """True if any topic was published since the last changed() for this key"""
+        stamp = self.stamp(topics)
+        if self.gating and self.seen.get(key) == stamp:
+            return False
+        self.seen[key] = stamp
+        return True
+
+class PublishedAttribute:
+    """Instance attribute that publishes a topic on the owner's bus when its value changes"""
+    def __init__(self, topic):
+        self.topic = topic
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj, value):
+        state = obj.__dict__
+        if self.name in state and state[self.name] == value:
+            return
+        state[self.name] = value
+        events = obj.event_bus()
+        if events is not None:
+            events.publish(self.topic)
+
+class InputExhausted(EOFError):
+    """Raised when a headless input provider has no more commands"""
+    pass
+
+class GameOverError(RuntimeError):
+    """Raised by Game.step() once the game has ended"""
+
+class InvalidActionError(ValueError):
+    """Raised by Game.step() for an action it does not know"""
+
+class TerminalLayout:
+    """Terminal geometry and memoized layout for the box renderers.
+
+    The terminal size is read once and again only after a resize (SIGWINCH
+    once watch() is called). Column widths are solved once per (shape,
+    width), wrapped text is kept per (text, width), and border strings
+    are reused.
+    """
+    CACHE_LIMIT = 4096  # Entries per cache before it is cleared
+
+    def __init__(self, size=shutil.get_terminal_size):
+        self.size = size  # callable returning (columns, lines)
+        self.columns = 80
+        self.lines = 24
+        self.stale = True
+        self.column_cache = {}
+        self.wrap_cache = {}
+        self.border_cache = {}
+
+    def watch(self):
+        """Re-read the terminal size whenever the window is resized"""
+        if not hasattr(signal, 'SIGWINCH'):
+            self.stale = True
+            return
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def resized(signum, frame):
+            self.stale = True
+            if callable(previous):
+                previous(signum, frame)
+        try:
+            signal.signal(signal.SIGWINCH, resized)
+        except ValueError:
+            pass  # Not the main thread; keep the size read at startup
+
+    def refresh(self):
+        self.columns, self.lines = self.size()
+        self.stale = False
+
+    def width(self):
+        if self.stale:
+            self.refresh()
+        return self.columns
+
+    def height(self):
+        if self.stale:
+            self.refresh()
+        return self.lines
+
+    def remember(self, cache, key, value):
+        if len(cache) >= self.CACHE_LIMIT:
+            cache.clear()
+        cache[key] = value
+        return value
+
+    def border(self, left, fill, right, width):
+        key = (left, fill, right, width)
+        line = self.border_cache.get(key)
+        if line is None:
+            line = self.remember(self.border_cache, key, f"{left}{fill * width}{right}")
+        return line
+
+    def wrap(self, text, width):
+        """Lines of text wrapped at word boundaries to fit width"""
+        key = (text, width)
+        lines = self.wrap_cache.get(key)
+        if lines is None:
+            lines = []
+            current_line = []
+            current_length = 0
+            for word in text.split():
+                if current_length + len(word) + len(current_line) > width:
+                    lines.append(' '.join(current_line))
+                    current_line = [word]
+                    current_length = len(word)
+                else:
+                    current_line.append(word)
+                    current_length += len(word)
+            if current_line:
+                lines.append(' '.join(current_line))
+            lines = self.remember(self.wrap_cache, key, tuple(lines))
+        return list(lines)
+
+    def box_columns(self, max_lengths, term_width):
+        """Column widths for create_box: proportional, last column takes the rest"""
+        key = ('box', max_lengths, term_width)
+        col_widths = self.column_cache.get(key)
+        if col_widths is None:
+            num_cols = len(max_lengths)
+            separator_space = 3  # Space for " │ " between columns
+            available_content_width = term_width - separator_space * (num_cols - 1)
+            col_widths = self.proportional_columns(max_lengths, available_content_width)
+            col_widths = self.remember(self.column_cache, key, col_widths)
+        return col_widths
+
+    def wide_columns(self, max_lengths, usable_width):
+        """Column widths for create_wide_box"""
+        key = ('wide', max_lengths, usable_width)
+        col_widths = self.column_cache.get(key)
+        if col_widths is None:
+            num_cols = len(max_lengths)
+            separator_space = 3  # Space for " │ " between columns
+            padding_width = 2  # Space for padding around content " x "
+            available_content_width = usable_width - separator_space * (num_cols - 1) - padding_width
+            col_widths = self.proportional_columns(max_lengths, available_content_width)
+            col_widths = self.remember(self.column_cache, key, col_widths)
+        return col_widths
+
+    @staticmethod
+    def proportional_columns(max_lengths, available_content_width):
+        num_cols = len(max_lengths)
+        total_content_length = sum(max_lengths)
+        col_widths = []
+        remaining_width = available_content_width
+        for i in range(num_cols):
+            if i == num_cols - 1:
+                # Last column gets remaining width
+                width = remaining_width
+            else:
+                # Calculate proportional width based on content length
+                proportion = max_lengths[i] / total_content_length
+                width = max(3, min(
+                    int(available_content_width * proportion),
+                    max_lengths[i] + 2
+                ))
+                remaining_width -= width
+            col_widths.append(width)
+        # Ensure minimum widths
+        return tuple(max(3, min(col_widths[i], max_lengths[i] + 10)) for i in range(num_cols))
+
+    def compact_columns(self, max_lengths, max_width):
+        """Column widths for create_compact_box: natural widths, shrunk to fit max_width"""
+        key = ('compact', max_lengths, max_width)
+        col_widths = self.column_cache.get(key)
+        if col_widths is None:
+            col_widths = list(max_lengths)
+            num_cols = len(col_widths)
+            total_separators_width = 3 * (num_cols - 1)
+            content_width = sum(col_widths)
+            total_width = content_width + total_separators_width + 2  # +2 for single space padding on each side
+            # If total width exceeds max_width, reduce column widths proportionally
+            if total_width > max_width:
+                excess = total_width - max_width
+                for i in range(num_cols):
+                    reduction = int(excess * (col_widths[i] / content_width))
+                    col_widths[i] = max(3, col_widths[i] - reduction)  # Ensure minimum width of 3
+                    content_width = sum(col_widths)  # Recalculate content width after reduction
+            col_widths = self.remember(self.column_cache, key, tuple(col_widths))
+        return col_widths
+
+    def turn_info_columns(self, natural_widths, total_width):
+        """Column widths for create_turn_info_box: natural widths plus an even share of spare room"""
+        key = ('turn_info', natural_widths, total_width)
+        col_widths = self.column_cache.get(key)
+        if col_widths is None:
+            cols = len(natural_widths)
+            total_content_width = sum(natural_widths)
+            remaining_width = total_width - (cols + 1)  # Account for vertical borders
+            col_widths = natural_widths
+            if remaining_width > total_content_width:
+                extra_per_col = (remaining_width - total_content_width) // cols
+                col_widths = tuple(w + extra_per_col for w in natural_widths)
+            col_widths = self.remember(self.column_cache, key, col_widths)
+        return col_widths
+
+class FrameRenderer:
+    """Output sink that redraws the terminal in place, one frame per screen.
+
+    Lines written between two clears form a frame. Each line is compared with
+    the line on the same row of the previous frame and only changed rows are
+    rewritten, using cursor addressing; output is buffered and sent in a single
+    write whenever the player is about to look at it. Frames that do not fit
+    the terminal fall back to plain scrolling output and the next frame is
+    drawn on a cleared screen. When the stream is not a terminal (a pipe or a
+    file) lines are written as they are and clearing is a no-op.
+    """
+    ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+    def __init__(self, stream=None, layout=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.layout = layout if layout is not None else TerminalLayout()
+        isatty = getattr(self.stream, 'isatty', None)
+        self.tty = bool(isatty and isatty())
+        self.pending = []
+        self.previous = []  # Rows of the frame currently on screen
+        self.current = []  # Rows drawn so far in this frame
+        self.synced = False  # False until the first clear, and after a frame overflows
+        self.size = None  # Terminal size the previous frame was drawn at
+        self.written = 0  # Characters sent to the stream
+
+    def visible_length(self, line):
+        return len(self.ANSI_ESCAPE.sub('', line))
+
+    def __call__(self, text=""):
+        for line in str(text).split('\n'):
+            self.draw(line)
+
+    def draw(self, line):
+        if not self.synced:
+            self.pending.append(line + '\n')
+            return
+        row = len(self.current)
+        if row >= self.layout.height() - 1 or self.visible_length(line) > self.layout.width():
+            # Does not fit: scroll the rest of this frame and redraw the next one from scratch
+            self.pending.append(f"\033[{row + 1};1H\033[J{line}\n")
+            self.synced = False
+            self.previous = []
+            return
+        if row >= len(self.previous) or self.previous[row] != line:
+            self.pending.append(f"\033[{row + 1};1H{line}\033[K")
+        self.current.append(line)
+
+    def flush(self):
+        """Send everything buffered, leaving the cursor below the frame"""
+        if self.pending:
+            if self.synced:
+                self.pending.append(f"\033[{len(self.current) + 1};1H")
+            text = ''.join(self.pending)
+            self.pending = []
+            self.written += len(text)
+            self.stream.write(text)
+            self.stream.flush()
+
+    def settle(self):
+        """End of what the player will see: erase rows left over from the previous frame"""
+        if self.synced and len(self.previous) > len(self.current):
+            self.pending.append(f"\033[{len(self.current) + 1};1H\033[J")
+            del self.previous[len(self.current):]
+        self.flush()
+
+    def prompted(self, prompt, line):
+        """Account for the row the terminal used to echo a prompt and its answer"""
+        if not self.synced:
+            return
+        if self.visible_length(f"{prompt}{line}") >= self.layout.width():
+            self.synced = False
+            self.previous = []
+            return
+        self.current.append(None)  # Never matches, so the row is always redrawn
+
+    def clear(self):
+        """Start a new frame"""
+        if not self.tty:
+            return
+        size = (self.layout.width(), self.layout.height())
+        if self.synced and size == self.size:
+            self.previous = self.current
+        else:
+            self.pending.append("\033[2J\033[H")
+            self.previous = []
+        self.current = []
+        self.size = size
+        self.synced = True
+
+class IOBackend:
+    """Pluggable engine I/O: an input provider, an output sink and a clock.
+
+    input_provider: callable taking a prompt and returning a line, or an
+                    iterable of scripted lines (headless bots, replays)
+    output_sink:    callable taking rendered text, or None to skip rendering
+    clock:          callable taking seconds to pause, or None to never pause
+    """
+    replays = False  # True when an action may be re-run from its start and must print the same output
+
+    def __init__(self, input_provider=None, output_sink=None, clock=None):
+        if input_provider is not None and not callable(input_provider):
+            input_provider = iter(input_provider).__next__
+            self._scripted = True
+        else:
+            self._scripted = False
+        self.input_provider = input_provider
+        self.output_sink = output_sink
+        self.clock = clock
+        self.recorder = None  # Optional callable given every line read (turn journal)
+        self.layout = TerminalLayout()
+
+    @property
+    def rendering(self):
+        """True when there is somewhere to send rendered output"""
+        return self.output_sink is not None
+
+    def read(self, prompt=""):
+        """Read one line of player input"""
+        if hasattr(self.clock, 'discard'):
+            self.clock.discard()
+        if self.input_provider is None:
+            raise InputExhausted("No input provider attached")
+        if self._scripted:
+            try:
+                line = self.input_provider()
+            except StopIteration:
+                raise InputExhausted("Scripted input exhausted")
+            if self.output_sink is not None and prompt:
+                self.output_sink(f"{prompt}{line}")
+        else:
+            line = self.input_provider(prompt)
+        if self.recorder is not None:
+            self.recorder(line)
+        return line
+
+    def write(self, text=""):
+        """Send rendered text to the output sink, if any"""
+        if self.output_sink is not None:
+            self.output_sink(text)
+
+    def sleep(self, seconds):
+        """Pause for the player to read, if a clock is attached"""
+        if self.clock is not None and seconds > 0:
+            self.clock(seconds)
+
+    def wait(self, prompt="Press Enter to continue..."):
+        """Wait for the player to acknowledge a screen (scripted input never waits)"""
+        if self.rendering and not self._scripted:
+            self.read(prompt)
+
+    def clear(self):
+        """Clear the screen"""
+        if hasattr(self.clock, 'flush'):
+            self.clock.flush()
+        if self.output_sink is not None:
+            self.output_sink("\033[2J\033[H")
+
+class TerminalIO(IOBackend):
+    """Interactive I/O on the local terminal, redrawn through a FrameRenderer"""
+    def __init__(self, clock=None, stream=None):
+        super().__init__(input_provider=input,
+                         clock=clock if clock is not None else PacingClock())
+        self.layout.watch()
+        self.screen = FrameRenderer(stream, self.layout)
+        self.output_sink = self.screen
+
+    def read(self, prompt=""):
+        self.screen.settle()
+        line = super().read(prompt)
+        self.screen.prompted(prompt, line)
+        return line
+
+    def sleep(self, seconds):
+        self.screen.flush()
+        super().sleep(seconds)
+
+    def clear(self):
+        self.screen.settle()
+        if hasattr(self.clock, 'flush'):
+            self.clock.flush()
+        self.screen.clear()
+
+class CommandFeed:
+    """Input provider fed one player command at a time by a policy or agent"""
+    def __init__(self, max_idle_reads=100):
+        self.lines = []
+        self.idle_reads = 0
+        self.max_idle_reads = max_idle_reads
+
+    def __call__(self, prompt=""):
+        if self.lines:
+            self.idle_reads = 0
+            return self.lines.pop(0)
+        # An empty answer cancels any prompt the policy didn't plan for
+        self.idle_reads += 1
+        if self.idle_reads > self.max_idle_reads:
+            raise InputExhausted("Policy stopped answering prompts")
+        return ""
+
+    def extend(self, lines):
+        self.lines.extend(lines)
+
+    def clear(self):
+        self.lines = []
+
+def display_logo(logo, centered=True, out=print):
     """Displays the logo, optionally centered."""
     try:
         terminal_width = os.get_terminal_size().columns
@@ -20,16 +614,16 @@ def display_logo(logo, centered=True):
     for line in logo:
         if centered:
             padding = (terminal_width - len(line)) // 2
-            print(" " * padding + line)
+            out(" " * padding + line)
         else:
-            print(line)  # Just print without centering
+            out(line)  # Just print without centering
 
-def print_centered_text(text):
+def print_centered_text(text, out=print):
     try:
         terminal_width = os.get_terminal_size().columns
     except OSError:
         terminal_width = 80  # Default if not in a terminal
-    print(text.center(terminal_width))
+    out(text.center(terminal_width))
 
 # Define the Planet class
 class Planet:
@@ -271,7 +865,9 @@ class Research:
         self.unlocked_options.add(option)        
 
 class Action:
-    def __init__(self):
+    SHARED_CONTENT = ('action_costs', 'base_success_rates')
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
         # Base costs for actions
         self.action_costs = {
             'research': 100,
@@ -314,14 +910,14 @@ class Action:
         if 'telemetry' in research_system.unlocked_options:
             success_chance += research_system.research_benefits['telemetry']['scout_success']
             
-        if random.random() < success_chance:
-            discovery_type = random.choice(['tech', 'agri', 'item'])
+        if self.rng.random() < success_chance:
+            discovery_type = self.rng.choice(['tech', 'agri', 'item'])
             
             if discovery_type == 'item':
-                item = random.choice(['scanner', 'probe', 'turrets', 'shield'])
+                item = self.rng.choice(['scanner', 'probe', 'turrets', 'shield'])
                 return True, 'item', item, f"Found a {item}!"
             else:
-                amount = random.randint(10, 30)
+                amount = self.rng.randint(10, 30)
                 return True, discovery_type, amount, f"Found {amount} units of {discovery_type}!"
         
         return False, None, None, "Scouting attempt failed!"
@@ -336,15 +932,15 @@ class Action:
         if 'geophysics' in research_system.unlocked_options:
             success_chance += research_system.research_benefits['geophysics']['exogeology']
             
-        if random.random() < success_chance:
-            deposit_type = random.choice(['salt', 'fuel'])
-            amount = random.randint(1000, 5000)
+        if self.rng.random() < success_chance:
+            deposit_type = self.rng.choice(['salt', 'fuel'])
+            amount = self.rng.randint(1000, 5000)
             
             if deposit_type not in planet.mineral_deposits:
                 planet.mineral_deposits[deposit_type] = amount
                 return True, deposit_type, amount, f"Found {amount} units of {deposit_type} deposits!"
             else:
-                bonus = random.randint(500, 1000)
+                bonus = self.rng.randint(500, 1000)
                 planet.mineral_deposits[deposit_type] += bonus
                 return True, deposit_type, bonus, f"Found additional {bonus} units of {deposit_type} deposits!"
                 
@@ -360,28 +956,29 @@ class Action:
         if 'chronopolitics' in research_system.unlocked_options:
             success_chance += research_system.research_benefits['chronopolitics']['revolution_success']
             
-        if random.random() < success_chance:
+        if self.rng.random() < success_chance:
             current_economy = planet.economy
             possible_economies = ['Booming', 'Stable', 'Declining', 'Formative']
             possible_economies.remove(current_economy)
-            new_economy = random.choice(possible_economies)
+            new_economy = self.rng.choice(possible_economies)
             planet.economy = new_economy
             return True, new_economy, f"Revolution successful! Economy changed to {new_economy}!"
             
         return False, None, "Revolution attempt failed!"
 
-    def manipulate_market(self, planet, commodity, research_system):
+    def manipulate_market(self, planet, commodity, research_system, rng=None):
         """
-        Attempt to manipulate market prices
+        Attempt to manipulate market prices, drawing from rng (default: the action stream)
         Returns: (bool success, float price_change, str message)
         """
-        if random.random() < self.base_success_rates['psychodynamics']:
+        rng = self.rng if rng is None else rng
+        if rng.random() < self.base_success_rates['psychodynamics']:
             manipulation_power = research_system.research_benefits['psychodynamics']['price_control']
             current_price = planet.market[commodity]
             
             # Determine direction of manipulation (increase/decrease)
-            direction = random.choice([-1, 1])
-            change = direction * random.uniform(0.1, manipulation_power) * current_price
+            direction = rng.choice([-1, 1])
+            change = direction * rng.uniform(0.1, manipulation_power) * current_price
             
             # Apply change with bounds checking
             new_price = max(1, current_price + change)
@@ -398,17 +995,40 @@ class Action:
             
         return False, 0, "Market manipulation attempt failed!"
         
+class CargoHold(dict):
+    """Cargo amounts by commodity; every change publishes EVENT_CARGO"""
+    def __init__(self, amounts, ship):
+        super().__init__(amounts)
+        self.ship = ship
+
+    def __reduce__(self):
+        # Rebuild through __init__, which sets the owner along with the amounts
+        return CargoHold, (dict(self), self.ship)
+
+    def __setitem__(self, item, amount):
+        super().__setitem__(item, amount)
+        events = self.ship.event_bus()
+        if events is not None:
+            events.publish(EVENT_CARGO)
+
 # Define the Ship class
 class Ship:
+    money = PublishedAttribute(EVENT_MONEY)
+    research_points = PublishedAttribute(EVENT_RESEARCH)
+    attack = PublishedAttribute(EVENT_SHIP)
+    defense = PublishedAttribute(EVENT_SHIP)
+    speed = PublishedAttribute(EVENT_SHIP)
+    passenger_reputation = PublishedAttribute(EVENT_PASSENGERS)
+
     def __init__(self, game=None):
         self.game = game
         # Basic cargo and resources
-        self.cargo = {
+        self.cargo = CargoHold({
             'tech': 0,
             'agri': 0,
             'salt': 0,
             'fuel': 0
-        }
+        }, self)
         self.money = 1000
         self.damage = 0
         self.research_points = 0
@@ -469,12 +1089,21 @@ class Ship:
         self.passenger_modules = []
         self.passenger_reputation = 0
 
+    def event_bus(self):
+        return getattr(self.game, 'events', None)
+
+    def publish(self, topic):
+        events = self.event_bus()
+        if events is not None:
+            events.publish(topic)
+
     def record_combat_victory(self, enemy_type=None):
         """Record a combat victory with proper type tracking"""
         self.combat_victories['total'] += 1
         if enemy_type:
             if enemy_type in self.combat_victories:
                 self.combat_victories[enemy_type] += 1
+        self.publish(EVENT_COMBAT)
 
     def record_combat_defeat(self, enemy_type=None):
         """Record a combat defeat with proper type tracking"""
@@ -501,6 +1130,9 @@ class Ship:
             if self.money >= total_cost:
                 self.money -= total_cost
                 self.cargo[item] += quantity
+
+                if hasattr(self, 'game') and hasattr(self.game, 'record_trade'):
+                    self.game.record_trade(planet, cost, item, quantity)
                 
                 # Add contract progress tracking for buy events
                 if hasattr(self, 'game') and hasattr(self.game, 'contract_manager'):
@@ -508,7 +1140,7 @@ class Ship:
                         "action": "buy",
                         "commodity": item,
                         "amount": quantity,
-                        "location": planet.name,
+                        "location": planet.handle,
                         "turn": self.game.turn
                     }
                     self.game.contract_manager.update_contract_progress(event_data)
@@ -539,6 +1171,10 @@ class Ship:
             if item not in self.trade_profits:
                 self.trade_profits[item] = 0
             self.trade_profits[item] += net_revenue
+            self.publish(EVENT_TRADE)
+
+            if hasattr(self, 'game') and hasattr(self.game, 'record_trade'):
+                self.game.record_trade(planet, revenue, item, quantity)
             
             # Add contract progress tracking for sell events
             if hasattr(self, 'game') and hasattr(self.game, 'contract_manager'):
@@ -546,7 +1182,7 @@ class Ship:
                     "action": "sell",
                     "commodity": item,
                     "amount": quantity,
-                    "location": planet.name,
+                    "location": planet.handle,
                     "turn": self.game.turn
                 }
                 self.game.contract_manager.update_contract_progress(event_data)
@@ -578,6 +1214,7 @@ class Ship:
             self.items[item_name] += 1
         else:
             self.items[item_name] = 1
+        self.publish(EVENT_SHIP)
 
     def is_empty_cargo(self):
         return all(amount == 0 for amount in self.cargo.values())
@@ -658,21 +1295,341 @@ class LocationCommands:
             "special": LocationCommands.get_special_commands(location.location_type)
         }
 
+# Static content tables: built once per process on first use, frozen, and shared by every game
+CONTENT_BUILDERS = {}  # table name -> function returning the plain table
+CONTENT_TABLES = {}
+CONTENT_PATHS = {}  # id of each frozen node -> (table name, keys...), so snapshots can refer to it
+CONTENT_LOCK = threading.Lock()  # Server sessions play in threads; each table must be built exactly once
+
+def freeze_content(value, path):
+    """Read-only copy of a table: dicts become mapping proxies, lists tuples, sets frozensets"""
+    if isinstance(value, dict):
+        frozen = types.MappingProxyType({key: freeze_content(item, path + (key,)) for key, item in value.items()})
+    elif isinstance(value, list):
+        frozen = tuple(freeze_content(item, path + (index,)) for index, item in enumerate(value))
+    elif isinstance(value, set):
+        return frozenset(value)
+    else:
+        return value
+    if frozen != ():  # The empty tuple is a shared singleton
+        CONTENT_PATHS[id(frozen)] = path
+    return frozen
+
+def thaw_content(value):
+    """Mutable deep copy of a frozen table, for an owner that needs to change it"""
+    if isinstance(value, types.MappingProxyType):
+        return {key: thaw_content(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_content(item) for item in value]
+    if isinstance(value, frozenset):
+        return set(value)
+    return value
+
+def content_table(name):
+    """The shared frozen table registered under `name`"""
+    table = CONTENT_TABLES.get(name)
+    if table is None:
+        with CONTENT_LOCK:
+            table = CONTENT_TABLES.get(name)
+            if table is None:
+                table = CONTENT_TABLES[name] = freeze_content(CONTENT_BUILDERS[name](), (name,))
+    return table
+
+def content_node(path):
+    """Resolve a (table name, keys...) path recorded in CONTENT_PATHS"""
+    node = content_table(path[0])
+    for key in path[1:]:
+        node = node[key]
+    return node
+
+# Game snapshots: a fixed header, then a pickle of the game state (optionally zlib-compressed)
+SNAPSHOT_MAGIC = b"CARGOSAV"
+SNAPSHOT_VERSION = 8  # 2: locations referenced by integer handle, 3: slotted game objects, 4: content tables by name,
+                      # 5: only allowlisted globals, 6: market anchor prices,
+                      # 7: lazy markets catch up on read, 8: no anchors, logged lazy ticks
+SNAPSHOT_HEADER = struct.Struct("<8sHHI")  # magic, format version, flags, CRC32 of the payload
+SNAPSHOT_COMPRESSED = 0x1
+
+class SnapshotError(ValueError):
+    """Raised for truncated, corrupt or unsupported snapshots"""
+
+# Loading a pickle calls whatever globals the stream names, so snapshots may only
+# name these: stdlib types by explicit allowlist, and from this module its classes
+# (minus those that open files, sockets, processes or the terminal when built)
+SNAPSHOT_STDLIB = {
+    ("array", "array"), ("array", "_array_reconstructor"), ("random", "Random"),
+    ("functools", "partial"), ("collections", "deque"), ("collections", "OrderedDict"),
+    ("builtins", "set"), ("builtins", "frozenset"), ("builtins", "bytearray"),
+}
+SNAPSHOT_EXCLUDED = {
+    "TerminalIO", "FrameRenderer", "SnapshotPickler", "SnapshotUnpickler", "ForkPickler", "ForkUnpickler",
+    "TurnJournal", "Autosave", "HibernationStore", "TelnetStream", "GameSession", "GameServer",
+    "ShardWorker", "DispatchedConnection", "SessionDispatcher",
+}
+SNAPSHOT_METHODS = {  # Bound methods kept in game state, as (class name, method name)
+    ("LocationManager", "complete_location_unlock"),
+    ("InfestationManager", "infestation_turn_effect"),
+}
+SNAPSHOT_MODULES = {"random"}
+
+def _reduce_method(method):
+    # Bound methods are stored as owner + name and looked up again on load
+    owner, name = method.__self__, method.__func__.__name__
+    if (type(owner).__name__, name) not in SNAPSHOT_METHODS:
+        raise pickle.PicklingError(f"Can't snapshot bound method {type(owner).__name__}.{name}")
+    return _restore_method, (owner, name)
+
+def _restore_method(owner, name):
+    cls = type(owner)
+    if cls.__module__ != __name__ or (cls.__name__, name) not in SNAPSHOT_METHODS:
+        raise SnapshotError(f"Snapshot refers to method {cls.__name__}.{name}, which is not allowed")
+    return types.MethodType(getattr(cls, name), owner)
+
+def _reduce_module(module):
+    if module.__name__ not in SNAPSHOT_MODULES:
+        raise pickle.PicklingError(f"Can't snapshot module {module.__name__}")
+    return _restore_module, (module.__name__,)
+
+def _restore_module(name):
+    if name not in SNAPSHOT_MODULES:
+        raise SnapshotError(f"Snapshot refers to module {name}, which is not allowed")
+    return importlib.import_module(name)
+
+class SnapshotPickler(pickle.Pickler):
+    """Stores bound methods, modules and shared content by reference; lambdas are refused"""
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[types.MethodType] = _reduce_method
+    dispatch_table[types.ModuleType] = _reduce_module
+
+    def persistent_id(self, obj):
+        path = CONTENT_PATHS.get(id(obj))
+        return ("content",) + path if path is not None else None
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Resolves game classes whether the snapshot was written by cargo.py run as a script or imported.
+
+    Globals outside the SNAPSHOT_* allowlists above raise SnapshotError.
+    """
+    def find_class(self, module, name):
+        if module in ("__main__", "cargo"):
+            owner, _, attribute = name.partition('.')
+            obj = globals().get(owner)
+            for part in attribute.split('.') if attribute else ():
+                obj = getattr(obj, part, None)
+            if obj is _restore_method or obj is _restore_module:
+                return obj
+            if owner == "MilestoneRequirements" and any(attribute == entry[0] for entry in REQUIREMENT_CHECKS.values()):
+                return obj  # Requirement checks held by compiled predicates
+            if isinstance(obj, type) and obj.__module__ == __name__ and obj.__name__ not in SNAPSHOT_EXCLUDED:
+                return obj
+        elif (module, name) in SNAPSHOT_STDLIB:
+            return super().find_class(module, name)
+        raise SnapshotError(f"Snapshot refers to {module}.{name}, which is not allowed")
+
+    def persistent_load(self, pid):
+        if pid[0] != "content":
+            raise SnapshotError(f"Unknown persistent reference {pid!r}")
+        try:
+            return content_node(pid[1:])
+        except (KeyError, IndexError):
+            raise SnapshotError(f"Unknown content table {pid[1:]!r}")
+
+class ForkPickler(SnapshotPickler):
+    """In-memory pickler for Game.fork().
+
+    Objects listed in `substitutes` (id of original -> object to use in the
+    copy) travel out of band: the byte stream only carries their id.
+    """
+    def __init__(self, file, substitutes):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.substitutes = substitutes
+
+    def persistent_id(self, obj):
+        key = id(obj)
+        return key if key in self.substitutes else super().persistent_id(obj)
+
+class ForkUnpickler(SnapshotUnpickler):
+    def __init__(self, file, substitutes):
+        super().__init__(file)
+        self.substitutes = substitutes
+
+    def persistent_load(self, pid):
+        if isinstance(pid, tuple):
+            return super().persistent_load(pid)
+        return self.substitutes[pid]
+
+# Turn journal: framed, checksummed records of the input lines read per player action
+JOURNAL_MAGIC = b"CARGOJNL"
+JOURNAL_VERSION = 2  # 2: flags in the header
+JOURNAL_HEADER = struct.Struct("<8sHHI")  # magic, format version, flags, CRC32 of the base snapshot
+JOURNAL_RENDERED = 0x1  # Recorded with an output sink, so "Press Enter" waits read a line
+JOURNAL_FRAME = struct.Struct("<II")  # payload length, CRC32 of the payload
+JOURNAL_ENTRY = struct.Struct("<iIH")  # turn, RNG checkpoint, number of lines
+JOURNAL_LINE = struct.Struct("<H")
+
+class TurnJournal:
+    """Append-only journal of player input since a base snapshot.
+
+    Each frame is written whole and carries its own length and checksum, so
+    a torn write at a crash only loses the frame that was being written.
+    """
+    def __init__(self, path, snapshot_checksum, flags=0):
+        self.path = path
+        self.pending = []
+        self.file = open(path, "wb")
+        self.file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, flags, snapshot_checksum))
+        self.file.flush()
+
+    def record(self, line):
+        self.pending.append(line)
+
+    def commit(self, turn, checkpoint):
+        """Write the lines read since the last commit as one frame"""
+        parts = [JOURNAL_ENTRY.pack(turn, checkpoint, len(self.pending))]
+        for line in self.pending:
+            encoded = line.encode("utf-8")
+            parts.append(JOURNAL_LINE.pack(len(encoded)))
+            parts.append(encoded)
+        payload = b"".join(parts)
+        self.file.write(JOURNAL_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.file.flush()
+        self.pending = []
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def read_frames(path, snapshot_checksum):
+        """Header flags, and (turn, checkpoint, lines) for every intact frame recorded on top of a snapshot"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0, []
+        if len(data) < JOURNAL_HEADER.size:
+            return 0, []
+        magic, version, flags, base_checksum = JOURNAL_HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+            raise SnapshotError("Not a Cargo journal")
+        if base_checksum != snapshot_checksum:
+            return 0, []  # Journal belongs to an older snapshot; its turns are already in the new one
+
+        frames = []
+        offset = JOURNAL_HEADER.size
+        while offset + JOURNAL_FRAME.size <= len(data):
+            length, checksum = JOURNAL_FRAME.unpack_from(data, offset)
+            payload = data[offset + JOURNAL_FRAME.size:offset + JOURNAL_FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break  # Torn or corrupt tail
+            turn, checkpoint, count = JOURNAL_ENTRY.unpack_from(payload)
+            position = JOURNAL_ENTRY.size
+            lines = []
+            for _ in range(count):
+                (size,) = JOURNAL_LINE.unpack_from(payload, position)
+                position += JOURNAL_LINE.size
+                lines.append(payload[position:position + size].decode("utf-8"))
+                position += size
+            frames.append((turn, checkpoint, lines))
+            offset += JOURNAL_FRAME.size + length
+        return flags, frames
+
+class Autosave:
+    """Incremental autosave: a full snapshot every `interval` actions, a journal frame per action.
+
+    Files are <base>.sav and <base>.journal.
+    """
+    def __init__(self, base_path, interval=50):
+        self.base_path = base_path
+        self.interval = interval
+        self.journal = None
+        self.actions = 0
+
+    @property
+    def snapshot_path(self):
+        return self.base_path + ".sav"
+
+    @property
+    def journal_path(self):
+        return self.base_path + ".journal"
+
+    def attach(self, game):
+        """Start journaling a game from a fresh snapshot of its current state"""
+        game.autosave = self
+        game.io.recorder = self.record
+        self.rotate(game)
+
+    def record(self, line):
+        if self.journal is not None:
+            self.journal.record(line)
+
+    def rotate(self, game):
+        """Write a full snapshot and start an empty journal on top of it"""
+        data = game.save_snapshot()
+        checksum = SNAPSHOT_HEADER.unpack_from(data)[3]
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, self.snapshot_path)
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = TurnJournal(self.journal_path, checksum, JOURNAL_RENDERED if game.io.rendering else 0)
+        self.actions = 0
+
+    def checkpoint(self, game):
+        """Called after each player action: O(input) journal append, periodic full snapshot"""
+        self.journal.commit(game.turn, game.random_streams.checkpoint())
+        self.actions += 1
+        if self.actions >= self.interval:
+            self.rotate(game)
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
 # Define the Game class
 class Game:
-    def __init__(self):
+    turn = PublishedAttribute(EVENT_TURN)
+    trades_completed = PublishedAttribute(EVENT_TRADE)
+
+    # Topics read by the state checks play_turn runs before each action; a
+    # check is skipped while none of its topics has been published since it last ran
+    CHECK_TOPICS = {
+        "location_unlocks": (EVENT_QUEST, EVENT_COMBAT, EVENT_RESEARCH, EVENT_STORY, EVENT_DISCOVERY, EVENT_TURN),
+        "milestone_triggers": (EVENT_TRADE, EVENT_COMBAT, EVENT_BUILDINGS, EVENT_DISCOVERY, EVENT_RESEARCH,
+                               EVENT_STORY, EVENT_TURN),
+        "story": (EVENT_MONEY, EVENT_RESEARCH, EVENT_SHIP, EVENT_COMBAT, EVENT_TRADE, EVENT_PASSENGERS,
+                  EVENT_BUILDINGS, EVENT_DISCOVERY, EVENT_QUEST, EVENT_STORY, EVENT_TURN),
+    }
+
+    def __init__(self, io=None, difficulty=None, player_name=None, seed=None, lazy_markets=False):
+        # Pluggable I/O backend; defaults to the interactive terminal
+        self.io = io if io is not None else TerminalIO()
+        # Change notifications from game state to the subsystems that derive from it
+        self.events = EventBus()
+        # Building, platform and location type counts across the galaxy
+        self.galaxy_index = GalaxyIndex()
+        # Per-subsystem random streams derived from one root seed
+        self.random_streams = RandomStreams(seed)
+        # Galaxy market table; lazy markets only evaluate locations the player observes
+        self.market_engine = MarketEngine(lazy=lazy_markets, game=self)
+        self.seed = self.random_streams.seed
+        self.rng = self.random_streams.stream("game")
+        self.event_rng = self.random_streams.stream("events")
+        self.combat_rng = self.random_streams.stream("combat")
+        self.research_rng = self.random_streams.stream("research")
         self.term_width = self.get_terminal_width()
         self.term_height = self.get_terminal_height()
-        self.difficulty = self.choose_difficulty()
-        self.locations = self.generate_initial_locations()  # Generate all locations
-        self.current_location = random.choice([loc for loc in self.locations if isinstance(loc, Planet)])  # Start at a planet
-        self.shop = Shop()  # Initialize the shop system
+        self.difficulty = self.choose_difficulty() if difficulty is None else difficulty
+        self.locations = LocationRegistry(self.generate_initial_locations())  # Generate all locations
+        self.current_location = self.rng.choice(self.locations.of_type("Planet"))  # Start at a planet
+        self.shop = Shop(rng=self.random_streams.stream("shop"))  # Initialize the shop system
         self.ship = Ship()
         self.ship.game = self  # connect ship to game
         self.turn = 0
-        self.known_locations = [self.current_location.name]  
+        self.known_locations = KnownLocations([self.current_location.name])
         self.event_log = []
-        self.player_name = self.get_player_name()
+        self.player_name = self.get_player_name() if player_name is None else player_name
         self.rank = "Explorer"
         self.reputation = 0
         self.story_manager = StoryManager(self)
@@ -682,7 +1639,7 @@ class Game:
         self.secret_quest_available = False
         self.stellar_portal_available = False
         self.research = Research()
-        self.action = Action()
+        self.action = Action(rng=self.random_streams.stream("actions"))
         # Add new tracking attributes for story milestones
         self.trades_completed = 0
         self.combat_difficulty = 1.0
@@ -706,6 +1663,8 @@ class Game:
         # Add systems
         self.port_system = Port(self)
         self.contract_manager = ContractManager(self)
+        self.route_planner = RoutePlanner(self)
+        self.navigator = NavigatorAdvisor(self)
         self.resource_transport = ResourceTransportQuest(self)
         self.reputation_manager = PassengerReputationManager(self)
         self.synthetic_events = SyntheticEventManager(self)
@@ -735,10 +1694,10 @@ class Game:
         self.reputation_manager = PassengerReputationManager(self)
 
     def get_terminal_width(self):
-        return shutil.get_terminal_size().columns
+        return self.io.layout.width()
 
     def get_terminal_height(self):
-        return shutil.get_terminal_size().lines
+        return self.io.layout.height()
 
     def format_money(self, amount):
         if amount >= 1_000_000_000:
@@ -749,33 +1708,57 @@ class Game:
             return f"{amount/1_000:.1f}K"
         return str(floor(amount))
 
+    def event_bus(self):
+        return self.__dict__.get('events')
+
+    def location_name(self, handle):
+        return self.locations.handles[handle].name
+
+    def galaxy(self):
+        """The galaxy-wide building, platform and location type counts.
+
+        The location list is re-read only after a discovery was published.
+        """
+        index = self.galaxy_index
+        stamp = self.events.versions[EVENT_DISCOVERY]
+        if index.stamp != stamp or not self.events.gating:
+            index.sync(self.locations)
+            index.stamp = stamp
+        return index
+
+    def new_location(self, location_class, name, *args):
+        """Create a location with its own market stream derived from the game seed"""
+        location = location_class(name, *args, rng=self.random_streams.stream(f"location.{name}"))
+        self.market_engine.attach(location)
+        return location
+
     def generate_initial_locations(self):
         """Generate initial game locations and store hidden locations for later unlock"""
         # Starting planets - always available
         initial_locations = [
-            Planet("Alpha", 5, 3, 10, "Stable"),
-            Planet("Beta", 2, 7, 15, "Booming"),
-            Planet("Gamma", 8, 2, 20, "Declining"),
-            Planet("Delta", 4, 6, 25, "Formative"),
-            Planet("Epsilon", 7, 4, 30, "Stable")
+            self.new_location(Planet, "Alpha", 5, 3, 10, "Stable"),
+            self.new_location(Planet, "Beta", 2, 7, 15, "Booming"),
+            self.new_location(Planet, "Gamma", 8, 2, 20, "Declining"),
+            self.new_location(Planet, "Delta", 4, 6, 25, "Formative"),
+            self.new_location(Planet, "Epsilon", 7, 4, 30, "Stable")
         ]
         
         # Hidden locations - unlocked through story progression
         self.hidden_locations = {
             "AsteroidBase": [
-                AsteroidBase("Omega XIV", 6, 2, 15, "Stable"),
-                AsteroidBase("Sigma VII", 7, 1, 20, "Declining"),
-                AsteroidBase("Theta III", 5, 3, 25, "Booming")
+                self.new_location(AsteroidBase, "Omega XIV", 6, 2, 15, "Stable"),
+                self.new_location(AsteroidBase, "Sigma VII", 7, 1, 20, "Declining"),
+                self.new_location(AsteroidBase, "Theta III", 5, 3, 25, "Booming")
             ],
             "DeepSpaceOutpost": [
-                DeepSpaceOutpost("DSO-Alpha", 8, 3, 25, "Formative"),
-                DeepSpaceOutpost("DSO-Beta", 9, 2, 30, "Booming"),
-                DeepSpaceOutpost("DSO-Gamma", 7, 4, 35, "Stable")
+                self.new_location(DeepSpaceOutpost, "DSO-Alpha", 8, 3, 25, "Formative"),
+                self.new_location(DeepSpaceOutpost, "DSO-Beta", 9, 2, 30, "Booming"),
+                self.new_location(DeepSpaceOutpost, "DSO-Gamma", 7, 4, 35, "Stable")
             ],
             "ResearchColony": [
-                ResearchColony("Nova Labs", 10, 4, 40, "Stable"),
-                ResearchColony("Quantum Center", 9, 5, 35, "Booming"),
-                ResearchColony("Stellar Institute", 8, 6, 45, "Formative")
+                self.new_location(ResearchColony, "Nova Labs", 10, 4, 40, "Stable"),
+                self.new_location(ResearchColony, "Quantum Center", 9, 5, 35, "Booming"),
+                self.new_location(ResearchColony, "Stellar Institute", 8, 6, 45, "Formative")
             ]
         }
         
@@ -783,14 +1766,14 @@ class Game:
         self.chapter_locations = {
             3: {  # Available in Chapter 3
                 "AncientRuins": [
-                    Location("Ancient Ruins Alpha", "Ancient Ruins", 12, 1, 50, "Mysterious"),
-                    Location("Ancient Ruins Beta", "Ancient Ruins", 15, 1, 60, "Mysterious")
+                    self.new_location(Location, "Ancient Ruins Alpha", "Ancient Ruins", 12, 1, 50, "Mysterious"),
+                    self.new_location(Location, "Ancient Ruins Beta", "Ancient Ruins", 15, 1, 60, "Mysterious")
                 ]
             },
             4: {  # Available in Chapter 4
                 "AlienOutpost": [
-                    Location("Alien Outpost X", "Alien Outpost", 20, 5, 100, "Unknown"),
-                    Location("Alien Outpost Y", "Alien Outpost", 25, 5, 120, "Unknown")
+                    self.new_location(Location, "Alien Outpost X", "Alien Outpost", 20, 5, 100, "Unknown"),
+                    self.new_location(Location, "Alien Outpost Y", "Alien Outpost", 25, 5, 120, "Unknown")
                 ]
             }
         }
@@ -803,8 +1786,11 @@ class Game:
 
     def create_box(self, content, style='single'):
         """Create a box that expands to terminal width consistently with validate_input width."""
+        if not self.io.rendering:
+            return ""
         # Get terminal width, subtracting exactly the same as word_wrap
-        term_width = shutil.get_terminal_size().columns - 4  # Match word_wrap padding exactly
+        layout = self.io.layout
+        term_width = layout.width() - 4  # Match word_wrap padding exactly
         
         # Define box characters
         chars = {
@@ -823,35 +1809,8 @@ class Game:
                 if i < num_cols:
                     max_lengths[i] = max(max_lengths[i], len(str(cell)))
 
-        # Calculate spacing requirements
-        separator_space = 3  # Space for " │ " between columns
-        total_separator_width = separator_space * (num_cols - 1)
-        
-        # Calculate available space for content
-        available_content_width = term_width - total_separator_width
-
-        # Calculate proportional column widths
-        total_content_length = sum(max_lengths)
-        col_widths = []
-        remaining_width = available_content_width
-        
-        for i in range(num_cols):
-            if i == num_cols - 1:
-                # Last column gets remaining width
-                width = remaining_width
-            else:
-                # Calculate proportional width based on content length
-                proportion = max_lengths[i] / total_content_length
-                width = max(3, min(
-                    int(available_content_width * proportion),
-                    max_lengths[i] + 2
-                ))
-                remaining_width -= width
-            col_widths.append(width)
-
-        # Ensure minimum widths
-        for i in range(num_cols):
-            col_widths[i] = max(3, min(col_widths[i], max_lengths[i] + 10))
+        # Proportional column widths, solved once per shape and width
+        col_widths = layout.box_columns(tuple(max_lengths), term_width)
 
         # Create the box
         lines = []
@@ -860,7 +1819,7 @@ class Game:
         horizontal_width = term_width
         
         # Top border
-        lines.append(f"{chars['tl']}{chars['h'] * horizontal_width}{chars['tr']}")
+        lines.append(layout.border(chars['tl'], chars['h'], chars['tr'], horizontal_width))
         
         # Content rows
         for row in content:
@@ -885,14 +1844,17 @@ class Game:
             lines.append(row_str)
         
         # Bottom border
-        lines.append(f"{chars['bl']}{chars['h'] * horizontal_width}{chars['br']}")
+        lines.append(layout.border(chars['bl'], chars['h'], chars['br'], horizontal_width))
         
         return '\n'.join(lines)
 
     def create_wide_box(self, content, style='single'):
         """Create a box that expands to terminal width with proportionally sized columns."""
+        if not self.io.rendering:
+            return ""
         # Get terminal width and account for borders and spacing
-        term_width = shutil.get_terminal_size().columns
+        layout = self.io.layout
+        term_width = layout.width()
         usable_width = term_width - 4  # Account for borders and minimum spacing
         
         # Define box characters
@@ -912,45 +1874,19 @@ class Game:
                 if i < num_cols:
                     max_lengths[i] = max(max_lengths[i], len(str(cell)))
 
-        # Calculate spacing requirements
-        separator_space = 3  # Space for " │ " between columns
-        total_separator_width = separator_space * (num_cols - 1)
-        padding_width = 2  # Space for padding around content " x "
-        
-        # Calculate available space for content
-        available_content_width = usable_width - total_separator_width - padding_width
-        
-        # Calculate proportional column widths
-        total_content_length = sum(max_lengths)
-        col_widths = []
-        remaining_width = available_content_width
-        
-        for i in range(num_cols):
-            if i == num_cols - 1:
-                # Last column gets remaining width
-                width = remaining_width
-            else:
-                # Calculate proportional width
-                proportion = max_lengths[i] / total_content_length
-                width = max(3, min(
-                    int(available_content_width * proportion),
-                    max_lengths[i] + 2
-                ))
-                remaining_width -= width
-            col_widths.append(width)
-
-        # Ensure minimum widths and adjust if necessary
-        for i in range(num_cols):
-            col_widths[i] = max(3, min(col_widths[i], max_lengths[i] + 10))
+        # Proportional column widths, solved once per shape and width
+        col_widths = layout.wide_columns(tuple(max_lengths), usable_width)
 
         # Calculate final horizontal width
-        horizontal_width = sum(col_widths) + total_separator_width + padding_width
+        separator_space = 3  # Space for " │ " between columns
+        padding_width = 2  # Space for padding around content " x "
+        horizontal_width = sum(col_widths) + separator_space * (num_cols - 1) + padding_width
 
         # Create the box
         lines = []
         
         # Top border
-        lines.append(f"{chars['tl']}{chars['h'] * horizontal_width}{chars['tr']}")
+        lines.append(layout.border(chars['tl'], chars['h'], chars['tr'], horizontal_width))
         
         # Content rows
         for row in content:
@@ -970,16 +1906,16 @@ class Game:
             lines.append(row_str)
         
         # Bottom border
-        lines.append(f"{chars['bl']}{chars['h'] * horizontal_width}{chars['br']}")
+        lines.append(layout.border(chars['bl'], chars['h'], chars['br'], horizontal_width))
         
         return '\n'.join(lines)
 
     def create_character_box(self, character_content, style='round'):
         """Create a character display box optimized for different terminal widths"""
-        try:
-            term_width = os.get_terminal_size().columns
-        except OSError:
-            term_width = 80  # Default width
+        if not self.io.rendering:
+            return ""
+        layout = self.io.layout
+        term_width = layout.width()
             
         # Adjust width based on terminal size
         if term_width < 60:
@@ -996,32 +1932,35 @@ class Game:
         }[style]
         
         lines = []
-        lines.append(f"{chars['tl']}{chars['h'] * content_width}{chars['tr']}")
+        lines.append(layout.border(chars['tl'], chars['h'], chars['tr'], content_width))
         
         # Process title section
         if 'title' in character_content:
             wrapped_title = self.word_wrap(character_content['title'], content_width - 2)
             for line in wrapped_title:
                 lines.append(f"{chars['v']} {line:<{content_width-2}} {chars['v']}")
-            lines.append(f"{chars['v']}{chars['h'] * content_width}{chars['v']}")
+            lines.append(layout.border(chars['v'], chars['h'], chars['v'], content_width))
         
         # Process main content with proper sections
         for section in ['introduction', 'description', 'demands', 'options']:
             if section in character_content:
                 if not compact_mode:
-                    lines.append(f"{chars['v']}{' ' * content_width}{chars['v']}")
+                    lines.append(layout.border(chars['v'], ' ', chars['v'], content_width))
                 
                 wrapped_content = self.word_wrap(character_content[section], content_width - 2)
                 for line in wrapped_content:
                     lines.append(f"{chars['v']} {line:<{content_width-2}} {chars['v']}")
         
-        lines.append(f"{chars['bl']}{chars['h'] * content_width}{chars['br']}")
+        lines.append(layout.border(chars['bl'], chars['h'], chars['br'], content_width))
         return '\n'.join(lines)
 
     def create_compact_box(self, content, style='single'):
         """Create a box with properly aligned borders and content."""
+        if not self.io.rendering:
+            return ""
         # Get terminal width and account for borders and spacing
-        term_width = shutil.get_terminal_size().columns
+        layout = self.io.layout
+        term_width = layout.width()
         max_width = term_width - 4  # Account for left and right borders and minimum spacing
         
         # Define box characters
@@ -1033,39 +1972,26 @@ class Game:
 
         # Calculate number of columns and maximum width for each
         num_cols = max(len(row) for row in content)
-        col_widths = [0] * num_cols
+        max_lengths = [0] * num_cols
         
         # First pass: get maximum width needed for each column
         for row in content:
             for i, cell in enumerate(row):
                 if i < num_cols:
-                    col_widths[i] = max(col_widths[i], len(str(cell)))
-
-        # Calculate spacing components
-        separator_space = 3  # Space for " │ " between columns
-        total_separators_width = separator_space * (num_cols - 1)
-        content_width = sum(col_widths)
-
-        # Calculate total width including all spacing
-        total_width = content_width + total_separators_width + 2  # +2 for single space padding on each side
+                    max_lengths[i] = max(max_lengths[i], len(str(cell)))
 
-        # If total width exceeds max_width, reduce column widths proportionally
-        if total_width > max_width:
-            excess = total_width - max_width
-            # Distribute reduction across columns
-            for i in range(num_cols):
-                reduction = int(excess * (col_widths[i] / content_width))
-                col_widths[i] = max(3, col_widths[i] - reduction)  # Ensure minimum width of 3
-                content_width = sum(col_widths)  # Recalculate content width after reduction
+        # Shrink columns to fit, solved once per shape and width
+        col_widths = layout.compact_columns(tuple(max_lengths), max_width)
 
         # Calculate final width for horizontal borders (should match content row width)
-        horizontal_width = content_width + total_separators_width + 2  # +2 for spaces next to borders
+        separator_space = 3  # Space for " │ " between columns
+        horizontal_width = sum(col_widths) + separator_space * (num_cols - 1) + 2  # +2 for spaces next to borders
 
         # Create the box
         lines = []
         
         # Top border
-        lines.append(f"{chars['tl']}{chars['h'] * horizontal_width}{chars['tr']}")
+        lines.append(layout.border(chars['tl'], chars['h'], chars['tr'], horizontal_width))
         
         # Content rows
         for row in content:
@@ -1085,12 +2011,15 @@ class Game:
             lines.append(row_str)
         
         # Bottom border
-        lines.append(f"{chars['bl']}{chars['h'] * horizontal_width}{chars['br']}")
+        lines.append(layout.border(chars['bl'], chars['h'], chars['br'], horizontal_width))
         
         return '\n'.join(lines)
 
     def create_turn_info_box(self, content, style='single'):
-        term_width = shutil.get_terminal_size().columns
+        if not self.io.rendering:
+            return ""
+        layout = self.io.layout
+        term_width = layout.width()
         styles = {
             'single': ('┌', '┐', '└', '┘', '─', '│', '├', '┤', '┬', '┴'),
             'double': ('╔', '╗', '╚', '╝', '═', '║', '╠', '╣', '╦', '╩'),
@@ -1099,18 +2028,10 @@ class Game:
         tl, tr, bl, br, h, v, ml, mr, mt, mb = styles[style]
 
         # Calculate column widths based on content
-        cols = len(content[0])
-        col_widths = [max(len(str(cell)) + 2 for cell in col) for col in zip(*content)]
-
-        # Use terminal width minus padding for margins
-        total_width = term_width - 4
+        col_widths = tuple(max(len(str(cell)) + 2 for cell in col) for col in zip(*content))
 
-        # Distribute remaining width proportionally
-        total_content_width = sum(col_widths)
-        remaining_width = total_width - (cols + 1)  # Account for vertical borders
-        if remaining_width > total_content_width:
-            extra_per_col = (remaining_width - total_content_width) // cols
-            col_widths = [w + extra_per_col for w in col_widths]
+        # Use terminal width minus padding for margins, spare room shared evenly
+        col_widths = layout.turn_info_columns(col_widths, term_width - 4)
 
         def create_row(cells, widths, left, mid, right):
             row = left
@@ -1136,9 +2057,9 @@ class Game:
         box = self.create_simple_box(box_content, style)
         if color:
             box = f"\033[{color}m{box}\033[0m"
-        print(box)
+        self.io.write(box)
         if pause > 0:
-            time.sleep(pause)
+            self.io.sleep(pause)
 
     def fast_message(self, message, pause=0.5, style='round', color=None, clear_screen=True):
         if isinstance(message, list):
@@ -1149,15 +2070,17 @@ class Game:
         box = self.create_simple_box(box_content, style)
         if color:
             box = f"\033[{color}m{box}\033[0m"
-        print(box)
+        self.io.write(box)
         if pause > 0:
-            time.sleep(pause)
+            self.io.sleep(pause)
         if clear_screen:
             self.clear_screen()            
 
     def create_simple_box(self, content, style='single'):
-        term_width = shutil.get_terminal_size().columns
-        width = term_width - 4  # Adjust for padding
+        if not self.io.rendering:
+            return ""
+        layout = self.io.layout
+        width = layout.width() - 4  # Adjust for padding
 
         chars = {
             'single': {'tl': '┌', 'tr': '┐', 'bl': '└', 'br': '┘', 'h': '─', 'v': '│'},
@@ -1166,14 +2089,14 @@ class Game:
         }[style]
 
         lines = []
-        lines.append(f"{chars['tl']}{chars['h'] * width}{chars['tr']}")
+        lines.append(layout.border(chars['tl'], chars['h'], chars['tr'], width))
 
         for row in content:
             wrapped_row = self.word_wrap(row, width - 2)
             for line in wrapped_row:
                 lines.append(f"{chars['v']} {line:<{width-2}} {chars['v']}")
 
-        lines.append(f"{chars['bl']}{chars['h'] * width}{chars['br']}")
+        lines.append(layout.border(chars['bl'], chars['h'], chars['br'], width))
         return '\n'.join(lines)
 
     def handle_travel(self):
@@ -1182,10 +2105,10 @@ class Game:
             self.display_simple_message("Choose a location to travel to:")
             # Display known locations with numbers
             for i, location in enumerate(self.known_locations, 1):
-                print(f"{i}. {location}")
+                self.io.write(f"{i}. {location}")
             
             self.display_simple_message("Enter the number or name of the location (or 'cancel'): ", 0)
-            choice = input(">>> ").strip()
+            choice = self.io.read(">>> ").strip()
             
             if not choice or choice.lower() == 'cancel':
                 self.display_simple_message("Travel cancelled.")
@@ -1202,7 +2125,7 @@ class Game:
                 return self.travel_to_location(choice)
         else:
             self.display_simple_message("Enter location name (or 'cancel'): ", 0)
-            location_name = input(">>> ").strip()
+            location_name = self.io.read(">>> ").strip()
             
             if not location_name or location_name.lower() == 'cancel':
                 self.display_simple_message("Travel cancelled.")
@@ -1243,6 +2166,7 @@ class Game:
         market_content.append(["Location", "Tech", "Agri", "S/F", "Features"])
         
         for location in locations:
+            self.observe_market(location)
             # Format prices compactly
             tech_price = "BAN" if 'tech' in location.banned_commodities else self.format_money(location.market['tech'])
             agri_price = "BAN" if 'agri' in location.banned_commodities else self.format_money(location.market['agri'])
@@ -1289,9 +2213,9 @@ class Game:
         box = self.create_box(box_content, style)
         if color:
             box = f"\033[{color}m{box}\033[0m"
-        print(box)
+        self.io.write(box)
         if pause > 0:
-            time.sleep(pause)
+            self.io.sleep(pause)
 
     def validate_input(self, default_prompt, valid_options, prompt=None):
             """
@@ -1300,14 +2224,15 @@ class Game:
             valid_options: List of valid input options
             prompt: Optional custom prompt to override default
             """
-            term_width = shutil.get_terminal_size().columns
+            term_width = self.io.layout.width() if self.io.rendering else 0
 
             while True:
-                wrapped_prompt = self.word_wrap(prompt or default_prompt, term_width - 4)
-                self.display_simple_message(wrapped_prompt, 0)
+                if self.io.rendering:
+                    wrapped_prompt = self.word_wrap(prompt or default_prompt, term_width - 4)
+                    self.display_simple_message(wrapped_prompt, 0)
 
                 try:
-                    user_input = input(">>> ").strip().lower()
+                    user_input = self.io.read(">>> ").strip().lower()
                     if not user_input:
                         self.display_simple_message("Command cancelled.")
                         return None
@@ -1315,8 +2240,8 @@ class Game:
                         return user_input
                     self.display_simple_message(f"Invalid input, try: {', '.join(valid_options)}", 1)
                 except KeyboardInterrupt:
-                    print(f"Do you want to exit? (yes/no):")
-                    confirm = input(">>> ").strip().lower()
+                    self.io.write(f"Do you want to exit? (yes/no):")
+                    confirm = self.io.read(">>> ").strip().lower()
                     if confirm == 'yes':
                         self.display_simple_message("Goodbye!", 1)
                         exit()
@@ -1325,7 +2250,7 @@ class Game:
         while True:
             self.display_simple_message(prompt, 0)
             try:    
-                user_input = input(">>> ").strip().lower()
+                user_input = self.io.read(">>> ").strip().lower()
                 if not user_input:
                     self.display_simple_message("Command cancelled.")
                     return None
@@ -1344,7 +2269,7 @@ class Game:
         while True:
             self.display_simple_message(prompt, 0)
             try:
-                user_input = input(">>> ").strip().lower()
+                user_input = self.io.read(">>> ").strip().lower()
                 if not user_input:
                     self.display_simple_message("Command cancelled.")
                     return None
@@ -1357,9 +2282,9 @@ class Game:
                         return planet.name
                 self.display_simple_message(f"Invalid input. Valid options: {', '.join([planet.name for planet in self.planets])}", 1)
             except KeyboardInterrupt:
-                print(f"Do you want to exit? (yes/no):")
+                self.io.write(f"Do you want to exit? (yes/no):")
 #                self.display_message("Do you want to exit? (yes/no)", 0)
-                confirm = input(">>> ").strip().lower()
+                confirm = self.io.read(">>> ").strip().lower()
                 if confirm == 'yes':
                     self.display_simple_message("Goodbye!", 1)
                     exit()
@@ -1379,23 +2304,54 @@ class Game:
             return 120 <= price <= 250
         return True  # Default for other commodities
 
+    def advance_turn(self):
+        """Move the game clock on one turn; market history opens a sample for it"""
+        self.turn += 1
+        self.market_engine.advance(self.turn)
+        self.observe_market(self.current_location)  # Lazy markets: keep the player's market current
+
     def update_market_prices(self):
         """Update market prices with new logic"""
-        for planet in self.planets:
-            # Update basic commodities
-            planet.update_market(self.difficulty)
-            
-            # Update mining commodities
-            planet.produce_resources()
-            
-            # Apply market manipulation if researched
-            if 'psychodynamics' in self.research.unlocked_options:
-                for commodity in ['tech', 'agri', 'salt', 'fuel']:
-                    if random.random() < 0.2:  # 20% chance for each commodity
-                        self.action.manipulate_market(planet, commodity, self.research)
+        # Not scheduled by play_turn: the original game never ticked markets per turn
+        engine = self.market_engine
+        if engine.lazy:
+            # Unobserved locations replay the tick when their market is next read
+            engine.defer_tick()
+            self.observe_market(self.current_location)
+            return
+
+        # Update basic commodities for the whole galaxy in one pass
+        engine.tick(self.difficulty)
+        for planet in engine.locations:  # Every row, as lazy rows replay the tick
+            self.settle_market(planet)
+
+    def settle_market(self, planet):
+        """Per-turn market work that runs after the engine tick"""
+        # Update mining commodities
+        planet.produce_resources()
+
+        # Apply market manipulation if researched; rolls come from the location's
+        # own stream, so lazy catch-up draws the same numbers in any order
+        if 'psychodynamics' in self.research.unlocked_options:
+            for commodity in ['tech', 'agri', 'salt', 'fuel']:
+                if planet.rng.random() < 0.2:  # 20% chance for each commodity
+                    self.action.manipulate_market(planet, commodity, self.research, rng=planet.rng)
+
+    def observe_market(self, location):
+        """Bring a location's market up to the current world turn (lazy markets)"""
+        engine = self.market_engine
+        if location.market_engine is engine and engine.behind(location.market_row):
+            engine.catch_up(location.market_row)
+
+    def replay_tick(self, location):
+        """One deferred galaxy tick for a lazy location, as update_market_prices would have run it"""
+        self.market_engine.tick(self.difficulty, [location.market_row])
+        self.settle_market(location)
 
     # Update Game class methods
     def display_turn_info(self):
+        if not self.io.rendering:
+            return  # Nothing to draw without an output sink
         self.clear_screen()
 
         # Calculate passenger stats
@@ -1427,7 +2383,7 @@ class Game:
             ])
 
         status_box = self.create_box(status_content, 'double')
-        print(status_box)
+        self.io.write(status_box)
 
         # Market prices with banned commodities indicator
         tech_status = "BANNED" if 'tech' in self.current_location.banned_commodities else str(self.format_money(self.current_location.market['tech']))
@@ -1448,7 +2404,7 @@ class Game:
             for commodity in self.current_location.banned_commodities:
                 duration = self.current_location.ban_duration.get(commodity, "Permanent")
                 market_content.append([f"{commodity.capitalize()}", f"{duration} turns"])
-        print(self.create_box(market_content, 'single'))
+        self.io.write(self.create_box(market_content, 'single'))
 
         # Display commands including port
         commands = [
@@ -1463,7 +2419,7 @@ class Game:
             effects = [["Active Research Effects"]]
             for research in self.research.unlocked_options:
                 effects.append([f"- {research.replace('_', ' ').title()}"])
-            print(self.create_box(effects, 'round'))
+            self.io.write(self.create_box(effects, 'round'))
 
     def display_location_info(self):
         # Ship section
@@ -1581,8 +2537,8 @@ class Game:
             location_line = location_info[i][0] if i < len(location_info) else ""
             content.append([ship_line, location_line])
 
-        print(self.create_box(content, 'double'))
-        input("Press Enter to continue...")
+        self.io.write(self.create_box(content, 'double'))
+        self.io.wait()
 
     def build_mining_platform(self):
         """Build a new mining platform on the current planet"""
@@ -1602,11 +2558,9 @@ class Game:
         cost = 10000
         if self.ship.money >= cost:
             self.ship.money -= cost
-            self.current_location.mining_platforms.append({
-                'type': deposit_type,
-                'efficiency': self.current_location.exogeology,
-                'capacity': random.randint(100, 200)
-            })
+            self.current_location.add_mining_platform(MiningPlatform(deposit_type, self.current_location.exogeology,
+                                                                     self.rng.randint(100, 200)))
+            self.events.publish(EVENT_BUILDINGS)
             self.display_simple_message(f"Mining platform for {deposit_type} built!")
         else:
             self.display_simple_message("Not enough money to build mining platform.")
@@ -1622,7 +2576,7 @@ class Game:
 
     def choose_difficulty(self):
         self.clear_screen()
-        display_logo(logo_data, centered=False)
+        display_logo(logo_data, centered=False, out=self.io.write)
         difficulty_info = [
 #            ["DIFFICULTY SELECTION"],
             [""],
@@ -1634,12 +2588,12 @@ class Game:
         ]
         
         for line in difficulty_info:
-            print(line[0])
-            time.sleep(0.1)
+            self.io.write(line[0])
+            self.io.sleep(0.1)
         
         while True:
             self.display_simple_message("Select difficulty (1-3):", 0)
-            choice = input(">>> ").strip()
+            choice = self.io.read(">>> ").strip()
             
             if choice in ['1', '2', '3']:
                 difficulty_names = ['EASY', 'NORMAL', 'EXPERT']
@@ -1666,6 +2620,7 @@ class Game:
         self.research.research_costs['ancient_tech'] = 500
         self.research.research_benefits['ancient_tech'] = {'tech_boost': 0.3}
         self.story_manager.story_states['ancient_research'] = True
+        self.events.publish(EVENT_STORY)
 
     def enable_crisis_mastery(self):
         """Enable crisis management bonuses"""
@@ -1703,23 +2658,18 @@ class Game:
             "neutron_shield": 40000,
             "warp_core": 75000
         }
+        self.shop.own_equipment()
         self.shop.base_equipment.update(new_equipment)
 
     def get_trade_volume(self, location):
         """Calculate total trade volume at location"""
-        if not hasattr(location, 'trade_history'):
-            location.trade_history = []
-        return sum(trade['value'] for trade in location.trade_history)
-
-    def record_trade(self, location, value):
-        """Record trade for statistics"""
-        if not hasattr(location, 'trade_history'):
-            location.trade_history = []
-        location.trade_history.append({
-            'turn': self.turn,
-            'value': value
-        })
-        self.trades_completed += 1
+        return getattr(location, 'trade_value_total', 0)
+
+    def record_trade(self, location, value, commodity=None, quantity=0):
+        """Record trade for statistics; per-turn units go into the market history"""
+        location.trade_value_total = getattr(location, 'trade_value_total', 0) + value
+        if commodity and getattr(location, 'market_engine', None) is not None:
+            location.market_engine.record_volume(location.market_row, commodity, quantity)
 
     def check_controlled_locations(self):
         """Count player-controlled locations"""
@@ -1746,11 +2696,11 @@ class Game:
             "mass_migration": self.handle_migration
         }
         
-        event = random.choice(list(events.keys()))
+        event = self.event_rng.choice(list(events.keys()))
         events[event]()
 
     def handle_anomaly(self):
-        damage = random.randint(10, 30)
+        damage = self.event_rng.randint(10, 30)
         self.ship.damage += damage
         self.display_simple_message(f"Anomaly surge! Ship took {damage}% damage!")
 
@@ -1761,6 +2711,7 @@ class Game:
 
     def handle_migration(self):
         for location in self.locations:
+            self.observe_market(location)
             location.market['tech'] *= 1.2
             location.market['agri'] *= 1.2
         self.display_simple_message("Mass migration affecting market prices!")
@@ -1785,8 +2736,10 @@ class Game:
             # Update story states based on world state
             if self.get_trade_volume(location) > 50000:
                 self.story_manager.story_states["trade_empire"] = True
+                self.events.publish(EVENT_STORY)
             if len([p for p in location.mining_platforms]) > 2:
                 self.story_manager.story_states["resource_empire"] = True
+                self.events.publish(EVENT_STORY)
 
     def check_story_requirements(self):
         """Check and update story progression each turn"""
@@ -1799,19 +2752,19 @@ class Game:
     def get_player_name(self):
         self.clear_screen()
         
-        display_logo(logo_data, centered=False)
+        display_logo(logo_data, centered=False, out=self.io.write)
         
         self.display_simple_message([
             "Enter your pilot name",
             "Press Enter for random"
         ], 0)
         
-        name = input(">>> ").strip()
+        name = self.io.read(">>> ").strip()
         
         if not name:
             titles = ["Captain", "Commander", "Pilot", "Hauler", "Trucker", "Starfarer", "Operator", "Rigger","Freerunner","Navigator", "Doc", "Docker" ]
             surnames = ["Aen Stark", "Orr-Slagg", "Dragg Voxx", "Swigg", "Doc Brainac", "Json", "Nova", "Drake", "Phoenix", "Wolf", "Kayo Wu", "Lyra Nyx", "Elerra Solis", "Bryce", "Q'Ella", "Cael Yaro", "Q'Orin"]
-            name = f"{random.choice(titles)} {random.choice(surnames)}"
+            name = f"{self.rng.choice(titles)} {self.rng.choice(surnames)}"
             self.display_simple_message(f"Neural Signature Verified: {name}")
         
         self.display_simple_message(f"Welcome aboard, {name}!")    
@@ -1834,36 +2787,19 @@ class Game:
             "Agricultural breakthroughs!",
             "Nothing special happening."
         ]
-        special_event = random.choice(special_events)
+        special_event = self.rng.choice(special_events)
         special_event_text = f"Special Event: {special_event}"
 
         self.display_story_message(self.word_wrap(intro_text))
         self.display_story_message(self.word_wrap(special_event_text))
-        time.sleep(3)  # Pause to let the player read the information
+        self.io.sleep(3)  # Pause to let the player read the information
 
     def word_wrap(self, text, width=None):
         if width is None:
-            term_width = shutil.get_terminal_size().columns
+            term_width = self.io.layout.width()
             width = term_width - 4  # Account for padding
 
-        words = text.split()
-        lines = []
-        current_line = []
-        current_length = 0
-
-        for word in words:
-            if current_length + len(word) + len(current_line) > width:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-                current_length = len(word)
-            else:
-                current_line.append(word)
-                current_length += len(word)
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        return lines
+        return self.io.layout.wrap(text, width)
 
     def display_story_message(self, message, pause=2, style='round', color=None):
         if isinstance(message, list):
@@ -1874,21 +2810,21 @@ class Game:
         box = self.create_simple_box(box_content, style)
         if color:
             box = f"\033[{color}m{box}\033[0m"
-        print(box)
+        self.io.write(box)
         if pause > 0:
-            time.sleep(pause)
+            self.io.sleep(pause)
 
     def display_character_message(self, character_name, message, pause=2, style='round', color=None):
         box_content = [f"{character_name}: {message}"]
         box = self.create_simple_box(box_content, style)
         if color:
             box = f"\033[{color}m{box}\033[0m"
-        print(box)
+        self.io.write(box)
         if pause > 0:
-            time.sleep(pause)
+            self.io.sleep(pause)
 
     def clear_screen(self):
-        os.system('clear' if os.name == 'posix' else 'cls')
+        self.io.clear()
 
     def force_check_chapter_progression(self):
         """Manually trigger chapter progression checks"""
@@ -1905,14 +2841,19 @@ class Game:
                 self.story_manager.start_chapter(next_chapters[0].id)        
 
     def play_turn(self):
+            self.observe_market(self.current_location)
             self.display_turn_info()
-            self.check_location_unlocks()  # Check for new unlocks each turn
-            self.check_milestone_triggers() # Check for StoryManager
+            events = self.events
+            if events.changed("location_unlocks", self.CHECK_TOPICS["location_unlocks"]):
+                self.check_location_unlocks()  # Check for new unlocks each turn
+            if events.changed("milestone_triggers", self.CHECK_TOPICS["milestone_triggers"]):
+                self.check_milestone_triggers() # Check for StoryManager
             self.character_system.check_character_triggers() # Check for dynamic characters system
             # New chapter and milestone system
-            self.story_manager.check_milestone_progress()
-            self.story_manager.check_chapter_progress()
-            self.force_check_chapter_progression()
+            if events.changed("story", self.CHECK_TOPICS["story"]):
+                self.story_manager.check_milestone_progress()
+                self.story_manager.check_chapter_progress()
+                self.force_check_chapter_progression()
             self.quest_system.check_active_quests()
             # Get location commands
             location_commands = self.current_location.commands
@@ -1927,14 +2868,11 @@ class Game:
             if hasattr(self, 'synthetic_events'):
                 self.synthetic_events.update()
                 
-            # For each location, check building counts
-            for location in self.locations:
-                neuroguild_count = location.buildings.count("Neuroengineering Guild")
-                agrobot_count = location.buildings.count("Agrobot Assembly Line")
-                
-                if neuroguild_count >= 4 and random.random() < 0.2:  # 20% chance per turn
+            # Locations with enough synthetic-staffed buildings to rise up
+            for location, neuroguild_count, agrobot_count in self.galaxy().uprising_sites():
+                if neuroguild_count >= 4 and self.event_rng.random() < 0.2:  # 20% chance per turn
                     self.synthetic_events.start_uprising("Neurodroid", location)
-                if agrobot_count >= 4 and random.random() < 0.2:
+                if agrobot_count >= 4 and self.event_rng.random() < 0.2:
                     self.synthetic_events.start_uprising("Agrobot", location)            
             
             # Update port system if port command is available
@@ -1942,7 +2880,7 @@ class Game:
             for cmd, shortcut in location_commands["available"]:
                 if cmd == 'port' or shortcut == 'p':
                     port_is_available = True
-                    self.port_system.update_passengers(self.current_location.name)
+                    self.port_system.update_passengers(self.current_location.handle)
             
             # Create list of valid actions
             valid_actions = []
@@ -1950,7 +2888,7 @@ class Game:
                 valid_actions.extend([cmd, shortcut])
             
             # Add global commands
-            valid_actions.extend(['quit', 'q', 'resign', 'rs', 'version', 'v'])
+            valid_actions.extend(['quit', 'q', 'resign', 'rs', 'version', 'v', 'save', 'sv'])
             valid_actions.extend(['log', 'l'])  # Add but don't show in command hints
 
             action = self.validate_input("Choose action: ", valid_actions)
@@ -2118,14 +3056,24 @@ class Game:
                 return    # Return after showing log to avoid counting it as a turn
 
             elif action in ['version', 'v']:
-                display_logo(logo_data, centered=True)
-                print_centered_text("")
-                print_centered_text("Created by Dan Sandner")
-                print_centered_text("v1.0.2, ©2025")
+                display_logo(logo_data, centered=True, out=self.io.write)
+                print_centered_text("", out=self.io.write)
+                print_centered_text("Created by Dan Sandner", out=self.io.write)
+                print_centered_text("v1.0.2, ©2025", out=self.io.write)
 
-                time.sleep(3)
+                self.io.sleep(3)
                 return    
 
+            elif action in ['save', 'sv']:
+                self.display_simple_message("Save file (Enter for cargo.sav): ", 0)
+                path = self.io.read(">>> ").strip() or "cargo.sav"
+                try:
+                    self.save_game(path)
+                    self.display_simple_message(f"Game saved to {path}.")
+                except OSError as e:
+                    self.display_simple_message(f"Could not save game: {e}")
+                return
+
             # Handle quit and resign commands
             elif action in ['quit', 'q']:
                 if self.validate_input("Are you sure you want to quit? (yes/no): ", ['yes', 'no']) == 'yes':
@@ -2143,7 +3091,7 @@ class Game:
                 # Update passenger satisfaction at end of turn if port is available
                 if port_is_available:
                     self.port_system.update_passenger_satisfaction()
-                self.turn += 1
+                self.advance_turn()
                 self.random_event()
                 self.shop.reset_turn()  # Reset shop state at end of each turn 
                 return
@@ -2168,7 +3116,7 @@ class Game:
 
     def handle_medical_emergency(self):
         """Handle medical emergency event"""
-        cost = random.randint(500, 1500)
+        cost = self.event_rng.randint(500, 1500)
         if self.ship.money >= cost:
             self.ship.money -= cost
             self.display_simple_message(f"Medical emergency handled! Cost: {self.format_money(cost)}")
@@ -2181,7 +3129,7 @@ class Game:
 
     def handle_vip_request(self):
         """Handle VIP passenger request"""
-        cost = random.randint(1000, 2000)
+        cost = self.event_rng.randint(1000, 2000)
         if self.ship.money >= cost:
             self.ship.money -= cost
             self.ship.passenger_reputation += 2
@@ -2200,6 +3148,7 @@ class Game:
         """Unlock a new type of location and add its instances to available locations"""
         if location_type not in self.unlocked_location_types:
             self.unlocked_location_types.add(location_type)
+            self.events.publish(EVENT_DISCOVERY)
             
             # Add locations from hidden pool
             if location_type in self.hidden_locations:
@@ -2225,7 +3174,8 @@ class Game:
             if hasattr(self, 'chapter_locations'):
                 for chapter in self.chapter_locations.values():
                     if location_type in chapter:
-                        self.locations.extend(chapter[location_type])                
+                        self.locations.extend(chapter[location_type])
+                        self.events.publish(EVENT_DISCOVERY)
 
     def handle_building_construction(self, building_name, building_costs):
         """Handle building construction with proper capability checking and building process"""
@@ -2264,7 +3214,7 @@ class Game:
         
         # Get base cost and calculate final cost
         base_cost = building_costs.get(base_type, 3000)
-        cost_multiplier = self.current_location.buildings.count(full_building_name) + 1
+        cost_multiplier = self.current_location.count_buildings(full_building_name) + 1
         final_cost = base_cost * cost_multiplier
 
         # Debug info
@@ -2284,7 +3234,8 @@ class Game:
         self.ship.money -= final_cost
 
         # Add building directly to location's building list
-        self.current_location.buildings.append(full_building_name)
+        self.current_location.add_building(full_building_name)
+        self.events.publish(EVENT_BUILDINGS)
 
         # Apply building effects
         if full_building_name == "Mining Facility":
@@ -2310,24 +3261,19 @@ class Game:
 
     def travel_to_location(self, location_name):
         """Handle travel to a new location"""
-        # Convert input to lowercase for case-insensitive comparison
-        target_name = location_name.lower()
-        
-        # Find location by exact name match
-        found_location = None
-        for location in self.locations:
-            if location.name.lower() == target_name:
-                found_location = location
-                break
-        
+        # Case-insensitive name lookup
+        found_location = self.locations.get(location_name)
+
         if found_location:
             old_location = self.current_location
             self.current_location = found_location
+            self.observe_market(found_location)
 
             # Initialize and update discovered locations
             if not hasattr(self, 'discovered_locations'):
                 self.discovered_locations = set([old_location.name])
             self.discovered_locations.add(found_location.name)
+            self.events.publish(EVENT_DISCOVERY)
 
             self.display_simple_message(f"Traveled to {found_location.name}.")
             
@@ -2338,6 +3284,7 @@ class Game:
             if found_location.name not in self.known_locations:
                 base_research = found_location.research_points
                 self.known_locations.append(found_location.name)
+                self.events.publish(EVENT_DISCOVERY)
                 # Trigger location discovery event
                 if hasattr(self, 'location_manager'):
                     self.location_manager.handle_location_discovery(found_location)
@@ -2383,7 +3330,7 @@ class Game:
             else:
                 self.display_simple_message(f"Gained {total_gain} research points from salvaged debris!")
             
-            self.turn += 1
+            self.advance_turn()
             self.shop.reset_turn()
             self.random_event()
             return True
@@ -2392,7 +3339,7 @@ class Game:
             if "navcomp" in self.ship.items:
                 self.display_simple_message("Location not found. Known locations:")
                 for i, loc in enumerate(self.known_locations, 1):
-                    print(f"{i}. {loc}")
+                    self.io.write(f"{i}. {loc}")
             else:
                 self.display_simple_message(f"Location '{location_name}' not found or not yet discovered.")
             return False
@@ -2416,7 +3363,7 @@ class Game:
         action_content = [["Actions:", "Cost/Description"]]
         for action, description in available_actions.items():
             action_content.append([action, description])
-        print(self.create_box(action_content, 'single'))
+        self.io.write(self.create_box(action_content, 'single'))
 
         # Get user choice
         action = self.validate_input(
@@ -2456,7 +3403,7 @@ class Game:
                 desc = research_descriptions.get(opt, "No description available")
                 research_content.append([opt, str(cost), desc])
             
-            print(self.create_box(research_content, 'single'))
+            self.io.write(self.create_box(research_content, 'single'))
                 
             option = self.validate_input(
                 f"Choose research option ({', '.join(options)}): ",
@@ -2518,7 +3465,7 @@ class Game:
                     if commodity not in self.current_location.banned_commodities:
                         market_content.append([commodity.capitalize(), 
                                         str(self.format_money(self.current_location.market[commodity]))])
-                print(self.create_box(market_content, 'single'))
+                self.io.write(self.create_box(market_content, 'single'))
                 
                 commodity = self.validate_input(
                     "Choose commodity to manipulate (tech/agri/salt/fuel): ",
@@ -2551,8 +3498,8 @@ class Game:
         else:
             status_content.append(["No research completed", ""])
             
-        print(self.create_box(status_content, 'double'))
-        time.sleep(3)
+        self.io.write(self.create_box(status_content, 'double'))
+        self.io.sleep(3)
         
     def get_research_benefit_description(self, research):
         """Get description of research benefit"""
@@ -2662,14 +3609,14 @@ class Game:
         """Enhanced random event handler with complete implementation"""
 
         # Add character encounter chance first
-        if random.random() < 0.15:  # 15% chance for character encounter
+        if self.event_rng.random() < 0.15:  # 15% chance for character encounter
             self.character_encounters.trigger_random_encounter("Space")
             return  # Return to avoid multiple events per turn
 
         # Add passenger-related events
         if hasattr(self.ship, 'passenger_modules') and any(m.passengers for m in self.ship.passenger_modules):
             # 10% chance of passenger event if carrying passengers
-            if random.random() < 0.1:
+            if self.event_rng.random() < 0.1:
                 passenger_events = [
                     "Passenger celebration boosts morale!",
                     "Passenger complaint about accommodations!",
@@ -2677,7 +3624,7 @@ class Game:
                     "VIP passenger requests special treatment!",
                     "Passengers share valuable trade information!"
                 ]
-                event = random.choice(passenger_events)
+                event = self.event_rng.choice(passenger_events)
                 
                 if "celebration" in event:
                     self.handle_passenger_celebration()
@@ -2741,8 +3688,8 @@ class Game:
         # Select event category based on modifiers
         categories = list(events.keys())
         weights = [modifiers[cat] for cat in categories]
-        category = random.choices(categories, weights=weights)[0]
-        event = random.choice(events[category])
+        category = self.event_rng.choices(categories, weights=weights)[0]
+        event = self.event_rng.choice(events[category])
         
         # Record event
         event_result = {
@@ -2779,7 +3726,7 @@ class Game:
         self.quest_system.check_event_requirements(event_result)
 
         # Generate new quest if appropriate
-        if random.random() < 0.2:  # 20% chance for event-based quest
+        if self.event_rng.random() < 0.2:  # 20% chance for event-based quest
             quest = self.generate_event_quest(event_result, outcome_details)
             if quest:
                 self.quest_system.add_quest(quest)
@@ -2812,7 +3759,7 @@ class Game:
                         "requirements": {"patrol_turns": 5}
                     }
                 ]
-                template = random.choice(quest_templates)
+                template = self.event_rng.choice(quest_templates)
                 quest = Quest(
                     name=template["name"],
                     description=template["description"],
@@ -2889,16 +3836,16 @@ class Game:
         if isinstance(location, AsteroidBase):
             if event_type == "disaster":
                 # Asteroid bases might discover new mining opportunities after disasters
-                if random.random() < 0.2:
-                    mineral_type = random.choice(["salt", "fuel"])
-                    amount = random.randint(1000, 3000)
+                if self.event_rng.random() < 0.2:
+                    mineral_type = self.event_rng.choice(["salt", "fuel"])
+                    amount = self.event_rng.randint(1000, 3000)
                     location.mineral_deposits[mineral_type] = location.mineral_deposits.get(mineral_type, 0) + amount
                     self.display_simple_message(f"The disaster revealed new {mineral_type} deposits!")
                     
         elif isinstance(location, ResearchColony):
             if event_type == "exploration":
                 # Research colonies might gain research points from exploration events
-                bonus_points = random.randint(10, 30)
+                bonus_points = self.event_rng.randint(10, 30)
                 self.ship.research_points += bonus_points
                 self.display_simple_message(f"Colony researchers analyzed the phenomenon: +{bonus_points} RP")
 
@@ -2978,12 +3925,12 @@ class Game:
         enemy_type = scenario["enemy_type"]
         
         # Check for automatic defense
-        if "turrets" in self.ship.items and random.random() < 0.4:
+        if "turrets" in self.ship.items and self.combat_rng.random() < 0.4:
             self.display_simple_message(f"Event! {event} repelled by defense systems!", 3, color='32')
             # Count automatic defense as a victory and add reputation
             self.ship.record_combat_victory(enemy_type)
             if enemy_type == "pirate":
-                rep_gain = random.randint(1, 3)  # Smaller gain for automated defense
+                rep_gain = self.combat_rng.randint(1, 3)  # Smaller gain for automated defense
                 self.reputation += rep_gain
                 self.ship.passenger_reputation += rep_gain
                 self.display_simple_message(f"Gained {rep_gain} reputation for automated pirate defense!")
@@ -2992,7 +3939,7 @@ class Game:
             return
         
         # Calculate base damage
-        damage = random.randint(10, 25) * scenario["atk"] / self.ship.defense
+        damage = self.combat_rng.randint(10, 25) * scenario["atk"] / self.ship.defense
         damage *= (1 + self.difficulty)
         
         # Apply defensive equipment effects
@@ -3010,14 +3957,14 @@ class Game:
         losses = []
         
         if self.ship.money > 0:
-            stolen = random.randint(1, max(1, int(self.ship.money // 2)))
+            stolen = self.combat_rng.randint(1, max(1, int(self.ship.money // 2)))
             self.ship.money -= stolen
             losses.append(f"{self.format_money(stolen)} credits")
         
         # Only steal cargo that exists
         for cargo_type in ['tech', 'agri', 'salt', 'fuel']:
             if self.ship.cargo[cargo_type] > 0:
-                stolen_cargo = random.randint(1, max(1, int(self.ship.cargo[cargo_type] // 3)))
+                stolen_cargo = self.combat_rng.randint(1, max(1, int(self.ship.cargo[cargo_type] // 3)))
                 self.ship.cargo[cargo_type] -= stolen_cargo
                 if stolen_cargo > 0:
                     losses.append(f"{stolen_cargo} {cargo_type}")
@@ -3029,8 +3976,8 @@ class Game:
             
             reward_mult = scenario["reward_mult"]
             rewards = {
-                "money": int(random.randint(100, 500) * reward_mult),
-                "research": int(random.randint(10, 25) * reward_mult)
+                "money": int(self.combat_rng.randint(100, 500) * reward_mult),
+                "research": int(self.combat_rng.randint(10, 25) * reward_mult)
             }
             
             self.ship.money += rewards["money"]
@@ -3038,7 +3985,7 @@ class Game:
             
             # Add reputation gains for pirate victories
             if enemy_type == "pirate":
-                rep_gain = random.randint(2, 5)
+                rep_gain = self.combat_rng.randint(2, 5)
                 self.reputation += rep_gain
                 self.ship.passenger_reputation += rep_gain
                 rep_message = f"\nReputation increased by {rep_gain} for defeating pirates!"
@@ -3066,7 +4013,7 @@ class Game:
             
             # Lose reputation on pirate defeats
             if enemy_type == "pirate":
-                rep_loss = random.randint(1, 3)
+                rep_loss = self.combat_rng.randint(1, 3)
                 self.reputation = max(0, self.reputation - rep_loss)
                 self.ship.passenger_reputation = max(0, self.ship.passenger_reputation - rep_loss)
                 rep_message = f"\nLost {rep_loss} reputation from pirate defeat!"
@@ -3106,7 +4053,7 @@ class Game:
         }
         success_chance += location_modifiers.get(self.current_location.location_type, 0)
         
-        if random.random() < success_chance:
+        if self.event_rng.random() < success_chance:
             # Determine discovery type and rewards
             discovery_types = [
                 ("Valuable minerals", 
@@ -3119,7 +4066,7 @@ class Game:
                 {"money": (3000, 7000), "research_points": (25, 45)})
             ]
             
-            discovery, reward_ranges = random.choice(discovery_types)
+            discovery, reward_ranges = self.event_rng.choice(discovery_types)
             
             # Calculate rewards with location and rank bonuses
             rank_multiplier = {
@@ -3138,23 +4085,23 @@ class Game:
                 location_bonus = 1.5
             
             # Apply rewards
-            money_reward = random.randint(*reward_ranges["money"])
+            money_reward = self.event_rng.randint(*reward_ranges["money"])
             money_reward = int(money_reward * rank_multiplier * location_bonus)
             self.ship.money += money_reward
             
-            rp_reward = random.randint(*reward_ranges["research_points"])
+            rp_reward = self.event_rng.randint(*reward_ranges["research_points"])
             rp_reward = int(rp_reward * rank_multiplier * location_bonus)
             self.ship.research_points += rp_reward
             
             # Special discovery effects
             if discovery == "Ancient artifacts":
                 self.story_manager.plot_points += 2
-                if random.random() < 0.3:  # 30% chance
+                if self.event_rng.random() < 0.3:  # 30% chance
                     self.quest_system.generate_quest("exploration", 1.5)
                     
             elif discovery == "Advanced technology":
-                if random.random() < 0.4:  # 40% chance
-                    tech_bonus = random.choice(["attack", "defense", "speed"])
+                if self.event_rng.random() < 0.4:  # 40% chance
+                    tech_bonus = self.event_rng.choice(["attack", "defense", "speed"])
                     self.ship.upgrade_property(tech_bonus, 1)
                     self.display_simple_message(f"The technology improved your ship's {tech_bonus}!")
             
@@ -3166,7 +4113,7 @@ class Game:
             
         else:
             # Handle exploration failure
-            damage = random.randint(5, 15)
+            damage = self.event_rng.randint(5, 15)
             self.ship.damage = min(99, self.ship.damage + damage)
             
             self.display_simple_message([
@@ -3182,7 +4129,7 @@ class Game:
         # Build complete trade event data
         trade_data = {
             "action": action_type,
-            "location": self.current_location.name,
+            "location": self.current_location.handle,
             "turn": self.turn,
             "trade_completed": True,
         }
@@ -3205,13 +4152,13 @@ class Game:
 
     def handle_passenger_delivery(self, passenger, module):
         """Handle passenger delivery completion"""
-        if not passenger.destination == self.current_location.name:
+        if not passenger.destination == self.current_location.handle:
             return False
             
         # Build passenger delivery event data
         delivery_data = {
             "action": "passenger_delivery",
-            "location": self.current_location.name,
+            "location": self.current_location.handle,
             "turn": self.turn,
             "passenger_data": {
                 "class": passenger.classification["code"],
@@ -3281,12 +4228,12 @@ class Game:
         
         # Select affected commodities
         commodities = ["tech", "agri", "salt", "fuel"]
-        num_affected = random.randint(1, len(commodities))
-        affected_commodities = random.sample(commodities, num_affected)
+        num_affected = self.event_rng.randint(1, len(commodities))
+        affected_commodities = self.event_rng.sample(commodities, num_affected)
         
         # Apply market effects
         for commodity in affected_commodities:
-            impact = random.uniform(*event_data["price_impact"])
+            impact = self.event_rng.uniform(*event_data["price_impact"])
             current_price = self.current_location.market[commodity]
             
             # Calculate new price
@@ -3304,7 +4251,7 @@ class Game:
             
             # Add temporary trade ban if price would be too low
             if new_price < 10:
-                duration = random.randint(*event_data["duration"])
+                duration = self.event_rng.randint(*event_data["duration"])
                 self.current_location.add_temporary_ban(commodity, duration)
         
         # Generate message based on severity
@@ -3321,7 +4268,7 @@ class Game:
         ])
         
         # Possible quest generation
-        if event_data["severity"] == "major" and random.random() < 0.3:
+        if event_data["severity"] == "major" and self.event_rng.random() < 0.3:
             self.quest_system.generate_quest("trade", 1.5)                
 
     def handle_disaster_event(self, event):
@@ -3370,11 +4317,11 @@ class Game:
         
         # Calculate base damage
         min_damage, max_damage = scenario["base_damage"]
-        damage = random.randint(min_damage, max_damage)
+        damage = self.event_rng.randint(min_damage, max_damage)
         
         # Apply shield protection if available
         if "shield" in self.ship.items and scenario["shield_protection"] > 0:
-            if random.random() < scenario["shield_protection"]:
+            if self.event_rng.random() < scenario["shield_protection"]:
                 damage = int(damage * 0.4)  # 60% reduction when shields work
                 self.display_simple_message("Shields partially mitigated the disaster!", 2, color='32')
         
@@ -3386,7 +4333,7 @@ class Game:
             cargo_lost = False
             for cargo_type in ['tech', 'agri', 'salt', 'fuel']:
                 if self.ship.cargo[cargo_type] > 0:
-                    lost = random.randint(1, max(1, int(self.ship.cargo[cargo_type] // 2)))
+                    lost = self.event_rng.randint(1, max(1, int(self.ship.cargo[cargo_type] // 2)))
                     self.ship.cargo[cargo_type] = max(0, self.ship.cargo[cargo_type] - lost)
                     if lost > 0:
                         cargo_lost = True
@@ -3397,11 +4344,12 @@ class Game:
         
         # Handle equipment failure
         if scenario["equipment_failure"]:
-            if self.ship.items and random.random() < 0.3:
-                item = random.choice(list(self.ship.items.keys()))
+            if self.ship.items and self.event_rng.random() < 0.3:
+                item = self.event_rng.choice(list(self.ship.items.keys()))
                 self.ship.items[item] -= 1
                 if self.ship.items[item] <= 0:
                     del self.ship.items[item]
+                self.events.publish(EVENT_SHIP)
                 self.display_simple_message(f"Equipment failure! Lost {item}!", 2, color='31')
         
         # Display final disaster results
@@ -3411,8 +4359,8 @@ class Game:
         )
         
         # Check for repair opportunity
-        if "repair_bot" in self.ship.items and random.random() < 0.4:
-            repair = random.randint(5, 15)
+        if "repair_bot" in self.ship.items and self.event_rng.random() < 0.4:
+            repair = self.event_rng.randint(5, 15)
             self.ship.damage = max(0, self.ship.damage - repair)
             self.display_simple_message(
                 f"Repair bot automatically fixed {repair}% damage!",
@@ -3420,46 +4368,46 @@ class Game:
             )
 
     def gravitational_anomaly_event(self):
-        print("You have encountered a gravitational anomaly!")
-        outcome = random.choice(["rare elements", "scientific samples"])
+        self.io.write("You have encountered a gravitational anomaly!")
+        outcome = self.event_rng.choice(["rare elements", "scientific samples"])
         if outcome == "rare elements":
-            tech_goods = random.randint(5, 15)
+            tech_goods = self.event_rng.randint(5, 15)
             self.ship.cargo['tech'] += tech_goods
             self.display_simple_message(f"You found {self.format_money(tech_goods)} tech goods.", 3, color='32')
         elif outcome == "scientific samples":
-            research_points = random.randint(5, 15)
+            research_points = self.event_rng.randint(5, 15)
             self.ship.research_points+= research_points
             self.display_simple_message(f"You gained {self.format_money(research_points)} research points.", 3, color='32')
 
     def battle_event(self, enemy_attack, enemy_defense, enemy_speed):
-        print(f"An enemy is attacking! Enemy stats: ATK {enemy_attack}, DEF {enemy_defense}, SPD {enemy_speed}")
+        self.io.write(f"An enemy is attacking! Enemy stats: ATK {enemy_attack}, DEF {enemy_defense}, SPD {enemy_speed}")
 
         player_damage = max(0, enemy_attack - self.ship.defense)
         enemy_damage = max(0, self.ship.attack - enemy_defense)
 
         if self.ship.speed > enemy_speed:
-            print("You have the speed advantage!")
+            self.io.write("You have the speed advantage!")
             enemy_damage += 5
         elif self.ship.speed < enemy_speed:
-            print("Enemy has the speed advantage!")
+            self.io.write("Enemy has the speed advantage!")
             player_damage += 5
 
         # Introduce randomness based on stats
-        if random.random() < 0.5:
-            player_damage = max(0, player_damage - random.randint(0, self.ship.defense))
-        if random.random() < 0.5:
-            enemy_damage = max(0, enemy_damage - random.randint(0, enemy_defense))
+        if self.combat_rng.random() < 0.5:
+            player_damage = max(0, player_damage - self.combat_rng.randint(0, self.ship.defense))
+        if self.combat_rng.random() < 0.5:
+            enemy_damage = max(0, enemy_damage - self.combat_rng.randint(0, enemy_defense))
 
-        print(f"You deal {enemy_damage} damage to the enemy.")
-        print(f"The enemy deals {player_damage} damage to you.")
+        self.io.write(f"You deal {enemy_damage} damage to the enemy.")
+        self.io.write(f"The enemy deals {player_damage} damage to you.")
 
         if enemy_damage > player_damage:
-            print("You won the battle!")
-            reward = random.choice([
-                ("money", random.randint(100, 500)),
-                ("tech", random.randint(5, 15)),
-                ("agri", random.randint(5, 15)),
-                ("item", random.choice(["navcomp", "shield", "turrets", "scanner"]))
+            self.io.write("You won the battle!")
+            reward = self.combat_rng.choice([
+                ("money", self.combat_rng.randint(100, 500)),
+                ("tech", self.combat_rng.randint(5, 15)),
+                ("agri", self.combat_rng.randint(5, 15)),
+                ("item", self.combat_rng.choice(["navcomp", "shield", "turrets", "scanner"]))
             ])
             if reward[0] == "money":
                 self.ship.money += reward[1]
@@ -3474,12 +4422,12 @@ class Game:
                 self.ship.acquire_item(reward[1])
                 self.display_simple_message(f"Reward: {reward[1]} item", 3, color='32')
         else:
-            print("You lost the battle!")
-            penalty = random.choice([
-                ("money", random.randint(50, 200)),
-                ("tech", random.randint(2, 10)),
-                ("agri", random.randint(2, 10)),
-                ("damage", random.randint(10, 30))
+            self.io.write("You lost the battle!")
+            penalty = self.combat_rng.choice([
+                ("money", self.combat_rng.randint(50, 200)),
+                ("tech", self.combat_rng.randint(2, 10)),
+                ("agri", self.combat_rng.randint(2, 10)),
+                ("damage", self.combat_rng.randint(10, 30))
             ])
             if penalty[0] == "money":
                 self.ship.money = max(0, self.ship.money - penalty[1])
@@ -3504,9 +4452,9 @@ class Game:
         if enemy_type == "rogue_captain":
             # Add special rewards for defeating rogue captain
             if enemy_attack < self.ship.attack:
-                self.ship.money += random.randint(2000, 5000)
+                self.ship.money += self.combat_rng.randint(2000, 5000)
                 special_items = ["quantum_core", "advanced_shield", "neural_hack"]
-                self.ship.acquire_item(random.choice(special_items))
+                self.ship.acquire_item(self.combat_rng.choice(special_items))
 
     def conduct_research_activity(self, activity_type):
         """Handle research activities for quests"""
@@ -3552,7 +4500,7 @@ class Game:
 
         # Show current research points and colony specialization
         specialization = getattr(self.current_location, 'research_specialization', 
-                            random.choice(['quantum', 'xenology', 'engineering', 'temporal']))
+                            self.research_rng.choice(['quantum', 'xenology', 'engineering', 'temporal']))
         self.current_location.research_specialization = specialization
         
         research_content = [
@@ -3565,7 +4513,7 @@ class Game:
             ["3. Breakthrough (100 RP) - Major discovery attempt"],
             ["4. Collaborate (30 RP) - Work with colony scientists"]
         ]
-        print(self.create_box(research_content, 'double'))
+        self.io.write(self.create_box(research_content, 'double'))
 
         choice = self.validate_input(
             "Choose research action (1-4, or 'back'): ",
@@ -3594,8 +4542,8 @@ class Game:
         self.ship.research_points -= cost
         
         # Base rewards
-        tech_bonus = random.randint(5, 15)
-        money_bonus = random.randint(500, 1500)
+        tech_bonus = self.research_rng.randint(5, 15)
+        money_bonus = self.research_rng.randint(500, 1500)
         
         # Specialization bonuses
         if specialization == 'quantum':
@@ -3604,8 +4552,8 @@ class Game:
             money_bonus *= 1.5
         
         # Chance for bonus item or ship stat
-        if random.random() < 0.2:  # 20% chance for bonus
-            bonus_type = random.choice(['item', 'stat'])
+        if self.research_rng.random() < 0.2:  # 20% chance for bonus
+            bonus_type = self.research_rng.choice(['item', 'stat'])
             if bonus_type == 'item':
                 research_items = {
                     'quantum': ['quantum_analyzer', 'entanglement_core', 'quantum_shield'],
@@ -3613,11 +4561,11 @@ class Game:
                     'engineering': ['efficiency_module', 'repair_nanites', 'power_core'],
                     'temporal': ['time_dilator', 'causality_shield', 'temporal_lens']
                 }
-                item = random.choice(research_items[specialization])
+                item = self.research_rng.choice(research_items[specialization])
                 self.ship.acquire_item(item)
                 self.display_simple_message(f"Bonus research item acquired: {item}!")
             else:
-                stat = random.choice(['attack', 'defense', 'speed'])
+                stat = self.research_rng.choice(['attack', 'defense', 'speed'])
                 bonus = 1
                 if stat == 'attack':
                     self.ship.attack += bonus
@@ -3655,7 +4603,7 @@ class Game:
             ]
         }
         
-        result = random.choice(findings[specialization])
+        result = self.research_rng.choice(findings[specialization])
         
         self.ship.money += money_bonus
         self.ship.research_points += tech_bonus
@@ -3680,14 +4628,14 @@ class Game:
         if specialization == 'engineering':
             base_chance += 0.1
         
-        if random.random() < base_chance:
+        if self.research_rng.random() < base_chance:
             # Successful experiment
-            reward_mult = random.uniform(1.5, 3.0)
+            reward_mult = self.research_rng.uniform(1.5, 3.0)
             tech_bonus = int(cost * reward_mult)
             money_bonus = int(1000 * reward_mult)
             
             # Enhanced rewards
-            if random.random() < 0.4:  # 40% chance for significant bonus
+            if self.research_rng.random() < 0.4:  # 40% chance for significant bonus
                 advanced_items = {
                     'quantum': {
                         'items': ['quantum_core_v2', 'phase_shifter', 'quantum_capacitor'],
@@ -3708,14 +4656,14 @@ class Game:
                 }
                 
                 # Either get an advanced item or stat bonus
-                if random.random() < 0.5:
-                    item = random.choice(advanced_items[specialization]['items'])
+                if self.research_rng.random() < 0.5:
+                    item = self.research_rng.choice(advanced_items[specialization]['items'])
                     self.ship.acquire_item(item)
                     self.display_simple_message(f"Advanced research item acquired: {item}!")
                 else:
                     stat_bonuses = advanced_items[specialization]['stat_bonus']
                     for stat, bonus in stat_bonuses.items():
-                        if random.random() < 0.5:  # 50% chance for each stat
+                        if self.research_rng.random() < 0.5:  # 50% chance for each stat
                             if stat == 'attack':
                                 self.ship.attack += bonus
                             elif stat == 'defense':
@@ -3751,9 +4699,9 @@ class Game:
             
         else:
             # Failed experiment
-            damage = random.randint(5, 15)
+            damage = self.research_rng.randint(5, 15)
             self.ship.damage = min(99, self.ship.damage + damage)
-            lost_points = random.randint(5, 15)
+            lost_points = self.research_rng.randint(5, 15)
             self.ship.research_points = max(0, self.ship.research_points - lost_points)
             
             self.display_simple_message([
@@ -3774,7 +4722,7 @@ class Game:
         # Breakthrough chance increases with more research points spent
         breakthrough_chance = min(0.8, 0.3 + (self.ship.research_points / 1000))
         
-        if random.random() < breakthrough_chance:
+        if self.research_rng.random() < breakthrough_chance:
             # Major breakthrough
             breakthrough_rewards = {
                 'quantum': {
@@ -3819,8 +4767,8 @@ class Game:
             
         else:
             # Minor breakthrough
-            bonus_rp = random.randint(50, 150)
-            bonus_money = random.randint(5000, 15000)
+            bonus_rp = self.research_rng.randint(50, 150)
+            bonus_money = self.research_rng.randint(5000, 15000)
             
             self.ship.research_points += bonus_rp
             self.ship.money += bonus_money
@@ -3864,14 +4812,14 @@ class Game:
             ]
         }
         
-        project, multiplier = random.choice(projects[specialization])
+        project, multiplier = self.research_rng.choice(projects[specialization])
         
         # Calculate rewards
         research_gain = int(cost * multiplier)
         money_gain = int(2000 * multiplier)
         
         # Colony gains permanent bonus to future research
-        colony_bonus = random.uniform(0.05, 0.15)  # 5-15% bonus
+        colony_bonus = self.research_rng.uniform(0.05, 0.15)  # 5-15% bonus
         current_multiplier = getattr(self.current_location, 'research_multiplier', 1.0)
         self.current_location.research_multiplier = current_multiplier + colony_bonus
         
@@ -3893,6 +4841,7 @@ class Game:
                 if location.name not in self.known_locations and location.location_type in self.unlocked_location_types:
                     new_locations.append(location)
                     self.known_locations.append(location.name)
+                    self.events.publish(EVENT_DISCOVERY)
                 
             if new_locations:
                 map_content = []
@@ -3923,8 +4872,8 @@ class Game:
                     if features:
                         map_content.append(["└─ Features: " + ", ".join(features), "", "", "", ""])
                 
-                print(self.create_box(map_content, 'double'))
-                input("Press Enter to continue...")
+                self.io.write(self.create_box(map_content, 'double'))
+                self.io.wait()
             else:
                 self.ship.money += 200  # Refund if no new locations
                 self.display_simple_message("No new locations to discover!")
@@ -3944,8 +4893,9 @@ class Game:
             # Show detailed info for known locations
             has_data = False
             for location_name in self.known_locations:
-                location = next((loc for loc in self.locations if loc.name == location_name), None)
+                location = self.locations.get(location_name)
                 if location:
+                    self.observe_market(location)
                     has_data = True
                     tech_price = "BANNED" if 'tech' in location.banned_commodities else self.format_money(location.market['tech'])
                     agri_price = "BANNED" if 'agri' in location.banned_commodities else self.format_money(location.market['agri'])
@@ -3974,14 +4924,81 @@ class Game:
                             market_content.append(["└─ " + feature, "", "", "", ""])
             
             if has_data:
-                print(self.create_box(market_content, 'double'))
-                input("Press Enter to continue...")
+                self.io.write(self.create_box(market_content, 'double'))
+                self.io.wait()
             else:
                 self.ship.money += 350  # Refund if no data to show
                 self.display_simple_message("No new information available!")
         else:
             self.display_simple_message("Not enough money to update the map.")
 
+    def handle_route_planning(self):
+        """Sell the player a trade route plan over their known locations"""
+        if self.ship.money < 250:
+            self.display_simple_message("Not enough money for a route plan.")
+            return
+
+        hops = self.validate_input("How many hops ahead? (1-5): ", ['1', '2', '3', '4', '5'])
+        if hops is None:
+            return
+        self.ship.money -= 250
+
+        plan = self.route_planner.plan(int(hops))
+        if not plan["legs"]:
+            self.display_simple_message("No profitable route among your known locations.")
+            return
+
+        route_content = [["Trade Route Plan"], [""]]
+        route_content.append(["Leg", "Route", "Cargo", "Expected Credits"])
+        for i, leg in enumerate(plan["legs"], 1):
+            if leg["buy"]:
+                cargo = f"{self.format_money(leg['quantity'])} {leg['buy']} @ {self.format_money(leg['buy_price'])}"
+            else:
+                cargo = "-"
+            route_content.append([str(i), f"{leg['from']} -> {leg['to']}", cargo, self.format_money(leg["money"])])
+        route_content.append([""])
+        route_content.append([f"Expected profit: {self.format_money(plan['profit'])}"])
+        self.io.write(self.create_box(route_content, 'double'))
+
+    def handle_navigator_consult(self):
+        """Sell the player a lookahead recommendation from the navigator"""
+        if self.ship.money < 500:
+            self.display_simple_message("Not enough money to consult the navigator.")
+            return
+
+        self.display_simple_message("The navigator studies the charts...", 0)
+        if self.io.replays:
+            # A time-boxed search differs between runs; re-run actions need the same advice
+            advice = self.navigator.advise(workers=1, iterations=NAVIGATOR_REPLAY_ITERATIONS)
+        else:
+            advice = self.navigator.advise(budget=2.0)
+        self.ship.money -= 500
+
+        def describe(action):
+            verb, args = action[0], action[1:]
+            if verb == "cantina":
+                return f"Accept contract #{args[-1]}"
+            return " ".join([verb.capitalize()] + [str(arg) for arg in args])
+
+        advice_content = [["Navigator's Advice"], [""]]
+        advice_content.append([f"Recommended: {describe(advice['action'])}"])
+        advice_content.append([f"Expected gain: {self.format_money(int(advice['value']))} points"])
+        advice_content.append([f"Confidence: {advice['confidence']:.0%}"])
+        advice_content.append([""])
+        advice_content.append(["Alternatives", "Expected Gain", "Trials"])
+        for alternative in advice["alternatives"][1:4]:
+            advice_content.append([describe(alternative["action"]),
+                                   self.format_money(int(alternative["value"])),
+                                   str(alternative["visits"])])
+        advice_content.append([""])
+        if self.io.replays:
+            advice_content.append([f"{advice['iterations']} futures simulated"])
+        else:
+            advice_content.append([f"{advice['iterations']} futures simulated in {advice['elapsed']:.1f}s"])
+        if advice['failures']:
+            advice_content.append([f"{advice['failures']} futures ended in an error"])
+        self.io.write(self.create_box(advice_content, 'double'))
+
     def handle_gossip(self):
         """Handle gossip and quest generation in cantina"""
         if self.ship.money >= 150:
@@ -3991,29 +5008,36 @@ class Game:
             
             # Generate market information
             found_gossip = False
-            for location in self.locations:
-                if location.name in self.known_locations:
-                    location_gossip = []
-                    if location.market['tech'] < 50:
-                        location_gossip.append(f"Cheap tech goods available")
-                    if location.market['agri'] < 30:
-                        location_gossip.append(f"Cheap agri goods available")
-                    if location.market['tech'] > 100:
-                        location_gossip.append(f"High tech prices")
-                    if location.market['agri'] > 80:
-                        location_gossip.append(f"High agri prices")
-                            
-                    if location_gossip:
-                        found_gossip = True
-                        gossip_content.append([location.name])
-                        for gossip in location_gossip:
-                            gossip_content.append([f"└─ {gossip}"])
+            for location in self.locations.among(self.known_locations):
+                self.observe_market(location)
+                location_gossip = []
+                if location.market['tech'] < 50:
+                    location_gossip.append(f"Cheap tech goods available")
+                if location.market['agri'] < 30:
+                    location_gossip.append(f"Cheap agri goods available")
+                if location.market['tech'] > 100:
+                    location_gossip.append(f"High tech prices")
+                if location.market['agri'] > 80:
+                    location_gossip.append(f"High agri prices")
+                for commodity in ['tech', 'agri']:
+                    recent = location.market_stats(commodity, window=5)
+                    if recent["samples"] >= 3:
+                        if location.market[commodity] > recent["mean"] * 1.1:
+                            location_gossip.append(f"{commodity.capitalize()} prices climbing")
+                        elif location.market[commodity] < recent["mean"] * 0.9:
+                            location_gossip.append(f"{commodity.capitalize()} prices sliding")
+                        
+                if location_gossip:
+                    found_gossip = True
+                    gossip_content.append([location.name])
+                    for gossip in location_gossip:
+                        gossip_content.append([f"└─ {gossip}"])
                 
             if found_gossip:
-                print(self.create_box(gossip_content, 'double'))
+                self.io.write(self.create_box(gossip_content, 'double'))
                 
                 # 30% chance to get a quest
-                if random.random() < 0.3:
+                if self.rng.random() < 0.3:
                     quest = self.quest_system.generate_cantina_quest()
                     if quest:
                         self.quest_system.add_quest(quest)
@@ -4059,8 +5083,8 @@ class Game:
             for loc_type, count in self.story_manager.discovered_locations_by_type.items():
                 story_content.append([f"• {loc_type}: {count} discovered"])
         
-        print(self.create_box(story_content, 'double'))
-        input("Press Enter to continue...")
+        self.io.write(self.create_box(story_content, 'double'))
+        self.io.wait()
 
     def visit_cantina(self):
         self.clear_screen()
@@ -4075,7 +5099,7 @@ class Game:
         if present_characters:
             for char in present_characters:
                 self.character_manager.announce_character(char['character'].character_id)
-                time.sleep(1)  # Brief pause between character announcements
+                self.io.sleep(1)  # Brief pause between character announcements
 
         # Check and complete cantina quests
         cantina_quests = [q for q in self.quest_system.active_quests if q.quest_type == "cantina"]
@@ -4089,6 +5113,8 @@ class Game:
                 'map': ('bm', "Buy Map"),
                 'update': ('um', "Update Map"),
                 'gossip': ('lg', "Listen to Gossip"),
+                'routes': ('rp', "Plan Trade Route"),
+                'navigator': ('n', "Consult Navigator"),
                 'quests': ('q', "View Quests"),
                 'contracts': ('c', "Manage Contracts"),
                 'story': ('s', "View Story Progress"),
@@ -4099,7 +5125,7 @@ class Game:
             menu_content.append([f""])
             for cmd, (shortcut, desc) in options.items():
                 menu_content.append([f"{cmd}/{shortcut if shortcut else ''}: {desc}"])
-            print(self.create_box(menu_content, 'single'))
+            self.io.write(self.create_box(menu_content, 'single'))
 
             valid_inputs = [cmd for cmd in options.keys()] + [s[0] for s in options.values() if s[0]]
             action = self.validate_input("Choose action: ", valid_inputs)
@@ -4115,6 +5141,12 @@ class Game:
                 
             elif action in ['gossip', 'lg']:
                 self.handle_gossip()
+
+            elif action in ['routes', 'rp']:
+                self.handle_route_planning()
+
+            elif action in ['navigator', 'n']:
+                self.handle_navigator_consult()
                 
             elif action in ['quests', 'q']:
                 self.quest_system.display_quests()
@@ -4125,7 +5157,7 @@ class Game:
             elif action in ['story', 's']:
                 self.display_story_status()
 
-            time.sleep(1)
+            self.io.sleep(1)
             self.clear_screen()
 
     def visit_shop(self):
@@ -4137,7 +5169,7 @@ class Game:
             [f"Credits: {self.format_money(self.ship.money)}"],
             [f"Tech Level: {self.current_location.tech_level}"]
         ]
-        print(self.create_box(status_content, 'single'))
+        self.io.write(self.create_box(status_content, 'single'))
 
         # Display current inventory
         inventory_content = [["Your Items"]]
@@ -4146,7 +5178,7 @@ class Game:
                 inventory_content.append([f"{item}: {count}"])
         else:
             inventory_content.append(["No items"])
-        print(self.create_box(inventory_content, 'single'))
+        self.io.write(self.create_box(inventory_content, 'single'))
 
         # Get available items for this location
         if not hasattr(self.shop, 'current_turn_items') or not self.shop.current_turn_items:  # Changed condition
@@ -4157,10 +5189,7 @@ class Game:
             )
 
         # Get terminal width
-        try:
-            term_width = os.get_terminal_size().columns
-        except OSError:
-            term_width = 80
+        term_width = self.io.layout.width()
 
         # Adjust display based on terminal width
         if term_width < 80:  # Narrow display
@@ -4200,7 +5229,7 @@ class Game:
                     status
                 ])
         
-        print(self.create_box(shop_content, 'double'))
+        self.io.write(self.create_box(shop_content, 'double'))
 
         # Only show unsold items in options
         available_items_names = [
@@ -4242,7 +5271,7 @@ class Game:
                     ])
                 return
 
-        time.sleep(1)
+        self.io.sleep(1)
 
     def handle_mining(self):
         """Handle mining-related actions"""
@@ -4282,7 +5311,7 @@ class Game:
             for deposit, amount in self.current_location.mineral_deposits.items():
                 content.append([f"{deposit.capitalize()}: {amount} units"])
                 
-        print(self.create_box(content, 'double'))
+        self.io.write(self.create_box(content, 'double'))
 
 
     def check_quest_story_impact(self, quest):
@@ -4333,7 +5362,7 @@ class Game:
                 self.story_manager.complete_milestone("defend_miners")
 
         # Research milestones
-        if any(isinstance(loc, ResearchColony) for loc in self.locations):
+        if self.locations.of_type("ResearchColony"):
             self.story_manager.complete_milestone("research_hub")
         if len(self.research.unlocked_options) >= 3:
             self.story_manager.complete_milestone("tech_breakthrough")
@@ -4342,12 +5371,16 @@ class Game:
     
     # ... The end score ...
 
+    def calculate_final_score(self):
+        """Money plus cargo valued at fixed per-unit rates"""
+        total_cargo_value = (self.ship.cargo['tech'] * 10) + (self.ship.cargo['agri'] * 5) + \
+                           (self.ship.cargo['salt'] * 15) + (self.ship.cargo['fuel'] * 20)
+        return self.ship.money + total_cargo_value
+
     def display_score(self):
         """Display final game score and statistics in a formatted box"""
         # Calculate final statistics
-        total_cargo_value = (self.ship.cargo['tech'] * 10) + (self.ship.cargo['agri'] * 5) + \
-                           (self.ship.cargo['salt'] * 15) + (self.ship.cargo['fuel'] * 20)
-        final_score = self.ship.money + total_cargo_value
+        final_score = self.calculate_final_score()
         efficiency_score = (final_score / self.turn) if self.turn > 0 else final_score
         
         # Create score content
@@ -4394,7 +5427,7 @@ class Game:
 
         # Create the box with double borders for emphasis
         fancy_box = self.create_box(score_content, 'double')
-        print(fancy_box)
+        self.io.write(fancy_box)
 
         # Display achievement message
         achievement_msg = self.get_achievement_message(final_score)
@@ -4456,96 +5489,370 @@ class Game:
         else:
             return 1
 
-    def play(self):
-        while True:
-            # Play a turn
-            turn_result = self.play_turn()
-            
-            # Check if player quit or resigned
-            if turn_result == "quit":
-                self.display_simple_message("Thanks for playing!")
-                break
-            elif turn_result == "resign":
-                self.display_simple_message("Resigning from current game...")
-                self.display_score()
-                break
-                
+    def check_game_over(self):
+        """Return the game over cause ('bankrupt' or 'destroyed'), or None"""
+        if self.ship.money <= 0 and self.ship.is_empty_cargo():
+            return "bankrupt"
+        if self.ship.damage >= 100:
+            return "destroyed"
+        return None
+
+    # Snapshots: everything but the I/O backend, in the versioned SNAPSHOT_* format
+    def __getstate__(self):
+        """Snapshots leave out the I/O backend and the open autosave journal"""
+        state = self.__dict__.copy()
+        state.pop('io', None)
+        state.pop('autosave', None)
+        state.pop('shared_tables', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.io = IOBackend()  # Headless until the caller attaches a backend
+
+    def save_snapshot(self, compress=False):
+        """Serialize the complete game state to bytes; compression trades time for size"""
+        buffer = BytesIO()
+        SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(self)
+        payload = buffer.getbuffer()
+        flags = 0
+        if compress:
+            payload = zlib.compress(payload, 1)
+            flags |= SNAPSHOT_COMPRESSED
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, zlib.crc32(payload))
+        return header + payload
+
+    @classmethod
+    def load_snapshot(cls, data, io=None):
+        """Rebuild a game from save_snapshot() bytes, attached to a new I/O backend"""
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise SnapshotError("Snapshot is truncated")
+        magic, version, flags, checksum = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a Cargo snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+        payload = memoryview(data)[SNAPSHOT_HEADER.size:]
+        if zlib.crc32(payload) != checksum:
+            raise SnapshotError("Snapshot checksum mismatch")
+        if flags & SNAPSHOT_COMPRESSED:
+            payload = zlib.decompress(payload)
+        game = SnapshotUnpickler(BytesIO(payload)).load()
+        if not isinstance(game, cls):
+            raise SnapshotError("Snapshot does not contain a game")
+        game.io = io if io is not None else TerminalIO()
+        return game
+
+    def save_game(self, path):
+        """Write a snapshot file, replacing any previous save only once it is complete"""
+        data = self.save_snapshot(compress=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load_game(cls, path, io=None):
+        """Load a game written by save_game()"""
+        with open(path, "rb") as f:
+            return cls.load_snapshot(f.read(), io)
+
+    @classmethod
+    def restore_session(cls, base_path, io=None):
+        """Rebuild an autosaved game: load its snapshot, then replay the journal without output
+
+        A journal recorded with rendering on is replayed into a discarding
+        sink, so screens that wait for Enter read their recorded lines again.
+        """
+        autosave = Autosave(base_path)
+        with open(autosave.snapshot_path, "rb") as f:
+            data = f.read()
+        flags, frames = TurnJournal.read_frames(autosave.journal_path, SNAPSHOT_HEADER.unpack_from(data)[3])
+        feed = CommandFeed(max_idle_reads=0)
+        sink = (lambda text: None) if flags & JOURNAL_RENDERED else None
+        game = cls.load_snapshot(data, io=IOBackend(feed, output_sink=sink))
+        for turn, checkpoint, lines in frames:
+            feed.extend(lines)
+            try:
+                game.replay_action()
+            except InputExhausted:
+                raise SnapshotError(f"Journal replay ran out of input at turn {turn}")
+            if feed.lines or game.random_streams.checkpoint() != checkpoint:
+                raise SnapshotError(f"Journal replay diverged at turn {turn}")
+        game.io = io if io is not None else TerminalIO()
+        return game
+
+    def shared_content(self):
+        """Static content tables that forks may share with this game, keyed by id"""
+        if getattr(self, 'shared_tables', None) is None:
+            owners = list(vars(self).values())
+            for chapter in self.story_manager.chapters.values():
+                owners.append(chapter)
+                owners.extend(chapter.milestones.values())
+            shared = {}
+            for owner in owners:
+                for name in getattr(type(owner), 'SHARED_CONTENT', ()):
+                    table = getattr(owner, name, None)
+                    if table is not None:
+                        shared[id(table)] = table
+            self.shared_tables = shared
+        return self.shared_tables
+
+    def fork(self):
+        """Independent headless copy for what-if evaluation, driven with step().
+
+        Mutable state is copied; static content tables are shared by reference,
+        so nothing done to the fork can reach this game.
+        """
+        shared = self.shared_content()
+        substitutes = dict(shared)
+        for rng in self.random_streams.streams.values():
+            # Copying generator state directly skips pickling 625 ints per stream
+            clone = random.Random.__new__(random.Random)
+            clone.setstate(rng.getstate())
+            substitutes[id(rng)] = clone
+        buffer = BytesIO()
+        ForkPickler(buffer, substitutes).dump(self)
+        buffer.seek(0)
+        game = ForkUnpickler(buffer, substitutes).load()
+        game.io = IOBackend(CommandFeed())
+        game.shared_tables = shared
+        if not hasattr(game, 'step_outcome'):
+            game.step_outcome = None
+        return game
+
+    # Step API: agents drive the same play_turn branches with structured actions
+    STEP_COMMANDS = {
+        "buy": "b", "sell": "s", "travel": "t", "build": "bl", "upgrade": "u",
+        "repair": "r", "research": "research", "mine": "m", "cantina": "c",
+        "shop": "sh", "action": "a", "port": "p", "info": "i", "end": "e",
+    }
+
+    @classmethod
+    def reset(cls, seed=None, difficulty=1, player_name="Agent", lazy_markets=False):
+        """Start a new headless game driven by step(); returns (game, first observation)"""
+        game = cls(io=IOBackend(CommandFeed()), difficulty=difficulty,
+                   player_name=player_name, seed=seed, lazy_markets=lazy_markets)
+        game.step_outcome = None
+        return game, game.observe()
+
+    def step(self, action):
+        """Apply one action, e.g. ("buy", "tech", 50), ("travel", "Beta") or "end".
+
+        Returns (observation, reward, done, info); reward is the change in final score.
+        """
+        feed = self.io.input_provider
+        if not isinstance(feed, CommandFeed):
+            raise RuntimeError("step() needs a game started with Game.reset()")
+        if getattr(self, 'step_outcome', None):
+            raise GameOverError(f"Game is over ({self.step_outcome}); start another with Game.reset()")
+
+        if isinstance(action, str):
+            action = (action,)
+        verb, args = action[0], action[1:]
+        if verb not in self.STEP_COMMANDS:
+            raise InvalidActionError(f"Unknown action: {verb}")
+
+        score_before = self.calculate_final_score()
+        turn_before = self.turn
+        error = None
+        feed.clear()
+        feed.extend([self.STEP_COMMANDS[verb]] + [str(arg) for arg in args])
+        try:
+            self.play_turn()
             self.update_rank()
+            self.step_outcome = self.check_game_over()
+            if not self.step_outcome and self.story_manager.is_story_completed():
+                self.step_outcome = "story_complete"
+        except SystemExit:
+            self.step_outcome = "quit"
+        except InputExhausted as e:
+            error = str(e)
+        finally:
+            feed.clear()  # Drop arguments the command didn't consume
+
+        navigator = getattr(self, 'navigator', None)
+        if navigator is not None:
+            navigator.advance(action)
+
+        info = {
+            "turn_advanced": self.turn > turn_before,
+            "outcome": self.step_outcome,
+            "error": error,
+        }
+        reward = self.calculate_final_score() - score_before
+        return self.observe(), reward, self.step_outcome is not None, info
 
-            # Check game over conditions
-            if self.ship.money <= 0 and self.ship.is_empty_cargo():
-                self.display_simple_message("Game Over: No money and no cargo left.", 2)
-                self.display_score()
-                break
+    def observe(self):
+        """Structured snapshot of the state a player can see"""
+        location = self.current_location
+        return {
+            "turn": self.turn,
+            "money": self.ship.money,
+            "rank": self.rank,
+            "ship": {
+                "attack": self.ship.attack,
+                "defense": self.ship.defense,
+                "speed": self.ship.speed,
+                "damage": self.ship.damage,
+                "research_points": self.ship.research_points,
+                "items": dict(self.ship.items),
+            },
+            "cargo": dict(self.ship.cargo),
+            "location": location.name,
+            "location_type": location.location_type,
+            "market": dict(location.market),
+            "banned": sorted(location.banned_commodities),
+            "commands": [cmd for cmd, shortcut in location.commands["available"]],
+            "known_locations": list(self.known_locations),
+            "contracts": [
+                {
+                    "type": contract.contract_type,
+                    "description": contract.description,
+                    "turns_remaining": contract.progress['turns_remaining'],
+                    "completed": contract.completed,
+                }
+                for contract in self.contract_manager.active_contracts
+            ],
+            "quests": [
+                {
+                    "name": quest.name,
+                    "type": quest.quest_type,
+                    "progress": quest.progress,
+                    "target": quest.target_progress,
+                }
+                for quest in self.quest_system.active_quests
+            ],
+            "chapter": self.story_manager.current_chapter,
+        }
 
-            if self.ship.damage >= 100:
-                self.display_simple_message("Game Over: Ship destroyed!", 2)
-                self.display_score()
+    def play(self):
+        while True:
+            # Play a turn, noting what was typed so the navigator can follow it
+            typed = []
+            recorder = self.io.recorder
+            self.io.recorder = typed.append if recorder is None else lambda line: (typed.append(line), recorder(line))
+            try:
+                turn_result = self.play_turn()
+            finally:
+                self.io.recorder = recorder
+            self.navigator.follow(typed)
+            if self.finish_action(turn_result):
                 break
 
-            # Check for special quest availability
-            # Only check planets and locations that can have stockmarkets
-            valid_locations = [loc for loc in self.locations 
-                            if isinstance(loc, Planet) or 
-                            loc.location_type in ["Planet", "AsteroidBase", "DeepSpaceOutpost"]]
-            
-            if valid_locations and all(loc.stockmarket_base for loc in valid_locations):
-                self.secret_quest_available = True
-                resign = self.validate_input("Do you want to resign? (yes/no): ", ['yes', 'no'])
-                if resign == 'yes':
-                    self.display_score()
-                    print("You are the Galactic Tycoon!")
-                    print(f"Congratulations, {self.player_name}! You have achieved the rank of {self.rank}.")
-                    print("Your story will be remembered throughout the galaxy.")
-                    break
-                else:
-                    self.display_simple_message("You have chosen to continue your adventure into the unknown.")
-                    self.stellar_portal_available = True
-                    if self.ship.money >= 1500:
-                        self.ship.money -= 1500
-                        self.display_simple_message("You have paid for the secret quest and a Stellar Portal appears on this location.")
-                        # Generate new locations
-                        new_locations = self.generate_new_locations()
-                        self.locations.extend(new_locations)
-                        self.current_location = random.choice(new_locations)
-                        self.known_locations = [self.current_location.name]
-                        self.display_simple_message("You have traveled to a new set of locations with more volatile price movements.")
-                    else:
-                        self.display_simple_message("Not enough money to pay for the secret quest.")
-
             # Ask to play again
             if turn_result == "quit":
                 play_again = self.validate_input("Do you want to play again? (yes/no): ", ['yes', 'no'])
                 if play_again == 'yes':
-                    self.__init__()
+                    self.close()
+                    self.__init__(io=self.io, lazy_markets=self.market_engine.lazy)
+                    if getattr(self, 'autosave', None):
+                        self.autosave.rotate(self)
                     self.play()
                 break
 
-    def generate_new_locations(self):
-        """Generate new locations for the late-game content"""
-        new_locations = [
-            Planet("Zeta", 10, 1, 5, "Stable"),
-            Planet("Eta", 1, 10, 5, "Booming"),
-            Planet("Theta", 8, 8, 10, "Declining"),
-            AsteroidBase("Omega-1", 5, 5, 15, "Formative"),
-            DeepSpaceOutpost("DSO-Delta", 7, 3, 20, "Stable")
-        ]
-        
-        # Add some special bonuses for late-game locations
-        for location in new_locations:
-            location.exogeology += 20  # Better mining in new locations
-            location.research_points *= 2     # Double research points
-            location.tech_level += 2         # Higher tech levels
-            
-            # Special location-type bonuses
-            if isinstance(location, AsteroidBase):
-                location.exogeology += 10  # Extra mining bonus
-            elif isinstance(location, DeepSpaceOutpost):
-                location.market['tech'] = max(1, location.market['tech'] * 0.8)  # Better tech prices
-                
-        return new_locations
+    def close(self):
+        """Release what the game holds outside its state (the navigator's worker processes)"""
+        self.navigator.close()
 
-#New additions to the game system
+    def finish_action(self, turn_result):
+        """End-of-action bookkeeping for play(); returns True when the game is over"""
+        # Check if player quit or resigned
+        if turn_result == "quit":
+            self.display_simple_message("Thanks for playing!")
+            return True
+        elif turn_result == "resign":
+            self.display_simple_message("Resigning from current game...")
+            self.display_score()
+            return True
+            
+        self.update_rank()
+
+        # Check game over conditions
+        game_over = self.check_game_over()
+        if game_over == "bankrupt":
+            self.display_simple_message("Game Over: No money and no cargo left.", 2)
+            self.display_score()
+            return True
+
+        if game_over == "destroyed":
+            self.display_simple_message("Game Over: Ship destroyed!", 2)
+            self.display_score()
+            return True
+
+        if self.offer_secret_quest():
+            return True
+
+        if getattr(self, 'autosave', None):
+            self.autosave.checkpoint(self)
+        return False
+
+    def offer_secret_quest(self):
+        """Offer the Galactic Tycoon ending once every market has a stockmarket.
+        Returns True if the player resigned."""
+        # Check for special quest availability
+        # Only check planets and locations that can have stockmarkets
+        valid_locations = [loc for location_type in ("Planet", "AsteroidBase", "DeepSpaceOutpost")
+                           for loc in self.locations.of_type(location_type)]
+        
+        if valid_locations and all(loc.stockmarket_base for loc in valid_locations):
+            self.secret_quest_available = True
+            resign = self.validate_input("Do you want to resign? (yes/no): ", ['yes', 'no'])
+            if resign == 'yes':
+                self.display_score()
+                self.io.write("You are the Galactic Tycoon!")
+                self.io.write(f"Congratulations, {self.player_name}! You have achieved the rank of {self.rank}.")
+                self.io.write("Your story will be remembered throughout the galaxy.")
+                return True
+            else:
+                self.display_simple_message("You have chosen to continue your adventure into the unknown.")
+                self.stellar_portal_available = True
+                if self.ship.money >= 1500:
+                    self.ship.money -= 1500
+                    self.display_simple_message("You have paid for the secret quest and a Stellar Portal appears on this location.")
+                    # Generate new locations
+                    new_locations = self.generate_new_locations()
+                    self.locations.extend(new_locations)
+                    self.current_location = self.rng.choice(new_locations)
+                    self.known_locations = KnownLocations([self.current_location.name])
+                    self.events.publish(EVENT_DISCOVERY)
+                    self.display_simple_message("You have traveled to a new set of locations with more volatile price movements.")
+                else:
+                    self.display_simple_message("Not enough money to pay for the secret quest.")
+        return False
+
+    def replay_action(self):
+        """One iteration of the play() loop without end-of-game screens (journal replay)"""
+        self.play_turn()
+        self.update_rank()
+        if not self.check_game_over():
+            self.offer_secret_quest()
+
+    def generate_new_locations(self):
+        """Generate new locations for the late-game content"""
+        new_locations = [
+            self.new_location(Planet, "Zeta", 10, 1, 5, "Stable"),
+            self.new_location(Planet, "Eta", 1, 10, 5, "Booming"),
+            self.new_location(Planet, "Theta", 8, 8, 10, "Declining"),
+            self.new_location(AsteroidBase, "Omega-1", 5, 5, 15, "Formative"),
+            self.new_location(DeepSpaceOutpost, "DSO-Delta", 7, 3, 20, "Stable")
+        ]
+        
+        # Add some special bonuses for late-game locations
+        for location in new_locations:
+            location.exogeology += 20  # Better mining in new locations
+            location.research_points *= 2     # Double research points
+            location.tech_level += 2         # Higher tech levels
+            
+            # Special location-type bonuses
+            if isinstance(location, AsteroidBase):
+                location.exogeology += 10  # Extra mining bonus
+            elif isinstance(location, DeepSpaceOutpost):
+                location.market['tech'] = max(1, location.market['tech'] * 0.8)  # Better tech prices
+                
+        return new_locations
+
+#New additions to the game system
 
     def generate_station_missions(self):
         """Generate station defense missions"""
@@ -4587,6 +5894,7 @@ class Game:
         """Handle discovery of a new location"""
         if location.name not in self.discovered_locations:
             self.discovered_locations.add(location.name)
+            self.events.publish(EVENT_DISCOVERY)
             
             # Award discovery rewards
             discovery_reward = 1000 * (self.story_manager.current_chapter + 1)
@@ -4616,11 +5924,438 @@ class Game:
 
 
     def clear_screen(self):
-        os.system('clear' if os.name == 'posix' else 'cls')
+        self.io.clear()
+
+class RoutePlanner:
+    """Plans buy -> travel -> sell sequences over the player's known locations.
+
+    Buying with all available money and selling everything on arrival makes a
+    leg multiply money by sell_net(destination) / buy_cost(origin), so the best
+    value of each location with h hops left factors per commodity and the
+    dynamic program costs O(hops * locations * commodities).
+    """
+    def __init__(self, game):
+        self.game = game
+        self.cache_key = None
+        self.cache_terms = None
+        self.cache_tables = None
+
+    def candidates(self):
+        """Known locations, one entry per name"""
+        by_name = {}
+        for location in self.game.locations.among(self.game.known_locations):
+            by_name.setdefault(location.name, location)
+        return list(by_name.values())
+
+    def trade_terms(self, location):
+        """Per-unit (buy cost, sell proceeds) including tax, for commodities tradeable here"""
+        tax_rate = location.calculate_tax_rate(self.game.rank, 0)
+        buy, sell = {}, {}
+        for commodity in MarketEngine.COMMODITIES:
+            price = location.market[commodity]
+            if price <= 0 or not location.can_trade(commodity):
+                continue
+            if commodity in ['salt', 'fuel'] and not any(p['type'] == commodity for p in location.mining_platforms):
+                continue
+            buy[commodity] = price * (1 + tax_rate)
+            sell[commodity] = price * (1 - tax_rate)
+        return buy, sell
+
+    def market_key(self, locations):
+        """Everything the plan depends on besides the ship: prices, bans, buildings, rank"""
+        key = [self.game.rank]
+        for location in locations:
+            engine = location.market_engine
+            key.append((location.name, id(engine), engine.versions[location.market_row],
+                        len(location.buildings), len(location.mining_platforms)))
+        return tuple(key)
+
+    def value_tables(self, locations, hops):
+        """tables[h][name] = (money multiplier, move) for the best h-hop plan from name"""
+        key = self.market_key(locations)
+        if key != self.cache_key:
+            self.cache_key = key
+            self.cache_terms = {location.name: self.trade_terms(location) for location in locations}
+            self.cache_tables = [{location.name: (1.0, None) for location in locations}]
+        terms = self.cache_terms
+        tables = self.cache_tables
+        while len(tables) <= hops:
+            previous = tables[-1]
+            # Best empty move, and per commodity the two best places to sell it
+            # next, so a route from the best one can fall back to the other
+            empty_name = max(previous, key=lambda name: previous[name][0])
+            empty_value = previous[empty_name][0]
+            best_sale = {}
+            for name, (buy, sell) in terms.items():
+                future = previous[name][0]
+                for commodity, proceeds in sell.items():
+                    sales = best_sale.setdefault(commodity, [])
+                    sales.append((proceeds * future, name))
+                    sales.sort(key=lambda sale: sale[0], reverse=True)
+                    del sales[2:]
+            table = {}
+            for name, (buy, sell) in terms.items():
+                value, move = previous[name][0], None  # Staying put
+                if empty_value > value:
+                    value, move = empty_value, (None, empty_name)
+                for commodity, cost in buy.items():
+                    for sale_value, destination in best_sale.get(commodity, ()):
+                        if destination != name:
+                            if sale_value / cost > value:
+                                value, move = sale_value / cost, (commodity, destination)
+                            break
+                table[name] = (value, move)
+            tables.append(table)
+        return tables
+
+    def plan(self, hops=3):
+        """Best route from the current location for the ship's money and cargo.
+
+        Returns a dict with the expected final money and a list of legs, each
+        {"from", "to", "buy", "quantity", "buy_price", "sell_price", "money"}.
+        """
+        game = self.game
+        ship = game.ship
+        here = game.current_location
+        locations = self.candidates()
+        if here.name not in {location.name for location in locations}:
+            locations.append(here)
+        for location in locations:
+            game.observe_market(location)
+        tables = self.value_tables(locations, max(0, hops - 1))
+        terms = self.cache_terms
+        future = tables[hops - 1] if hops > 0 else None
+
+        # First leg uses the real money and carried cargo; later legs follow the tables
+        best = (ship.money, None)  # (expected final money, first leg)
+        if hops > 0:
+            buy_here = terms[here.name][0]
+            for location in locations:
+                if location.name == here.name:
+                    continue
+                sell_there = terms[location.name][1]
+                carried = sum(amount * sell_there[commodity]
+                              for commodity, amount in ship.cargo.items()
+                              if amount > 0 and commodity in sell_there)
+                options = [(None, 0, ship.money)]
+                for commodity, cost in buy_here.items():
+                    quantity = int(ship.money / cost)
+                    if quantity > 0 and commodity in sell_there:
+                        options.append((commodity, quantity,
+                                        ship.money - quantity * cost + quantity * sell_there[commodity]))
+                for commodity, quantity, money in options:
+                    final = (money + carried) * future[location.name][0]
+                    if final > best[0]:
+                        best = (final, {"from": here.name, "to": location.name, "buy": commodity,
+                                        "quantity": quantity, "money": money + carried})
+
+        legs = []
+        if best[1]:
+            legs.append(best[1])
+            for remaining in range(hops - 1, 0, -1):
+                origin = legs[-1]["to"]
+                move = tables[remaining][origin][1]
+                if move is None:
+                    break
+                commodity, destination = move
+                money = legs[-1]["money"]
+                quantity = 0
+                if commodity:
+                    cost = terms[origin][0][commodity]
+                    quantity = int(money / cost)
+                    money = money - quantity * cost + quantity * terms[destination][1][commodity]
+                legs.append({"from": origin, "to": destination, "buy": commodity,
+                             "quantity": quantity, "money": money})
+        prices = {location.name: location.market for location in locations}
+        for leg in legs:
+            if leg["buy"]:
+                leg["buy_price"] = prices[leg["from"]][leg["buy"]]
+                leg["sell_price"] = prices[leg["to"]][leg["buy"]]
+            else:
+                leg["buy_price"] = leg["sell_price"] = None
+        final_money = legs[-1]["money"] if legs else ship.money
+        return {
+            "start": here.name,
+            "money": ship.money,
+            "final_money": final_money,
+            "profit": final_money - ship.money,
+            "legs": legs,
+        }
+
+class SearchNode:
+    """Open-loop search tree node: score gains seen after one action sequence"""
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.children = {}
+
+    def update(self, value):
+        self.visits += 1
+        self.total += value
+        self.total_sq += value * value
+
+    def merge(self, other):
+        self.visits += other.visits
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    @property
+    def mean(self):
+        return self.total / self.visits if self.visits else 0.0
+
+    @property
+    def variance(self):
+        if self.visits < 2:
+            return 0.0
+        return max(0.0, self.total_sq / self.visits - self.mean ** 2)
+
+NAVIGATOR_REPLAY_ITERATIONS = 100  # Fixed search size where advice must be repeatable (server sessions)
+
+class NavigatorAdvisor:
+    """Recommends the next action by Monte Carlo tree search over forked games.
+
+    Each iteration forks the current game, reseeds the fork's random streams
+    (so travel events, battles and market moves are sampled rather than
+    known), follows the tree by UCB1, expands one new action and finishes
+    with a random rollout. The value of a line of play is the change in
+    final score over `depth` actions. Workers search independently from the
+    same snapshot and their root statistics are merged; trees are kept and
+    reused when the game moves along a searched action. The worker pool is
+    started by the first consult and kept until close().
+    """
+    pool = None
+    pool_size = 0
+
+    def __init__(self, game, depth=8, exploration=1.4):
+        self.game = game
+        self.rng = game.random_streams.stream("navigator")
+        self.depth = depth
+        self.exploration = exploration
+        self.trees = []
+        self.tree_key = None
+        self.failures = 0  # Rollouts of the last consult that raised something other than a step error
+
+    def __getstate__(self):
+        """Search trees and worker processes are not game state; snapshots and forks start without them"""
+        state = self.__dict__.copy()
+        state['trees'] = []
+        state['tree_key'] = None
+        state.pop('pool', None)
+        state.pop('pool_size', None)
+        return state
+
+    def worker_pool(self, workers):
+        """The advisor's process pool, (re)started if the worker count changed"""
+        from concurrent.futures import ProcessPoolExecutor
+        if self.pool is None or self.pool_size != workers:
+            self.close()
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+            self.pool_size = workers
+        return self.pool
+
+    def close(self):
+        """Shut down the worker pool, if one was started"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            self.pool_size = 0
+
+    @staticmethod
+    def state_key(game):
+        """What must be unchanged for a kept tree to still describe the game"""
+        location = game.current_location
+        return (game.turn, location.name, tuple(game.ship.cargo.items()),
+                len(location.buildings), len(game.contract_manager.active_contracts))
+
+    @staticmethod
+    def candidate_actions(game):
+        """Step actions worth searching: buy, sell, travel, build, accept a contract or end the turn"""
+        here = game.current_location
+        ship = game.ship
+        actions = [("end",)]
+        for item in ("tech", "agri"):
+            if here.can_trade(item) and 0 < here.market[item] <= ship.money:
+                actions.append(("buy", item, "max"))
+                actions.append(("buy", item, "half"))
+        for item, amount in ship.cargo.items():
+            if amount > 0 and here.can_trade(item):
+                actions.append(("sell", item, "max"))
+        for name in game.known_locations:
+            if name != here.name:
+                actions.append(("travel", name))
+        if ship.money >= 3000:
+            for building in here.get_capabilities().get("can_build", []):
+                actions.append(("build", building.replace("_", " ")))
+        contracts = game.contract_manager
+        if len(contracts.active_contracts) < contracts.max_active_contracts:
+            for i in range(len(contracts.available_contracts)):
+                actions.append(("cantina", "contracts", "view", i + 1))
+        return actions
+
+    def select(self, node, actions):
+        """UCB1 over the children legal in this state, on values scaled to [0, 1]"""
+        children = [(action, node.children[action]) for action in actions]
+        means = [child.mean for _, child in children]
+        low, high = min(means), max(means)
+        spread = (high - low) or 1.0
+        log_visits = math.log(node.visits)
+        def score(entry):
+            child = entry[1]
+            return (child.mean - low) / spread + self.exploration * math.sqrt(log_visits / child.visits)
+        return max(children, key=score)
+
+    def iterate(self, root_game, root, rng):
+        """One search iteration from root_game; returns the sampled value"""
+        game = root_game.fork()
+        game.random_streams.reseed(rng.getrandbits(64))
+        node = root
+        path = [root]
+        value = 0.0
+        expanding = True
+        try:
+            for _ in range(self.depth):
+                if game.step_outcome:
+                    break
+                actions = self.candidate_actions(game)
+                if expanding:
+                    untried = [action for action in actions if action not in node.children]
+                    if untried:
+                        action = rng.choice(untried)
+                        child = SearchNode()
+                        node.children[action] = child
+                        node = child
+                        expanding = False
+                    else:
+                        action, node = self.select(node, actions)
+                    path.append(node)
+                else:
+                    action = rng.choice(actions)
+                value += game.step(action)[1]
+        except (GameOverError, InvalidActionError):
+            pass  # A line of play the game refuses scores what it earned so far
+        except Exception:
+            self.failures += 1  # Likewise, but a bug: counted and reported with the advice
+        for visited in path:
+            visited.update(value)
+        return value
+
+    def search(self, game, root, deadline, rng, limit=None):
+        """Iterate until the wall-clock deadline, or `limit` times; returns the number of iterations"""
+        iterations = 0
+        while (time.time() < deadline if limit is None else iterations < limit) or root.visits == 0:
+            self.iterate(game, root, rng)
+            iterations += 1
+        return iterations
+
+    def advise(self, budget=2.0, workers=None, iterations=None):
+        """Search for `budget` seconds and return the recommended action with its statistics.
+
+        Given `iterations`, each worker runs exactly that many instead, so
+        the same game and navigator stream always give the same advice.
+        """
+        started = time.time()
+        deadline = started + budget
+        limit = iterations
+        self.failures = 0
+        workers = workers or os.cpu_count() or 1
+        key = self.state_key(self.game)
+        if key != self.tree_key or len(self.trees) != workers:
+            self.trees = [SearchNode() for _ in range(workers)]
+        seeds = [self.rng.getrandbits(64) for _ in range(workers)]
+
+        if workers == 1:
+            game = self.game.fork()
+            iterations = [self.search(game, self.trees[0], deadline, random.Random(seeds[0]), limit)]
+        else:
+            snapshot = self.game.save_snapshot()
+            pool = self.worker_pool(workers)
+            futures = [pool.submit(_navigator_search, snapshot, tree, deadline, seed, self.depth, self.exploration, limit)
+                       for tree, seed in zip(self.trees, seeds)]
+            results = [future.result() for future in futures]
+            self.trees = [tree for tree, _, _ in results]
+            iterations = [count for _, count, _ in results]
+            self.failures = sum(failures for _, _, failures in results)
+        self.tree_key = key
+
+        merged = {}
+        for tree in self.trees:
+            for action, child in tree.children.items():
+                merged.setdefault(action, SearchNode()).merge(child)
+        return self.recommendation(merged, sum(iterations), time.time() - started)
+
+    def recommendation(self, merged, iterations, elapsed):
+        """Best mean among well-sampled actions; confidence that it beats the runner-up"""
+        ranked = sorted(merged.items(), key=lambda entry: entry[1].mean, reverse=True)
+        if ranked:
+            most_visits = max(child.visits for child in merged.values())
+            sampled = [entry for entry in ranked if entry[1].visits * 10 >= most_visits] or ranked
+            ranked = sampled + [entry for entry in ranked if entry not in sampled]
+        result = {
+            "action": ranked[0][0] if ranked else ("end",),
+            "value": ranked[0][1].mean if ranked else 0.0,
+            "confidence": 0.0,
+            "iterations": iterations,
+            "failures": self.failures,
+            "elapsed": elapsed,
+            "alternatives": [
+                {"action": action, "value": child.mean, "visits": child.visits}
+                for action, child in ranked
+            ],
+        }
+        if len(ranked) == 1:
+            result["confidence"] = 1.0
+        elif ranked:
+            best, runner_up = ranked[0][1], ranked[1][1]
+            error = math.sqrt(best.variance / max(best.visits, 1) + runner_up.variance / max(runner_up.visits, 1))
+            gap = best.mean - runner_up.mean
+            if error > 0:
+                result["confidence"] = 0.5 * (1 + math.erf(gap / (error * math.sqrt(2))))
+            else:
+                result["confidence"] = 1.0 if gap > 0 else 0.5
+        return result
+
+    def follow(self, typed):
+        """Descend the kept trees along the action a player typed, or drop them.
+
+        `typed` is every line read during the action; it matches a searched
+        action when, less empty lines (screens acknowledged), it is what
+        step() would have fed for that action. Actions that leave the game
+        where the trees were searched from (menus, the consult itself) keep them.
+        """
+        if not self.trees or self.state_key(self.game) == self.tree_key:
+            return
+        typed = [line.strip().lower() for line in typed if line.strip()]
+        if typed:
+            typed[0] = Game.STEP_COMMANDS.get(typed[0], typed[0])
+        taken = None
+        for action in self.trees[0].children:
+            if [Game.STEP_COMMANDS[action[0]]] + [str(arg).lower() for arg in action[1:]] == typed:
+                taken = action
+                break
+        self.advance(taken)
+
+    def advance(self, action):
+        """Descend the kept trees after the game took `action`, or drop them"""
+        if self.trees and all(action in tree.children for tree in self.trees):
+            self.trees = [tree.children[action] for tree in self.trees]
+            self.tree_key = self.state_key(self.game)
+        else:
+            self.trees = []
+            self.tree_key = None
+
+def _navigator_search(snapshot, tree, deadline, seed, depth, exploration, limit=None):
+    """Worker entry point: search a snapshot until the deadline; returns the grown tree and counts"""
+    game = Game.load_snapshot(snapshot, io=IOBackend(CommandFeed()))
+    game.step_outcome = None
+    advisor = NavigatorAdvisor(game, depth, exploration)
+    iterations = advisor.search(game, tree, deadline, random.Random(seed), limit)
+    return tree, iterations, advisor.failures
 
 class ContractManager:
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("contracts")
         self.available_contracts = []
         self.active_contracts = []
         self.completed_contracts = []
@@ -4661,7 +6396,7 @@ class ContractManager:
             menu_content.append([f""])
             for cmd, (shortcut, desc) in options.items():
                 menu_content.append([f"{cmd}/{shortcut if shortcut else ''}: {desc}"])
-            print(self.game.create_box(menu_content, 'single'))
+            self.game.io.write(self.game.create_box(menu_content, 'single'))
 
             valid_inputs = [cmd for cmd in options.keys()] + [s[0] for s in options.values() if s[0]]
             action = self.game.validate_input("Choose action: ", valid_inputs)
@@ -4693,7 +6428,7 @@ class ContractManager:
             for info_line in self.get_contract_display_info(contract):
                 contract_content.append([info_line])
 
-        print(self.game.create_box(contract_content, 'double'))
+        self.game.io.write(self.game.create_box(contract_content, 'double'))
 
         choice = self.game.validate_input(
             f"Accept contract (1-{len(self.available_contracts)}) or Enter to cancel: ",
@@ -4722,7 +6457,7 @@ class ContractManager:
                 f"Reward: {self.game.format_money(contract.rewards['money'])}",
                 f"Rep: +{contract.rewards['reputation']}"
             ])
-        print(self.game.create_box(content, 'double'))
+        self.game.io.write(self.game.create_box(content, 'double'))
 
         # Get contract choice
         choice = self.game.validate_input(
@@ -4756,16 +6491,16 @@ class ContractManager:
                 content.extend([
                     [f"• Cargo: {contract.requirements['cargo_type']}"],
                     [f"• Amount: {contract.requirements['min_amount']} units"],
-                    [f"• Source: {contract.requirements['source']}"],
-                    [f"• Destination: {contract.requirements['destination']}"],
+                    [f"• Source: {self.game.location_name(contract.requirements['source'])}"],
+                    [f"• Destination: {self.game.location_name(contract.requirements['destination'])}"],
                     [f"• Time Limit: {contract.duration} turns"]
                 ])
             elif contract.contract_type == "passenger":
                 content.extend([
                     [f"• Passengers: {contract.requirements.get('count', contract.requirements.get('passenger_count', 0))}"],
                     [f"• Class: {contract.requirements.get('passenger_class', 'Any')}"],
-                    [f"• Source: {contract.requirements['source']}"],
-                    [f"• Destination: {contract.requirements['destination']}"],
+                    [f"• Source: {self.game.location_name(contract.requirements['source'])}"],
+                    [f"• Destination: {self.game.location_name(contract.requirements['destination'])}"],
                     [f"• Time Limit: {contract.duration} turns"]
                 ])
             
@@ -4775,7 +6510,7 @@ class ContractManager:
             ])
             
             # Add status lines
-            status = contract.get_status_display()
+            status = contract.get_status_display(self.game.location_name)
             for line in status.split('\n'):
                 content.append([f"• {line}"])
 
@@ -4785,7 +6520,7 @@ class ContractManager:
                 ["Delivery History:"]
             ])
             
-            history = contract.get_trade_history_display()
+            history = contract.get_trade_history_display(self.game.location_name)
             for line in history.split('\n'):
                 content.append([f"• {line}"])
                 
@@ -4799,10 +6534,10 @@ class ContractManager:
                     [f"• {contract.rewards.get('plot_points', 0)} plot points"]
                 ])
             
-            print(self.game.create_box(content, 'double'))
-            print()  # Add space between contracts
+            self.game.io.write(self.game.create_box(content, 'double'))
+            self.game.io.write()  # Add space between contracts
 
-        input("Press Enter to continue...")
+        self.game.io.wait()
 
     def refresh_available_contracts(self):
         """Refresh available contracts every 5 turns"""
@@ -4810,17 +6545,17 @@ class ContractManager:
             self.contract_refresh_turns = self.game.turn
             self.available_contracts = []
             # Generate 2-4 new contracts using known locations
-            num_contracts = random.randint(2, 4)
+            num_contracts = self.rng.randint(2, 4)
             for _ in range(num_contracts):
                 # If special contracts are unlocked, 30% chance for special contract
-                if self.special_contracts_unlocked and random.random() < 0.3:
+                if self.special_contracts_unlocked and self.rng.random() < 0.3:
                     contract = self.generate_special_contract()
                     if contract:
                         self.available_contracts.append(contract)
                         continue
                 
                 # Regular contract generation
-                if random.random() < 0.6:  # 60% chance for cargo contract
+                if self.rng.random() < 0.6:  # 60% chance for cargo contract
                     contract = self.generate_cargo_contract()
                 else:
                     contract = self.generate_passenger_contract()
@@ -4833,24 +6568,23 @@ class ContractManager:
             return None
 
         # Get actual Location objects from known locations
-        known_locations = [loc for loc in self.game.locations 
-                        if loc.name in self.game.known_locations]
+        known_locations = self.game.locations.among(self.game.known_locations)
         
         if len(known_locations) < 2:
             return None
             
-        source = random.choice(known_locations)
+        source = self.rng.choice(known_locations)
         destinations = [loc for loc in known_locations if loc != source]
-        destination = random.choice(destinations)
+        destination = self.rng.choice(destinations)
 
         contract_types = [
             {
                 "desc_template": "Exclusive Trading",
                 "requirements": {
-                    "cargo_type": (cargo_type := random.choice(["tech", "agri"])),
-                    "min_amount": (amount := random.randint(100, 300)),
-                    "source": source.name,
-                    "destination": destination.name
+                    "cargo_type": (cargo_type := self.rng.choice(["tech", "agri"])),
+                    "min_amount": (amount := self.rng.randint(100, 300)),
+                    "source": source.handle,
+                    "destination": destination.handle
                 },
                 "duration": 8,
                 "base_reward": 20000,
@@ -4859,10 +6593,10 @@ class ContractManager:
             {
                 "desc_template": "Resource Distribution",
                 "requirements": {
-                    "cargo_type": (cargo_type := random.choice(["salt", "fuel"])),
-                    "min_amount": (amount := random.randint(50, 150)),
-                    "source": source.name,
-                    "destination": destination.name
+                    "cargo_type": (cargo_type := self.rng.choice(["salt", "fuel"])),
+                    "min_amount": (amount := self.rng.randint(50, 150)),
+                    "source": source.handle,
+                    "destination": destination.handle
                 },
                 "duration": 12,
                 "base_reward": 30000,
@@ -4870,7 +6604,7 @@ class ContractManager:
             }
         ]
 
-        contract_type = random.choice(contract_types)
+        contract_type = self.rng.choice(contract_types)
         return Contract(
             contract_type="cargo",
             duration=contract_type["duration"],
@@ -4889,24 +6623,23 @@ class ContractManager:
             return None
 
         # Get actual Location objects from known locations
-        known_locations = [loc for loc in self.game.locations 
-                        if loc.name in self.game.known_locations]
+        known_locations = self.game.locations.among(self.game.known_locations)
         
         if len(known_locations) < 2:
             return None
             
-        source = random.choice(known_locations)
+        source = self.rng.choice(known_locations)
         destinations = [loc for loc in known_locations if loc != source]
-        destination = random.choice(destinations)
+        destination = self.rng.choice(destinations)
 
         contract_types = [
             {
                 "desc_template": "VIP Transport",
                 "requirements": {
-                    "passenger_class": (passenger_class := random.choice(["S", "M", "E"])),
-                    "count": (count := random.randint(3, 8)),
-                    "source": source.name,
-                    "destination": destination.name,
+                    "passenger_class": (passenger_class := self.rng.choice(["S", "M", "E"])),
+                    "count": (count := self.rng.randint(3, 8)),
+                    "source": source.handle,
+                    "destination": destination.handle,
                     "min_satisfaction": 80
                 },
                 "duration": 10,
@@ -4916,9 +6649,9 @@ class ContractManager:
             {
                 "desc_template": "Group Transport",
                 "requirements": {
-                    "passenger_count": (count := random.randint(10, 20)),
-                    "source": source.name,
-                    "destination": destination.name,
+                    "passenger_count": (count := self.rng.randint(10, 20)),
+                    "source": source.handle,
+                    "destination": destination.handle,
                     "min_satisfaction": 70
                 },
                 "duration": 15,
@@ -4927,7 +6660,7 @@ class ContractManager:
             }
         ]
 
-        contract_type = random.choice(contract_types)
+        contract_type = self.rng.choice(contract_types)
         return Contract(
             contract_type="passenger",
             duration=contract_type["duration"],
@@ -4946,24 +6679,23 @@ class ContractManager:
             return None
 
         # Get actual Location objects from known locations
-        known_locations = [loc for loc in self.game.locations 
-                        if loc.name in self.game.known_locations]
+        known_locations = self.game.locations.among(self.game.known_locations)
         
         if len(known_locations) < 2:
             return None
             
-        source = random.choice(known_locations)
+        source = self.rng.choice(known_locations)
         destinations = [loc for loc in known_locations if loc != source]
-        destination = random.choice(destinations)
+        destination = self.rng.choice(destinations)
 
         contract_types = [
             {
                 "desc_template": "High-Value Transport",
                 "requirements": {
-                    "cargo_type": (cargo_type := random.choice(["tech", "agri"])),
-                    "min_amount": (amount := random.randint(400, 600)),
-                    "source": source.name,
-                    "destination": destination.name,
+                    "cargo_type": (cargo_type := self.rng.choice(["tech", "agri"])),
+                    "min_amount": (amount := self.rng.randint(400, 600)),
+                    "source": source.handle,
+                    "destination": destination.handle,
                     "reputation_required": 40
                 },
                 "duration": 10,
@@ -4974,9 +6706,9 @@ class ContractManager:
                 "desc_template": "Diplomatic Mission",
                 "requirements": {
                     "passenger_class": "D",
-                    "count": (count := random.randint(2, 4)),
-                    "source": source.name,
-                    "destination": destination.name,
+                    "count": (count := self.rng.randint(2, 4)),
+                    "source": source.handle,
+                    "destination": destination.handle,
                     "min_satisfaction": 90,
                     "reputation_required": 60
                 },
@@ -4986,7 +6718,7 @@ class ContractManager:
             }
         ]
 
-        contract_type = random.choice(contract_types)
+        contract_type = self.rng.choice(contract_types)
         return Contract(
             contract_type=contract_type["desc_template"].lower().replace(" ", "_"),
             duration=contract_type["duration"],
@@ -5009,6 +6741,7 @@ class ContractManager:
 
         contract = self.available_contracts.pop(contract_index)
         self.active_contracts.append(contract)
+        self.game.events.publish(EVENT_CONTRACT)
         return True, f"Contract accepted: {contract.description}"
 
     def handle_contract_completion(self, contract):
@@ -5029,6 +6762,7 @@ class ContractManager:
         contract.rewards_claimed = True
         self.active_contracts.remove(contract)
         self.completed_contracts.append(contract)
+        self.game.events.publish(EVENT_CONTRACT)
 
         # Display completion message
         self.game.display_simple_message([
@@ -5087,12 +6821,14 @@ class ContractManager:
                 if contract.contract_type == "cargo":
                     self.game.display_simple_message(
                         f"Contract completed: Delivered {contract.progress['amount']} {contract.requirements['cargo_type']} " +
-                        f"from {contract.requirements['source']} to {contract.requirements['destination']}"
+                        f"from {self.game.location_name(contract.requirements['source'])} to "
+                        f"{self.game.location_name(contract.requirements['destination'])}"
                     )
                 elif contract.contract_type == "passenger":
                     self.game.display_simple_message(
                         f"Contract completed: Transported {contract.progress['passengers_delivered']} passengers " +
-                        f"from {contract.requirements['source']} to {contract.requirements['destination']}"
+                        f"from {self.game.location_name(contract.requirements['source'])} to "
+                        f"{self.game.location_name(contract.requirements['destination'])}"
                     )
             elif result["status"] == "updated" and "message" in result:
                 messages.append(result["message"])
@@ -5129,6 +6865,9 @@ class ContractManager:
 
 
 class SpecialCharacter:
+    # Not slotted: each generator adds its own extras (combat stats, demands, culture...),
+    # and slots for all of them cost more than the shared-key __dict__ they would replace
+
     def __init__(self, title, name, role, specialization):
         self.title = title
         self.name = name
@@ -5142,26 +6881,71 @@ class SpecialCharacter:
         self.location_preference = None
         self.special_contracts = []
 
-class SpecialCharacterGenerator:
-    def __init__(self, game):
-        self.game = game  # Store game instance
-    
-        self.titles = {
+def _human_characters():
+    """Title, surname and role pools for generated human characters"""
+    return {
+        "titles": {
             "military": ["Fleet Commander", "Fleet Admiral", "Security Chief", "Defense Director"],
             "science": ["Research Coordinator", "Science Director", "Chief Researcher", "Lab Supervisor"],
             "trade": ["Trade Minister", "Commerce Director", "Market Supervisor", "Exchange Chief"],
             "engineering": ["Engineering Chief", "Tech Director", "Systems Coordinator", "Project Lead"]
-        }
-        
-        self.surnames = ["Wu", "Cheng", "Tahoe", "Singh", "Patel", "Kim", "Rodriguez", "Novak", 
-                        "Chen", "Zhang", "Yamamoto", "Anderson", "Silva", "Kumar", "Hassan"]
-        
-        self.roles = {
+        },
+        "surnames": ["Wu", "Cheng", "Tahoe", "Singh", "Patel", "Kim", "Rodriguez", "Novak",
+                     "Chen", "Zhang", "Yamamoto", "Anderson", "Silva", "Kumar", "Hassan"],
+        "roles": {
             "military": ["Combat training", "Fleet operations", "Security protocols", "Defense systems"],
             "science": ["Research projects", "Lab experiments", "Data analysis", "Discovery missions"],
             "trade": ["Market analysis", "Trade routes", "Economic planning", "Resource management"],
             "engineering": ["System upgrades", "Tech maintenance", "Innovation projects", "Infrastructure"]
         }
+    }
+CONTENT_BUILDERS["human_characters"] = _human_characters
+
+def _vip_passengers():
+    """VIP passenger types: titles, roles, rewards and abilities"""
+    return {
+        "Corporate": {
+            "titles": ["CEO", "Director", "Executive"],
+            "roles": ["business", "finance", "trade"],
+            "rewards": {
+                "base_money": 30000,
+                "reputation": 15,
+                "plot_points": 5
+            },
+            "special_abilities": ["market_insider"]
+        },
+        "Political": {
+            "titles": ["Senator", "Councilor", "Minister"],
+            "roles": ["governance", "diplomacy", "policy"],
+            "rewards": {
+                "base_money": 40000,
+                "reputation": 20,
+                "plot_points": 8
+            },
+            "special_abilities": ["system_influence"]
+        },
+        "Scientific": {
+            "titles": ["Professor", "Director", "Chief Researcher"],
+            "roles": ["research", "development", "innovation"],
+            "rewards": {
+                "base_money": 35000,
+                "reputation": 18,
+                "plot_points": 10
+            },
+            "special_abilities": ["research_bonus"]
+        }
+    }
+CONTENT_BUILDERS["vip_passengers"] = _vip_passengers
+
+class SpecialCharacterGenerator:
+    def __init__(self, game):
+        self.game = game  # Store game instance
+        self.rng = game.random_streams.stream("characters.human")
+    
+        pools = content_table("human_characters")
+        self.titles = pools["titles"]
+        self.surnames = pools["surnames"]
+        self.roles = pools["roles"]
         
         self.known_characters = {}  # Track generated characters
         self.add_vip_templates()
@@ -5170,7 +6954,7 @@ class SpecialCharacterGenerator:
         """Generate a character with optional title and specialization"""
         if title and specialization:
             # Handle direct title/specialization generation
-            name = random.choice(self.surnames)
+            name = self.rng.choice(self.surnames)
             character = SpecialCharacter(
                 title=title,
                 name=name,
@@ -5189,11 +6973,11 @@ class SpecialCharacterGenerator:
             return character
             
         elif char_type == "VIPPassenger":
-            vip_type = random.choice(list(self.vip_templates.keys()))
+            vip_type = self.rng.choice(list(self.vip_templates.keys()))
             template = self.vip_templates[vip_type]
-            title = random.choice(template["titles"])
-            name = random.choice(self.surnames)
-            role = random.choice(template["roles"])
+            title = self.rng.choice(template["titles"])
+            name = self.rng.choice(self.surnames)
+            role = self.rng.choice(template["roles"])
             
             character = SpecialCharacter(
                 title=f"{vip_type} {title}",
@@ -5210,20 +6994,20 @@ class SpecialCharacterGenerator:
             
         elif char_type == "PirateCaptain":
             title = "Rogue Captain"
-            name = f"Captain {random.choice(self.surnames)}"
+            name = f"Captain {self.rng.choice(self.surnames)}"
             character = SpecialCharacter(title, name, "pirate", "combat")
             character.combat_stats = {
                 "attack": 3,
                 "defense": 2,
-                "reward": random.randint(5000, 15000)
+                "reward": self.rng.randint(5000, 15000)
             }
             return character
             
         elif char_type in ["Neurodroid", "Agrobot"]:
             title = f"{char_type} Leader"
-            name = f"Unit-{random.randint(1000,9999)}"
+            name = f"Unit-{self.rng.randint(1000,9999)}"
             character = SpecialCharacter(title, name, "synthetic", char_type.lower())
-            character.demand = random.randint(10000, 50000)
+            character.demand = self.rng.randint(10000, 50000)
             character.uprising_chance = 0.3
             return character
 
@@ -5231,48 +7015,17 @@ class SpecialCharacterGenerator:
 
     # Added to SpecialCharacterGenerator class for vip passengers
     def add_vip_templates(self):
-        """Add VIP passenger templates to character generator"""
-        self.vip_templates = {
-            "Corporate": {
-                "titles": ["CEO", "Director", "Executive"],
-                "roles": ["business", "finance", "trade"],
-                "rewards": {
-                    "base_money": 30000,
-                    "reputation": 15,
-                    "plot_points": 5
-                },
-                "special_abilities": ["market_insider"]
-            },
-            "Political": {
-                "titles": ["Senator", "Councilor", "Minister"],
-                "roles": ["governance", "diplomacy", "policy"],
-                "rewards": {
-                    "base_money": 40000,
-                    "reputation": 20,
-                    "plot_points": 8
-                },
-                "special_abilities": ["system_influence"]
-            },
-            "Scientific": {
-                "titles": ["Professor", "Director", "Chief Researcher"],
-                "roles": ["research", "development", "innovation"],
-                "rewards": {
-                    "base_money": 35000,
-                    "reputation": 18,
-                    "plot_points": 10
-                },
-                "special_abilities": ["research_bonus"]
-            }
-        }
+        """Attach the shared VIP passenger templates to the character generator"""
+        self.vip_templates = content_table("vip_passengers")
 
     def generate_vip_passenger(self):
         """Generate a VIP passenger with special characteristics"""
-        vip_type = random.choice(list(self.vip_templates.keys()))
+        vip_type = self.rng.choice(list(self.vip_templates.keys()))
         template = self.vip_templates[vip_type]
         
-        title = random.choice(template["titles"])
-        name = random.choice(self.surnames)
-        role = random.choice(template["roles"])
+        title = self.rng.choice(template["titles"])
+        name = self.rng.choice(self.surnames)
+        role = self.rng.choice(template["roles"])
         
         character = SpecialCharacter(
             title=f"{vip_type} {title}",
@@ -5292,6 +7045,10 @@ class SpecialCharacterGenerator:
         return character     
 
 class Quest:
+    __slots__ = ('name', 'description', 'destination', 'reward_money', 'reward_rp', 'quest_type',
+                 'requirements', 'on_complete', 'milestone', 'progress', 'completed', 'target_progress',
+                 'location_requirement', 'rewards', 'failed', 'tracked_progress')
+
     def __init__(self, name, description, reward_money, reward_rp, quest_type="generic", 
                  requirements=None, on_complete=None, milestone=None, destination=None, rewards=None):
         self.name = name
@@ -5536,20 +7293,50 @@ class Quest:
             game.display_story_message(completion_message)
 
 
+class ContractProgress:
+    """A contract's progress counters, read and written like the dict they used to be"""
+    __slots__ = ('amount', 'destinations_visited', 'passengers_delivered', 'source_visited', 'turns_remaining')
+
+    def __init__(self, turns_remaining):
+        self.amount = 0
+        self.destinations_visited = set()
+        self.passengers_delivered = 0
+        self.source_visited = False
+        self.turns_remaining = turns_remaining
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
 class Contract:
+    __slots__ = ('contract_type', 'duration', 'requirements', 'rewards', 'description', 'progress',
+                 'completed', 'rewards_claimed', 'failed', 'last_update_turn', 'trade_history')
+
     def __init__(self, contract_type, duration, requirements, rewards, description):
         self.contract_type = contract_type
         self.duration = duration
         self.requirements = requirements
         self.rewards = rewards
         self.description = description
-        self.progress = {
-            'amount': 0,
-            'destinations_visited': set(),
-            'passengers_delivered': 0,
-            'source_visited': False,
-            'turns_remaining': duration
-        }
+        self.progress = ContractProgress(duration)
         self.completed = False
         self.rewards_claimed = False
         self.failed = False
@@ -5573,7 +7360,7 @@ class Contract:
             return {"status": "failed", "reason": "time_expired"}
 
         # Record location visit
-        if current_location:
+        if current_location is not None:
             self.progress['destinations_visited'].add(current_location)
 
         if self.contract_type == "cargo":
@@ -5645,8 +7432,8 @@ class Contract:
 
         return {"status": "in_progress"}
 
-    def get_status_display(self):
-        """Get formatted status display"""
+    def get_status_display(self, location_name):
+        """Get formatted status display; location_name maps a location handle to its name"""
         if self.completed:
             return "✓ COMPLETED - Ready to claim"
         elif self.failed:
@@ -5659,8 +7446,8 @@ class Contract:
         if self.contract_type == "cargo":
             cargo_type = self.requirements.get('cargo_type')
             status_lines.extend([
-                f"Source ({self.requirements['source']}): {'✓ Visited' if self.progress['source_visited'] else '□ Not visited'}",
-                f"Destination ({self.requirements['destination']}): {'✓ Visited' if self.requirements['destination'] in self.progress['destinations_visited'] else '□ Not visited'}",
+                f"Source ({location_name(self.requirements['source'])}): {'✓ Visited' if self.progress['source_visited'] else '□ Not visited'}",
+                f"Destination ({location_name(self.requirements['destination'])}): {'✓ Visited' if self.requirements['destination'] in self.progress['destinations_visited'] else '□ Not visited'}",
                 f"Delivered: {self.progress['amount']}/{self.requirements.get('min_amount')} {cargo_type}"
             ])
         elif self.contract_type == "passenger":
@@ -5671,8 +7458,8 @@ class Contract:
             
         return "\n".join(status_lines)
 
-    def get_trade_history_display(self):
-        """Get formatted trade history"""
+    def get_trade_history_display(self, location_name):
+        """Get formatted trade history; location_name maps a location handle to its name"""
         if not hasattr(self, 'trade_history') or not self.trade_history:
             return "No trade history recorded"
             
@@ -5680,12 +7467,12 @@ class Contract:
         if self.contract_type == "cargo":
             for trade in self.trade_history:
                 history_lines.append(
-                    f"Turn {trade.get('turn', '?')}: Delivered {trade.get('amount', 0)} units of {self.requirements.get('cargo_type', 'cargo')} at {trade.get('location', 'Unknown')}"
+                    f"Turn {trade.get('turn', '?')}: Delivered {trade.get('amount', 0)} units of {self.requirements.get('cargo_type', 'cargo')} at {location_name(trade['location']) if 'location' in trade else 'Unknown'}"
                 )
         elif self.contract_type == "passenger":
             for trade in self.trade_history:
                 history_lines.append(
-                    f"Turn {trade.get('turn', '?')}: Delivered {trade.get('count', 1)} passengers at {trade.get('location', 'Unknown')}"
+                    f"Turn {trade.get('turn', '?')}: Delivered {trade.get('count', 1)} passengers at {location_name(trade['location']) if 'location' in trade else 'Unknown'}"
                 )
         
         return "\n".join(history_lines) if history_lines else "No trade history recorded"
@@ -5762,7 +7549,7 @@ class StoryContract(Contract):
         self.follow_up_contract = story_data.get("follow_up", None)
 
     @staticmethod
-    def generate_story_contract(character, milestone):
+    def generate_story_contract(character, milestone, rng=random):
         """Generate a contract tied to story progression"""
         contract_types = {
             "military": [
@@ -5796,7 +7583,7 @@ class StoryContract(Contract):
         
         spec = character.specialization
         if spec in contract_types:
-            template = random.choice(contract_types[spec])
+            template = rng.choice(contract_types[spec])
             return StoryContract(
                 contract_type=template["type"],
                 duration=template["duration"],
@@ -5852,6 +7639,8 @@ class ClassificationBasedQuest(Quest):
         return None
 
 class PassengerModule:
+    __slots__ = ('name', 'capacity', 'comfort_level', 'cost', 'passengers', 'special')
+
     def __init__(self, name, capacity, comfort_level, cost):
         self.name = name
         self.capacity = capacity  # How many passengers it can hold
@@ -5860,16 +7649,20 @@ class PassengerModule:
         self.passengers = []
 
 class Passenger:
-    def __init__(self, name, destination, wealth_level):
+    # Story, VIP and synthetic passengers carry extra attributes in __dict__
+    __slots__ = ('name', 'destination', 'wealth_level', 'satisfaction', 'turns_waiting',
+                 'classification', '__dict__')
+
+    def __init__(self, name, destination, wealth_level, rng=None):
         self.name = name
-        self.destination = destination
+        self.destination = destination  # Location handle
         self.wealth_level = wealth_level  # 1-5
         self.satisfaction = 100
         self.turns_waiting = 0
         # Add passenger classification
-        self.classification = self.generate_classification()
+        self.classification = self.generate_classification(rng if rng is not None else random)
         
-    def generate_classification(self):
+    def generate_classification(self, rng=random):
         classifications = [
             ("S", "Scientist", "science"),
             ("M", "Military", "military"),
@@ -5878,7 +7671,7 @@ class Passenger:
             ("D", "Diplomat", "diplomacy"),
             ("R", "Researcher", "research")
         ]
-        class_code, class_name, class_type = random.choice(classifications)
+        class_code, class_name, class_type = rng.choice(classifications)
         return {
             "code": class_code,
             "name": class_name,
@@ -5886,69 +7679,84 @@ class Passenger:
         }
 
 
+def _port_modules():
+    """Passenger modules sold at ports, by menu number"""
+    return {
+        "1": {
+            "name": "Basic Passenger",
+            "capacity": 4,
+            "comfort_level": 1,
+            "cost": 5000
+        },
+        "2": {
+            "name": "Standard Passenger",
+            "capacity": 8,
+            "comfort_level": 2,
+            "cost": 10000
+        },
+        "3": {
+            "name": "Luxury Passenger",
+            "capacity": 4,
+            "comfort_level": 4,
+            "cost": 20000
+        },
+        "4": {
+            "name": "Life Support Module",
+            "capacity": 4,
+            "comfort_level": 1,
+            "cost": 8000
+        },
+        "5": {
+            "name": "Business Class A",
+            "capacity": 2,
+            "comfort_level": 5,
+            "cost": 25000
+        },
+        "6": {
+            "name": "Research Lab Module",
+            "capacity": 2,
+            "comfort_level": 3,
+            "cost": 30000,
+            "special": "research_bonus"
+        },
+        "7": {
+            "name": "Colony Transport Mod.",
+            "capacity": 12,
+            "comfort_level": 2,
+            "cost": 35000,
+            "special": "colonist_bonus"
+        },
+        "8": {
+            "name": "Diplomatic Suite Mod.",
+            "capacity": 1,
+            "comfort_level": 6,
+            "cost": 40000,
+            "special": "diplomatic_bonus"
+        }
+    }
+CONTENT_BUILDERS["port_modules"] = _port_modules
+
+def _passenger_names():
+    """Name pools for generated passengers"""
+    return {
+        "first": ["John", "Emma", "Zara", "Chen", "Raj", "Ana", "Igor", "Yuki", "Omar", "Luna"],
+        "last": ["Smith", "Patel", "Wong", "Garcia", "Petrov", "Tanaka", "Mueller", "Kim", "Hassan", "Silva"],
+    }
+CONTENT_BUILDERS["passenger_names"] = _passenger_names
+
 class Port:
     def __init__(self, game):
         self.game = game
-        self.available_modules = {
-                "1": {
-                    "name": "Basic Passenger",
-                    "capacity": 4,
-                    "comfort_level": 1,
-                    "cost": 5000
-                },
-                "2": {
-                    "name": "Standard Passenger",
-                    "capacity": 8,
-                    "comfort_level": 2,
-                    "cost": 10000
-                },
-                "3": {
-                    "name": "Luxury Passenger",
-                    "capacity": 4,
-                    "comfort_level": 4,
-                    "cost": 20000
-                },
-                "4": {
-                    "name": "Life Support Module",
-                    "capacity": 4,
-                    "comfort_level": 1,
-                    "cost": 8000
-                },
-                "5": {
-                    "name": "Business Class A",
-                    "capacity": 2,
-                    "comfort_level": 5,
-                    "cost": 25000
-                },
-                "6": {
-                    "name": "Research Lab Module",
-                    "capacity": 2,
-                    "comfort_level": 3,
-                    "cost": 30000,
-                    "special": "research_bonus"
-                },
-                "7": {
-                    "name": "Colony Transport Mod.",
-                    "capacity": 12,
-                    "comfort_level": 2,
-                    "cost": 35000,
-                    "special": "colonist_bonus"
-                },
-                "8": {
-                    "name": "Diplomatic Suite Mod.",
-                    "capacity": 1,
-                    "comfort_level": 6,
-                    "cost": 40000,
-                    "special": "diplomatic_bonus"
-                }
-            }
+        self.rng = game.random_streams.stream("port")
+        self.available_modules = content_table("port_modules")
         
-        # List of passengers waiting at each location
+        # List of passengers waiting at each location, by location handle
         self.waiting_passengers = {}
         
         # Passenger names for random generation
-        self.first_names = ["John", "Emma", "Zara", "Chen", "Raj", "Ana", "Igor", "Yuki", "Omar", "Luna"]
-        self.last_names = ["Smith", "Patel", "Wong", "Garcia", "Petrov", "Tanaka", "Mueller", "Kim", "Hassan", "Silva"]
+        names = content_table("passenger_names")
+        self.first_names = names["first"]
+        self.last_names = names["last"]
 
     def get_special_characters(self):
         """Get special characters present at port"""
@@ -5960,26 +7768,28 @@ class Port:
 
     def generate_passenger(self, current_location):
         """Generate a random passenger"""
-        name = f"{random.choice(self.first_names)} {random.choice(self.last_names)}"
+        name = f"{self.rng.choice(self.first_names)} {self.rng.choice(self.last_names)}"
         # Choose destination from known locations except current
-        possible_destinations = [loc for loc in self.game.known_locations if loc != current_location]
+        possible_destinations = [handle for handle in self.game.locations.handles_of(self.game.known_locations)
+                                 if handle != current_location]
         if not possible_destinations:
             return None
-        destination = random.choice(possible_destinations)
-        wealth_level = random.randint(1, 5)
-        return Passenger(name, destination, wealth_level)
+        destination = self.rng.choice(possible_destinations)
+        wealth_level = self.rng.randint(1, 5)
+        return Passenger(name, destination, wealth_level, rng=self.rng)
 
     def add_special_passenger(self, character):
         """Add a special character to waiting passengers list"""
-        current_location = self.game.current_location.name
+        current_location = self.game.current_location.handle
         if current_location not in self.waiting_passengers:
             self.waiting_passengers[current_location] = []
             
         # Create passenger object from character
         passenger = Passenger(
             name=character.full_name,
-            destination=random.choice(list(self.game.known_locations)),
-            wealth_level=5  # VIPs and special characters are wealthy
+            destination=self.rng.choice(self.game.locations.handles_of(self.game.known_locations)),
+            wealth_level=5,  # VIPs and special characters are wealthy
+            rng=self.rng
         )
         
         # Add character-specific attributes
@@ -6003,11 +7813,11 @@ class Port:
                                            if p.turns_waiting < 10]
 
         # Check for special character spawning
-        if random.random() < 0.2:  # 20% chance per turn
+        if self.rng.random() < 0.2:  # 20% chance per turn
             self.game.reputation_manager.spawn_special_passenger()
 
         # Add new passengers (1-3 per turn)
-        new_passengers = random.randint(1, 3)
+        new_passengers = self.rng.randint(1, 3)
         for _ in range(new_passengers):
             passenger = self.generate_passenger(location)
             if passenger:
@@ -6058,7 +7868,7 @@ class Port:
                     total_passengers += 1
                     content.append([
                         f"{passenger.name}",
-                        f"→ {passenger.destination}",
+                        f"→ {self.game.location_name(passenger.destination)}",
                         f"Satisfaction: {passenger.satisfaction}%"
                     ])
         if total_passengers == 0:
@@ -6067,12 +7877,12 @@ class Port:
         # Show waiting passengers at current location
         content.append([""])
         content.append(["Waiting Passengers"])
-        location = self.game.current_location.name
+        location = self.game.current_location.handle
         if location in self.waiting_passengers and self.waiting_passengers[location]:
             for passenger in self.waiting_passengers[location]:
                 content.append([
                     f"{passenger.name}",
-                    f"→ {passenger.destination}",
+                    f"→ {self.game.location_name(passenger.destination)}",
                     f"Class: {passenger.wealth_level}"
                 ])
         else:
@@ -6102,7 +7912,7 @@ class Port:
             menu_content.append([f""])
             for cmd, (shortcut, desc) in options.items():
                 menu_content.append([f"{cmd}/{shortcut if shortcut else ''}: {desc}"])
-            print(self.game.create_box(menu_content, 'single'))
+            self.game.io.write(self.game.create_box(menu_content, 'single'))
 
             valid_inputs = [cmd for cmd in options.keys()] + [s[0] for s in options.values() if s[0]]
             action = self.game.validate_input("Choose action: ", valid_inputs)
@@ -6111,8 +7921,8 @@ class Port:
                 break
                 
             elif action in ['view', 'v']:
-                print(self.display_port_info())
-                time.sleep(2)
+                self.game.io.write(self.display_port_info())
+                self.game.io.sleep(2)
                 
             elif action in ['modules', 'm']:
                 self.handle_module_purchase()
@@ -6122,7 +7932,7 @@ class Port:
                 
             elif action in ['unload', 'u']:
                 self.handle_passenger_unloading()
-                time.sleep(2)
+                self.game.io.sleep(2)
             
             elif action in ['contracts', 'c']:
                 self.game.contract_manager.handle_contract_menu()
@@ -6153,7 +7963,7 @@ class Port:
 #                    special #yet uinimplemented module special
                 ])
                     
-            print(self.game.create_box(content, 'double'))
+            self.game.io.write(self.game.create_box(content, 'double'))
             
             module_id = self.game.validate_input(
                 "Enter module number to buy (or 'back'): ",
@@ -6197,7 +8007,7 @@ class Port:
     def handle_passenger_boarding(self):
         """Handle passenger boarding with removal from waiting list"""
         while True:
-            location = self.game.current_location.name
+            location = self.game.current_location.handle
             
             if not hasattr(self.game.ship, 'passenger_modules'):
                 self.game.display_simple_message("No passenger modules installed!")
@@ -6228,7 +8038,7 @@ class Port:
                 "Enter numbers to select passengers, 'refresh/r' to refresh list, 'autoboard/a' for auto boarding, or Enter to cancel:", 0
             )
             
-            selection = input(">>> ").strip().lower()
+            selection = self.game.io.read(">>> ").strip().lower()
             
             if not selection:  # Empty Enter
                 return
@@ -6269,7 +8079,7 @@ class Port:
                 self.game.display_simple_message("No passenger modules installed!")
                 return
                     
-            current_location = self.game.current_location.name
+            current_location = self.game.current_location.handle
             passengers_to_unload = []
             total_earnings = 0
             
@@ -6320,6 +8130,7 @@ class Port:
 
                         # Increment total passengers delivered
                         self.game.reputation_manager.total_passengers += 1
+                        self.game.events.publish(EVENT_PASSENGERS)
 
                         # Record unloading result
                         passengers_to_unload.append({
@@ -6360,7 +8171,7 @@ class Port:
                 content.append([""])
                 content.append([f"Total Earnings: {self.game.format_money(total_earnings)}"])
                 
-                print(self.game.create_box(content, 'double'))
+                self.game.io.write(self.game.create_box(content, 'double'))
             else:
                 self.game.display_simple_message("No passengers to unload here!")
 #                self.game.clear_screen()
@@ -6376,30 +8187,30 @@ class Port:
             "R": ("Research Foundation", 2.5, "Research capabilities enhanced!")
         }
         passenger_class = passenger.classification["code"]
-        if random.random() < 0.3:  # 30% chance for bonus
+        if self.rng.random() < 0.3:  # 30% chance for bonus
             return bonus_types.get(passenger_class)
         return None
 
 
     def handle_autoboard(self, available_modules):
         """Handle automatic passenger boarding based on destination"""
-        location = self.game.current_location.name
+        location = self.game.current_location.handle
         waiting_passengers = self.waiting_passengers[location]
         
         # Get unique destinations
-        destinations = sorted(set(p.destination for p in waiting_passengers))
+        destinations = sorted(set(p.destination for p in waiting_passengers), key=self.game.location_name)
         
         # Show destinations
         content = [["Available Destinations"]]
         for i, dest in enumerate(destinations, 1):
             matching = sum(1 for p in waiting_passengers if p.destination == dest)
-            content.append([f"{i}. {dest}", f"{matching} passengers waiting"])
-        print(self.game.create_box(content, 'single'))
+            content.append([f"{i}. {self.game.location_name(dest)}", f"{matching} passengers waiting"])
+        self.game.io.write(self.game.create_box(content, 'single'))
         
         # Get destination choice
         self.game.display_simple_message("Choose destination number:", 0)
         try:
-            choice = int(input(">>> "))
+            choice = int(self.game.io.read(">>> "))
             if 1 <= choice <= len(destinations):
                 target_dest = destinations[choice-1]
                 
@@ -6424,7 +8235,7 @@ class Port:
         for module in self.game.ship.passenger_modules:
             passengers_info = []
             for p in module.passengers:
-                passengers_info.append(f"{p.name} [{p.classification['code']}] → {p.destination}")
+                passengers_info.append(f"{p.name} [{p.classification['code']}] → {self.game.location_name(p.destination)}")
             module_status.append([
                 f"{module.name}",
                 f"({len(module.passengers)}/{module.capacity})",
@@ -6432,13 +8243,13 @@ class Port:
             ])
             for p_info in passengers_info:
                 module_status.append([f"└─ {p_info}"])
-        print(self.game.create_box(module_status, 'single'))
+        self.game.io.write(self.game.create_box(module_status, 'single'))
 
     def display_waiting_passengers(self):
         """Display waiting passengers"""
-        location = self.game.current_location.name
+        location = self.game.current_location.handle
         content = [[""]]
-        content.append(["#", f"Waiting on {location}", "Dest.", "Cls.", "≈Fare"])
+        content.append(["#", f"Waiting on {self.game.current_location.name}", "Dest.", "Cls.", "≈Fare"])
         
         waiting_passengers = self.waiting_passengers[location]
         for i, passenger in enumerate(waiting_passengers, 1):
@@ -6450,12 +8261,12 @@ class Port:
             content.append([
                 str(i),
                 f"{passenger.name} [{passenger.classification['code']}]",
-                passenger.destination,
+                self.game.location_name(passenger.destination),
                 f"L{passenger.wealth_level}",
                 self.game.format_money(est_fare)
             ])
         
-        print(self.game.create_box(content, 'double'))            
+        self.game.io.write(self.game.create_box(content, 'double'))            
 
     def handle_module_assignment(self, selected_passengers, available_modules):
         """Handle assigning selected passengers to modules"""
@@ -6467,9 +8278,9 @@ class Port:
             for i, passenger in enumerate(passengers_left, 1):
                 content.append([
                     f"{i}. {passenger.name} [{passenger.classification['code']}]",
-                    passenger.destination
+                    self.game.location_name(passenger.destination)
                 ])
-            print(self.game.create_box(content, 'single'))
+            self.game.io.write(self.game.create_box(content, 'single'))
             
             # Show available modules
             module_content = [["Available Modules"]]
@@ -6479,13 +8290,13 @@ class Port:
                     f"({len(module.passengers)}/{module.capacity})",
                     f"Comfort: {module.comfort_level}"
                 ])
-            print(self.game.create_box(module_content, 'single'))
+            self.game.io.write(self.game.create_box(module_content, 'single'))
             
             # Get module choice with auto option
             self.game.display_simple_message(
                 "Choose module number, 'auto/a' for automatic assignment, or 'back':", 0
             )
-            choice = input(">>> ").strip().lower()
+            choice = self.game.io.read(">>> ").strip().lower()
             
             if choice == 'back':
                 break
@@ -6524,7 +8335,7 @@ class Port:
         sorted_passengers = sorted(passengers, key=lambda p: p.wealth_level, reverse=True)
         
         assigned = 0
-        location = self.game.current_location.name
+        location = self.game.current_location.handle
         
         for passenger in sorted_passengers[:]:  # Use slice to create copy for iteration
             for module in sorted_modules:
@@ -6556,22 +8367,22 @@ class Port:
                 for p in module.passengers:
                     module_info.append([
                         f"└─ {p.name} [{p.classification['code']}]",
-                        f"To: {p.destination}",
+                        f"To: {self.game.location_name(p.destination)}",
                         f"Satisf.: {p.satisfaction}%"
                     ])
             else:
                 module_info.append(["└─ Empty"])
             module_info.append([""])
                 
-        print(self.game.create_box(module_info, 'double'))
-        input("Press Enter to continue...")
+        self.game.io.write(self.game.create_box(module_info, 'double'))
+        self.game.io.wait()
 
     def handle_passenger_selection(self, available_passengers):
         """Handle batch passenger selection"""
         self.game.display_simple_message("Enter passenger numbers separated by spaces (e.g., '1 2 15') or 'back':", 0)
         while True:
             try:
-                selection = input(">>> ").strip().lower()
+                selection = self.game.io.read(">>> ").strip().lower()
                 if selection == 'back':
                     return None
                     
@@ -6615,182 +8426,192 @@ class Port:
                 # Update satisfaction
                 passenger.satisfaction = max(0, min(100, passenger.satisfaction + change))
 
-class Shop:
-    def __init__(self):
-        self.base_equipment = {
-            "navcomp": {
-                "price": 500,
-                "description": "Navigation computer reveals all destinations",
-                "tech_required": 1,
-                "plot_required": 0
-            },
-            "scanner": {
-                "price": 700,
-                "description": "Basic scanner improves resource detection",
-                "tech_required": 2,
-                "plot_required": 0
-            },
-            "probe": {
-                "price": 900,
-                "description": "Deep space probe increases exploration success",
+def _shop_base_equipment():
+    """Equipment every shop can stock, subject to tech level and plot progress"""
+    return {
+        "navcomp": {
+            "price": 500,
+            "description": "Navigation computer reveals all destinations",
+            "tech_required": 1,
+            "plot_required": 0
+        },
+        "scanner": {
+            "price": 700,
+            "description": "Basic scanner improves resource detection",
+            "tech_required": 2,
+            "plot_required": 0
+        },
+        "probe": {
+            "price": 900,
+            "description": "Deep space probe increases exploration success",
+            "tech_required": 3,
+            "plot_required": 10
+        },
+        "turrets": {
+            "price": 1200,
+            "description": "Defense turrets to automatically repel pirates",
+            "tech_required": 4,
+            "plot_required": 15
+        },
+        "shield": {
+            "price": 1500,
+            "description": "Energy shield reduces damage taken in combat",
+            "tech_required": 5,
+            "plot_required": 20
+        },
+        "patcher": {
+            "price": 300,
+            "description": "Hull patcher repairs minor combat damage",
+            "tech_required": 1,
+            "plot_required": 0
+        },
+        # Transport Equipment
+        "cargo_extender": {
+            "price": 5000,
+            "description": "Increases cargo capacity by 20%",
+            "tech_required": 3,
+            "plot_required": 25
+        },
+        "containment_field": {
+            "price": 8000,
+            "description": "Specialized storage for salt/fuel (+30% capacity)",
+            "tech_required": 4,
+            "plot_required": 30
+        },
+        "auto_loader": {
+            "price": 12000,
+            "description": "Reduces loading/unloading time (-1 turn per trade)",
+            "tech_required": 5,
+            "plot_required": 35
+        },
+        # Advanced Transport Equipment
+        "quantum_compressor": {
+            "price": 20000,
+            "description": "Advanced compression (+50% capacity for all cargo)",
+            "tech_required": 6,
+            "plot_required": 50
+        },
+        "stasis_vault": {
+            "price": 25000,
+            "description": "Perfect resource preservation (+75% capacity for special resources)",
+            "tech_required": 7,
+            "plot_required": 60
+        },
+        "temporal_accelerator": {
+            "price": 30000,
+            "description": "Time dilation for faster delivery (-2 turns per trade)",
+            "tech_required": 8,
+            "plot_required": 75
+        }
+    }
+CONTENT_BUILDERS["shop_base_equipment"] = _shop_base_equipment
+
+def _shop_location_equipment():
+    """Equipment only stocked at one type of location"""
+    equipment = {
+        "AsteroidBase": {
+            "mining_laser": {
+                "price": 2000,
+                "description": "Improves mining efficiency and defense",
                 "tech_required": 3,
-                "plot_required": 10
-            },
-            "turrets": {
-                "price": 1200,
-                "description": "Defense turrets to automatically repel pirates",
-                "tech_required": 4,
                 "plot_required": 15
-            },
-            "shield": {
-                "price": 1500,
-                "description": "Energy shield reduces damage taken in combat",
-                "tech_required": 5,
+            },  
+            "cargo_scanner": {
+                "price": 1800,
+                "description": "Detects valuable mineral deposits",
+                "tech_required": 4,
                 "plot_required": 20
             },
-            "patcher": {
-                "price": 300,
-                "description": "Hull patcher repairs minor combat damage",
-                "tech_required": 1,
-                "plot_required": 0
-            },
-            # Transport Equipment
-            "cargo_extender": {
-                "price": 5000,
-                "description": "Increases cargo capacity by 20%",
-                "tech_required": 3,
+            "shield_booster": {
+                "price": 2500,
+                "description": "Offers extra protection in asteroid fields",
+                "tech_required": 5,
                 "plot_required": 25
             },
-            "containment_field": {
-                "price": 8000,
-                "description": "Specialized storage for salt/fuel (+30% capacity)",
+            "mining_compressor": {
+                "price": 15000,
+                "description": "Specialized for asteroid mining (+40% capacity for mined resources)",
+                "tech_required": 6,
+                "plot_required": 40
+            }
+        },
+        "DeepSpaceOutpost": {
+            "advanced_radar": {
+                "price": 2200,
+                "description": "Early warning system for threats",
                 "tech_required": 4,
                 "plot_required": 30
             },
-            "auto_loader": {
-                "price": 12000,
-                "description": "Reduces loading/unloading time (-1 turn per trade)",
+            "combat_drone": {
+                "price": 3000,
+                "description": "Assists in space battles",
                 "tech_required": 5,
                 "plot_required": 35
             },
-            # Advanced Transport Equipment
-            "quantum_compressor": {
-                "price": 20000,
-                "description": "Advanced compression (+50% capacity for all cargo)",
+            "repair_bot": {
+                "price": 2800,
+                "description": "Automatic repairs during travel",
                 "tech_required": 6,
+                "plot_required": 40
+            },
+            "emergency_warp": {
+                "price": 18000,
+                "description": "Emergency escape system (50% chance to avoid combat)",
+                "tech_required": 7,
                 "plot_required": 50
+            }
+        },
+        "ResearchColony": {
+            "research_module": {
+                "price": 2500,
+                "description": "Improves research point gains",
+                "tech_required": 5,
+                "plot_required": 40
             },
-            "stasis_vault": {
-                "price": 25000,
-                "description": "Perfect resource preservation (+75% capacity for special resources)",
+            "data_analyzer": {
+                "price": 2800,
+                "description": "Better research success rates",
+                "tech_required": 6,
+                "plot_required": 45
+            },
+            "quantum_scanner": {
+                "price": 3500,
+                "description": "Reveals anomalies and secrets",
                 "tech_required": 7,
-                "plot_required": 60
+                "plot_required": 50
             },
-            "temporal_accelerator": {
-                "price": 30000,
-                "description": "Time dilation for faster delivery (-2 turns per trade)",
+            "containment_optimizer": {
+                "price": 22000,
+                "description": "Smart cargo optimization (+25% capacity and -1 turn per trade)",
                 "tech_required": 8,
-                "plot_required": 75
+                "plot_required": 60
             }
         }
+    }
 
-        # Location-specific items with requirements
-        self.location_equipment = {
-            "AsteroidBase": {
-                "mining_laser": {
-                    "price": 2000,
-                    "description": "Improves mining efficiency and defense",
-                    "tech_required": 3,
-                    "plot_required": 15
-                },  
-                "cargo_scanner": {
-                    "price": 1800,
-                    "description": "Detects valuable mineral deposits",
-                    "tech_required": 4,
-                    "plot_required": 20
-                },
-                "shield_booster": {
-                    "price": 2500,
-                    "description": "Offers extra protection in asteroid fields",
-                    "tech_required": 5,
-                    "plot_required": 25
-                },
-                "mining_compressor": {
-                    "price": 15000,
-                    "description": "Specialized for asteroid mining (+40% capacity for mined resources)",
-                    "tech_required": 6,
-                    "plot_required": 40
-                }
-            },
-            "DeepSpaceOutpost": {
-                "advanced_radar": {
-                    "price": 2200,
-                    "description": "Early warning system for threats",
-                    "tech_required": 4,
-                    "plot_required": 30
-                },
-                "combat_drone": {
-                    "price": 3000,
-                    "description": "Assists in space battles",
-                    "tech_required": 5,
-                    "plot_required": 35
-                },
-                "repair_bot": {
-                    "price": 2800,
-                    "description": "Automatic repairs during travel",
-                    "tech_required": 6,
-                    "plot_required": 40
-                },
-                "emergency_warp": {
-                    "price": 18000,
-                    "description": "Emergency escape system (50% chance to avoid combat)",
-                    "tech_required": 7,
-                    "plot_required": 50
-                }
-            },
-            "ResearchColony": {
-                "research_module": {
-                    "price": 2500,
-                    "description": "Improves research point gains",
-                    "tech_required": 5,
-                    "plot_required": 40
-                },
-                "data_analyzer": {
-                    "price": 2800,
-                    "description": "Better research success rates",
-                    "tech_required": 6,
-                    "plot_required": 45
-                },
-                "quantum_scanner": {
-                    "price": 3500,
-                    "description": "Reveals anomalies and secrets",
-                    "tech_required": 7,
-                    "plot_required": 50
-                },
-                "containment_optimizer": {
-                    "price": 22000,
-                    "description": "Smart cargo optimization (+25% capacity and -1 turn per trade)",
-                    "tech_required": 8,
-                    "plot_required": 60
-                }
-            }
-        }
+    # Add specialized location-specific transport equipment
+    equipment["AsteroidBase"]["mining_compressor"] = {
+        "price": 15000,
+        "description": "Specialized for asteroid mining (+40% capacity for mined resources)"
+    }
 
-        # Add specialized location-specific transport equipment
-        self.location_equipment["AsteroidBase"]["mining_compressor"] = {
-            "price": 15000,
-            "description": "Specialized for asteroid mining (+40% capacity for mined resources)"
-        }
-        
-        self.location_equipment["DeepSpaceOutpost"]["emergency_warp"] = {
-            "price": 18000,
-            "description": "Emergency escape system (50% chance to avoid combat during transport)"
-        }
-        
-        self.location_equipment["ResearchColony"]["containment_optimizer"] = {
-            "price": 22000,
-            "description": "Smart cargo optimization (+25% capacity and -1 turn per trade)"
-        }
+    equipment["DeepSpaceOutpost"]["emergency_warp"] = {
+        "price": 18000,
+        "description": "Emergency escape system (50% chance to avoid combat during transport)"
+    }
+
+    equipment["ResearchColony"]["containment_optimizer"] = {
+        "price": 22000,
+        "description": "Smart cargo optimization (+25% capacity and -1 turn per trade)"
+    }
+    return equipment
+CONTENT_BUILDERS["shop_location_equipment"] = _shop_location_equipment
+
+class Shop:
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+        self.base_equipment = content_table("shop_base_equipment")
+        self.location_equipment = content_table("shop_location_equipment")
         
         # Track sold items per turn
         # Track items for current turn
@@ -6823,7 +8644,7 @@ class Shop:
             
         # Select random items from filtered pool
         if available_pool:
-            selected_items = random.sample(available_pool, min(2, len(available_pool)))
+            selected_items = self.rng.sample(available_pool, min(2, len(available_pool)))
             self.current_offerings = [item[0] for item in selected_items]
             return selected_items
         
@@ -6938,8 +8759,15 @@ class Shop:
         self.current_turn_items = []
 
 
+    def own_equipment(self):
+        """Swap the shared equipment tables for private copies before changing them"""
+        if isinstance(self.base_equipment, types.MappingProxyType):
+            self.base_equipment = thaw_content(self.base_equipment)
+            self.location_equipment = thaw_content(self.location_equipment)
+
     def add_new_item(self, item_name, price, description, location_type=None):
         """Add a new item to the shop"""
+        self.own_equipment()
         item_data = {
             "price": price,
             "description": description
@@ -6954,6 +8782,7 @@ class Shop:
 
     def remove_item(self, item_name, location_type=None):
         """Remove an item from the shop"""
+        self.own_equipment()
         if location_type and location_type in self.location_equipment:
             if item_name in self.location_equipment[location_type]:
                 del self.location_equipment[location_type][item_name]
@@ -6979,11 +8808,554 @@ class Shop:
             return int(base_price * (1.5 ** current_level))
         return None          
 
+class MarketView(MutableMapping):
+    """Dict-like view of one location's row in a MarketEngine table"""
+    def __init__(self, table, row, versions=None, engine=None):
+        self.table = table
+        self.row = row
+        self.versions = versions  # Bumped on every write, for caches keyed on market state
+        self.engine = engine  # Lazy engine to catch the row up before a read
+
+    def __getitem__(self, commodity):
+        engine = self.engine
+        if engine is not None and engine.behind(self.row):
+            engine.catch_up(self.row)
+        return self.table[self.row * 4 + MarketEngine.INDEX[commodity]]
+
+    def __setitem__(self, commodity, value):
+        engine = self.engine
+        if engine is not None and engine.behind(self.row):
+            engine.catch_up(self.row)  # Deferred ticks come before this write
+        self.table[self.row * 4 + MarketEngine.INDEX[commodity]] = value
+        if self.versions is not None:
+            self.versions[self.row] += 1
+
+    def __delitem__(self, commodity):
+        raise TypeError("Market commodities cannot be removed")
+
+    def __contains__(self, commodity):
+        return commodity in MarketEngine.INDEX
+
+    def __iter__(self):
+        return iter(MarketEngine.COMMODITIES)
+
+    def __len__(self):
+        return 4
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class MarketEngine:
+    """Galaxy-wide market state: prices, ban timers and production cooldowns
+    for every location in flat locations x commodities tables, advanced in one tick.
+
+    The tick moves prices exactly as Location.update_market always has, one
+    commodity column at a time across the rows it is given. It only runs when
+    asked; play_turn never schedules it.
+
+    The engine's clock follows Game.turn. Each turn opens a sample of every
+    row's opening prices and ban state in fixed-size ring buffers, and trades
+    add their units to it, so history memory stays bounded per location.
+
+    A lazy engine does neither for rows nobody reads: it logs the turn of each
+    galaxy tick, and a row replays the ticks and opens the samples it missed,
+    in the order they happened, when it is next read or written.
+    """
+    COMMODITIES = ('tech', 'agri', 'salt', 'fuel')
+    INDEX = {commodity: i for i, commodity in enumerate(COMMODITIES)}
+    PRICE_CAPS = (200, 200, 150, 250)
+    HISTORY_FIELDS = ('price', 'volume', 'banned')
+
+    def __init__(self, lazy=False, history_turns=64, game=None):
+        self.lazy = lazy
+        self.game = game  # Runs catch-up for lazy rows, which needs the game's research and mining
+        self.catching_up = False
+        self.turn = 0  # World market turn, kept equal to Game.turn
+        self.locations = []
+        self.prices = []  # Plain list: prices mix ints and floats like the old dicts
+        self.ban_timers = array('l')
+        self.cooldowns = array('l')
+        self.evaluated_turn = array('l')  # Newest turn each row has a history sample for
+        self.tick_turns = array('l')  # Turn of each deferred galaxy tick (lazy engines)
+        self.ticked = array('l')  # Deferred ticks each row has replayed
+        self.versions = array('l')  # Per-row change counter for prices and bans
+        self.profiles = []
+
+        # Ring buffers: slot (row * history_turns + turn % history_turns) * 4 + commodity
+        self.history_turns = history_turns
+        self.history_price = array('d')
+        self.history_volume = array('d')
+        self.history_banned = array('b')
+        self.history_turn = array('l')  # Turn stamp per row and slot, -1 when empty
+        self.history_count = array('l')  # Samples written per row
+
+    def attach(self, location, market=None):
+        """Give a location a row in this table and point its market views at it"""
+        if market is None:
+            market = dict(location.market)
+            bans = dict(location.ban_duration)
+            cooldowns = dict(location.production_cooldown)
+        else:
+            bans = cooldowns = {}
+        row = len(self.locations)
+        self.locations.append(location)
+        self.profiles.append(None)
+        self.evaluated_turn.append(self.turn)
+        self.ticked.append(len(self.tick_turns))
+        self.versions.append(0)
+        for commodity in self.COMMODITIES:
+            self.prices.append(market.get(commodity, 0))
+            self.ban_timers.append(bans.get(commodity, 0))
+            self.cooldowns.append(cooldowns.get(commodity, 0))
+        slots = self.history_turns * 4
+        self.history_price.extend(array('d', bytes(8 * slots)))
+        self.history_volume.extend(array('d', bytes(8 * slots)))
+        self.history_banned.extend(array('b', bytes(slots)))
+        self.history_turn.extend(array('l', [-1]) * self.history_turns)
+        self.history_count.append(0)
+        location.market_engine = self
+        location.market_row = row
+        engine = self if self.lazy and self.game is not None else None
+        location.market = MarketView(self.prices, row, self.versions, engine)
+        location.ban_duration = MarketView(self.ban_timers, row, self.versions, engine)
+        location.production_cooldown = MarketView(self.cooldowns, row, engine=engine)
+        self.record_sample(row, self.turn)
+        return row
+
+    def record_sample(self, row, turn):
+        """Write the row's current prices and bans into the history slot for a turn"""
+        slot = row * self.history_turns + turn % self.history_turns
+        base = slot * 4
+        prices = self.prices
+        ban_timers = self.ban_timers
+        for col in range(4):
+            self.history_price[base + col] = prices[row * 4 + col]
+            self.history_volume[base + col] = 0.0
+            self.history_banned[base + col] = ban_timers[row * 4 + col] > 0
+        self.history_turn[slot] = turn
+        self.history_count[row] += 1
+
+    def record_volume(self, row, commodity, quantity):
+        """Add traded units to the history sample for the current world turn"""
+        if self.lazy and self.behind(row):
+            self.catch_up(row)  # Open the samples up to this turn first
+        slot = row * self.history_turns + self.evaluated_turn[row] % self.history_turns
+        self.history_volume[slot * 4 + self.INDEX[commodity]] += quantity
+
+    def history(self, row, commodity, field='price', last=None):
+        """Oldest-to-newest (turn, value) samples for one commodity, at most `last` of them"""
+        if field not in self.HISTORY_FIELDS:
+            raise ValueError(f"Unknown history field: {field}")
+        if self.lazy and self.behind(row):
+            self.catch_up(row)
+        values = getattr(self, 'history_' + field)
+        col = self.INDEX[commodity]
+        size = self.history_turns
+        newest = self.evaluated_turn[row]
+        count = min(self.history_count[row], size)
+        if last is not None:
+            count = min(count, last)
+        samples = []
+        for turn in range(newest - count + 1, newest + 1):
+            slot = row * size + turn % size
+            if self.history_turn[slot] == turn:
+                samples.append((turn, values[slot * 4 + col]))
+        return samples
+
+    def stats(self, row, commodity, field='price', window=None):
+        """min, max, mean, volatility and samples over the last `window` turns"""
+        samples = [value for turn, value in self.history(row, commodity, field, window)]
+        if not samples:
+            return {"samples": 0, "min": None, "max": None, "mean": None, "volatility": None, "last": []}
+        mean = sum(samples) / len(samples)
+        # Volatility: standard deviation of turn-over-turn relative price changes
+        changes = [(b - a) / a for a, b in zip(samples, samples[1:]) if a]
+        if changes:
+            change_mean = sum(changes) / len(changes)
+            volatility = (sum((c - change_mean) ** 2 for c in changes) / len(changes)) ** 0.5
+        else:
+            volatility = 0.0
+        return {
+            "samples": len(samples),
+            "min": min(samples),
+            "max": max(samples),
+            "mean": mean,
+            "volatility": volatility,
+            "last": samples,
+        }
+
+    def profile(self, row):
+        """Per-location tick modifiers, rebuilt only when the buildings change"""
+        location = self.locations[row]
+        cached = self.profiles[row]
+        if cached is not None and cached[0] == len(location.buildings):
+            return cached
+        tradeable = location.get_capabilities().get("can_trade", [])
+        dampers = {}
+        for col, commodity in enumerate(self.COMMODITIES):
+            if commodity not in tradeable:
+                continue
+            # Building dampers in build order, as the per-building loop applied them
+            factors = []
+            for building in location.buildings:
+                if building == "Permaculture Paradise" and commodity == 'agri':
+                    factors.append(0.8)
+                elif building == "The Nanotech Nexus":
+                    factors.append(0.85)
+            dampers[col] = tuple(factors)
+        cached = (len(location.buildings), dampers)
+        self.profiles[row] = cached
+        return cached
+
+    def advance(self, turn):
+        """Move the clock to a game turn, opening its history samples (eagerly only)"""
+        self.turn = turn
+        if not self.lazy:
+            for row in range(len(self.locations)):
+                self.open_samples(row, turn)
+
+    def open_samples(self, row, turn):
+        """Sample the row's current state for every turn it has no sample for, up to turn"""
+        while self.evaluated_turn[row] < turn:
+            self.evaluated_turn[row] += 1
+            self.record_sample(row, self.evaluated_turn[row])
+
+    def defer_tick(self):
+        """Log a galaxy tick for lazy rows to replay when they are read"""
+        self.tick_turns.append(self.turn)
+
+    def behind(self, row):
+        """World turns plus deferred ticks a lazy row has not caught up with"""
+        return self.turn - self.evaluated_turn[row] + len(self.tick_turns) - self.ticked[row]
+
+    def catch_up(self, row):
+        """Replay a lazy row's missed ticks and samples in order; reads made while catching up see the row as is"""
+        if self.catching_up or self.game is None:
+            return
+        self.catching_up = True
+        try:
+            location = self.locations[row]
+            while self.ticked[row] < len(self.tick_turns):
+                # Samples for turns up to the tick's own were opened before it ran
+                self.open_samples(row, self.tick_turns[self.ticked[row]])
+                self.ticked[row] += 1
+                self.game.replay_tick(location)
+            self.open_samples(row, self.turn)
+        finally:
+            self.catching_up = False
+
+    def tick(self, difficulty, rows=None, turns=1):
+        """Advance prices, bans and cooldowns for the given rows (default: all),
+        running `turns` consecutive updates
+        """
+        rows = range(len(self.locations)) if rows is None else rows
+        scale = 1 + difficulty
+        for _ in range(turns):
+            for col in range(4):
+                self.tick_column(col, rows, scale)
+            self.tick_timers(rows)
+        for row in rows:
+            self.versions[row] += 1
+
+    def tick_column(self, col, rows, scale):
+        """One price update for one commodity across every row that trades it.
+
+        Each step of Location.update_market is one list comprehension over
+        the column, rather than the whole update per row; it is still plain
+        Python, not a single vectorized operation.
+        """
+        trading = [row for row in rows if col in self.profile(row)[1]]
+        if not trading:
+            return
+        locations = [self.locations[row] for row in trading]
+        slots = [row * 4 + col for row in trading]
+        prices = self.prices
+
+        # Noise comes from each location's own stream, so batching rows never
+        # changes what a location draws
+        change = [self.draw(location) * scale for location in locations]
+        change = [c + 5 if location.economy == "Booming"
+                  else c - 5 if location.economy == "Declining"
+                  else int(c * 1.2) if location.economy == "Formative"  # More volatile prices
+                  else c
+                  for c, location in zip(change, locations)]
+        change = [max(1, c - 10) if location.stockmarket_base else c for c, location in zip(change, locations)]
+        change = [self.damp(c, self.profiles[row][1][col]) for c, row in zip(change, trading)]
+
+        cap = self.PRICE_CAPS[col]
+        for i, c in zip(slots, change):
+            prices[i] = min(max(1, prices[i] + c), cap)
+
+    @staticmethod
+    def draw(location):
+        """randint(-5, 5) from a location's market stream"""
+        # randint(-5, 5) is randrange's _randbelow(11) - 5; calling it directly
+        # draws the same sequence without two layers of argument checks
+        randbelow = getattr(location.rng, '_randbelow', None)
+        return (randbelow(11) - 5) if randbelow else location.rng.randint(-5, 5)
+
+    @staticmethod
+    def damp(change, factors):
+        for factor in factors:
+            change = max(1, change * factor)
+        return change
+
+    def tick_timers(self, rows):
+        """Count down ban timers and production cooldowns, resetting prices as bans lift"""
+        prices = self.prices
+        ban_timers = self.ban_timers
+        cooldowns = self.cooldowns
+        for row in rows:
+            location = self.locations[row]
+            for i in range(row * 4, row * 4 + 4):
+                if ban_timers[i] > 0:
+                    ban_timers[i] -= 1
+                    if ban_timers[i] == 0:
+                        # Reset price for previously banned commodity
+                        if i % 4 == 0:
+                            prices[i] = 100 - (location.tech_level * 10)
+                        elif i % 4 == 1:
+                            prices[i] = 50 + (location.agri_level * 5)
+                if cooldowns[i] > 0:
+                    cooldowns[i] -= 1
+
+class GalaxyIndex:
+    """Galaxy-wide counts of buildings, mining platforms and location types.
+
+    Locations report their own building and platform changes, and sync()
+    adopts locations that joined or left the galaxy, so every count is a
+    lookup instead of a scan over all locations.
+    """
+    UPRISING_BUILDINGS = ("Neuroengineering Guild", "Agrobot Assembly Line")
+    UPRISING_THRESHOLD = 4
+
+    def __init__(self):
+        self.positions = {}  # location -> index in game.locations
+        self.buildings = {}  # building name -> count
+        self.platforms = {}  # platform resource type -> count
+        self.location_types = {}  # location type -> count
+        self.building_total = 0
+        self.platform_total = 0
+        self.uprising_prone = set()
+        self.stamp = None
+
+    def sync(self, locations):
+        """Adopt the current location list, counting only locations that joined or left"""
+        positions = {location: position for position, location in enumerate(locations)}
+        for location in self.positions.keys() - positions.keys():
+            self.leave(location)
+        for location in positions.keys() - self.positions.keys():
+            self.join(location)
+        self.positions = positions
+
+    def join(self, location):
+        location.galaxy = self
+        for building_name, count in location.building_counts.items():
+            self.building_changed(location, building_name, count)
+        for platform_type, count in location.platform_counts.items():
+            self.platform_changed(location, platform_type, count)
+        self.location_types[location.location_type] = self.location_types.get(location.location_type, 0) + 1
+
+    def leave(self, location):
+        location.galaxy = None
+        for building_name, count in location.building_counts.items():
+            self.building_changed(location, building_name, -count)
+        for platform_type, count in location.platform_counts.items():
+            self.platform_changed(location, platform_type, -count)
+        self.location_types[location.location_type] -= 1
+        self.uprising_prone.discard(location)
+
+    def building_changed(self, location, building_name, delta):
+        self.buildings[building_name] = self.buildings.get(building_name, 0) + delta
+        self.building_total += delta
+        if building_name in self.UPRISING_BUILDINGS:
+            if any(location.count_buildings(name) >= self.UPRISING_THRESHOLD for name in self.UPRISING_BUILDINGS):
+                self.uprising_prone.add(location)
+            else:
+                self.uprising_prone.discard(location)
+
+    def platform_changed(self, location, platform_type, delta):
+        self.platforms[platform_type] = self.platforms.get(platform_type, 0) + delta
+        self.platform_total += delta
+
+    def count_buildings(self, building_name=None):
+        """Buildings of one type across the galaxy, or all of them"""
+        if building_name is None:
+            return self.building_total
+        return self.buildings.get(building_name, 0)
+
+    def count_platforms(self, platform_type=None):
+        """Mining platforms for one resource across the galaxy, or all of them"""
+        if platform_type is None:
+            return self.platform_total
+        return self.platforms.get(platform_type, 0)
+
+    def count_locations(self, location_type):
+        return self.location_types.get(location_type, 0)
+
+    def uprising_sites(self):
+        """[(location, neuroguilds, agrobot lines)] for uprising-prone locations, in galaxy order"""
+        neuroguild, agrobot = self.UPRISING_BUILDINGS
+        return [(location, location.count_buildings(neuroguild), location.count_buildings(agrobot))
+                for location in sorted(self.uprising_prone, key=self.positions.__getitem__)]
+
+class IndexedList(list):
+    """A list that keeps indexes derived from its items in step with them.
+
+    append() indexes the new item with index_item(); every other mutator
+    changes the list and then calls rebuild(), which empties the indexes with
+    reset_index() and indexes every item again. Subclasses override the two
+    hooks, and rebuild() only where they can do it faster.
+    """
+    def index_item(self, item):
+        """Add one item to the indexes"""
+
+    def reset_index(self):
+        """Empty the indexes"""
+
+    def rebuild(self):
+        self.reset_index()
+        for item in self:
+            self.index_item(item)
+
+    def append(self, item):
+        super().append(item)
+        self.index_item(item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self.rebuild()
+
+    def remove(self, item):
+        super().remove(item)
+        self.rebuild()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self.rebuild()
+        return item
+
+    def clear(self):
+        super().clear()
+        self.rebuild()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.rebuild()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.rebuild()
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self.rebuild()
+        return self
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self.rebuild()
+
+    def reverse(self):
+        super().reverse()
+        self.rebuild()
+
+class LocationRegistry(IndexedList):
+    """game.locations: the galaxy's locations in the order they were added.
+
+    Still a list for numbered menus and seeded choices; it also keeps a
+    case-insensitive name index and per-type buckets, and gives each new
+    location a stable integer handle. Game state refers to locations by
+    handle; names are for display. Handles are never reused, so a location
+    taken out of the list still resolves by handle.
+    """
+    def __init__(self, locations=()):
+        super().__init__()
+        self.by_name = {}  # lowercased name -> first location with that name
+        self.by_type = {}  # location type -> [locations] in registry order
+        self.handles = []  # handle -> location
+        self.extend(locations)
+
+    def __reduce__(self):
+        return LocationRegistry, (list(self),)
+
+    def index_item(self, location):
+        if location.handle is None:
+            location.handle = len(self.handles)
+        if location.handle == len(self.handles):
+            self.handles.append(location)
+        self.by_name.setdefault(location.name.lower(), location)
+        self.by_type.setdefault(location.location_type, []).append(location)
+
+    def reset_index(self):
+        self.by_name = {}
+        self.by_type = {}
+
+    def get(self, name):
+        """Location called name, ignoring case, or None"""
+        return self.by_name.get(name.lower())
+
+    def at(self, handle):
+        return self.handles[handle]
+
+    def handle(self, name):
+        """Handle of the location called name, ignoring case, or None"""
+        location = self.by_name.get(name.lower())
+        return None if location is None else location.handle
+
+    def handles_of(self, names):
+        """Handles for names, in the same order"""
+        by_name = self.by_name
+        return [by_name[name.lower()].handle for name in names]
+
+    def of_type(self, location_type):
+        return self.by_type.get(location_type, [])
+
+    def among(self, names):
+        """Locations whose name is in names, in registry order"""
+        return [location for location in self if location.name in names]
+
+class KnownLocations(IndexedList):
+    """game.known_locations: names in the order the player learned them, with set membership"""
+    def __init__(self, names=()):
+        super().__init__()
+        self.names = set()
+        self.extend(names)
+
+    def __reduce__(self):
+        return KnownLocations, (list(self),)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def index_item(self, name):
+        self.names.add(name)
+
+    def rebuild(self):
+        self.names = set(self)  # One pass in C instead of an index_item() call per name
+
 # Define the Location base class, updated
 class Location:
-    def __init__(self, name, location_type, tech_level, agri_level, research_points, economy):
+    # Rarely set attributes (research specialization, trade totals...) go to __dict__
+    __slots__ = ('rng', 'name', 'location_type', 'handle', 'tech_level', 'agri_level', 'research_points',
+                 'economy', 'stockmarket_base', 'stockmarket_cost', 'buildings', 'building_counts',
+                 'exogeology', 'mineral_deposits', 'mining_platforms', 'platform_counts', 'galaxy',
+                 'market_engine', 'market_row', 'market', 'ban_duration', 'production_cooldown',
+                 'security_level', '__dict__')
+
+    def __init__(self, name, location_type, tech_level, agri_level, research_points, economy, rng=None):
+        self.rng = rng if rng is not None else random  # Per-location market stream
         self.name = name
         self.location_type = location_type
+        self.handle = None  # Assigned when the location joins a LocationRegistry
         self.tech_level = tech_level
         self.agri_level = agri_level
         self.research_points = research_points
@@ -6991,16 +9363,60 @@ class Location:
         self.stockmarket_base = False
         self.stockmarket_cost = 5000
         self.buildings = []
+        self.building_counts = {}  # building name -> count, kept in step with buildings
         self.exogeology = self.get_base_exogeology()
-        self.banned_commodities = []
-        self.ban_duration = {}
         self.mineral_deposits = {}
         self.mining_platforms = []
-        self.production_cooldown = {}
-        # Generate market after initializing attributes
-        self.market = self.generate_market()
+        self.platform_counts = {}  # resource type -> count, kept in step with mining_platforms
+        self.galaxy = None  # GalaxyIndex this location reports to
+        # Generate market after initializing attributes; a standalone location
+        # gets its own one-row table until the game moves it into the shared one
+        MarketEngine().attach(self, self.generate_market())
         self.security_level = 5  # Initialize with medium security level
 
+    def __setstate__(self, state):
+        state, slots = state if isinstance(state, tuple) else (state, None)
+        for name, value in (state or {}).items():
+            setattr(self, name, value)
+        for name, value in (slots or {}).items():
+            setattr(self, name, value)
+
+    def add_building(self, building_name):
+        self.buildings.append(building_name)
+        self.building_counts[building_name] = self.building_counts.get(building_name, 0) + 1
+        if self.galaxy is not None:
+            self.galaxy.building_changed(self, building_name, 1)
+
+    def remove_building(self, index):
+        """Remove the building at index from this location and return its name"""
+        building_name = self.buildings.pop(index)
+        self.building_counts[building_name] -= 1
+        if self.galaxy is not None:
+            self.galaxy.building_changed(self, building_name, -1)
+        return building_name
+
+    def count_buildings(self, building_name):
+        return self.building_counts.get(building_name, 0)
+
+    def add_mining_platform(self, platform):
+        self.mining_platforms.append(platform)
+        self.platform_counts[platform['type']] = self.platform_counts.get(platform['type'], 0) + 1
+        if self.galaxy is not None:
+            self.galaxy.platform_changed(self, platform['type'], 1)
+
+    @property
+    def banned_commodities(self):
+        """Commodities with a running trade ban"""
+        return [commodity for commodity in MarketEngine.COMMODITIES if self.ban_duration[commodity] > 0]
+
+    def market_history(self, commodity, field='price', last=None):
+        """Recent (turn, value) samples of price, volume or banned for a commodity"""
+        return self.market_engine.history(self.market_row, commodity, field, last)
+
+    def market_stats(self, commodity, field='price', window=None):
+        """min, max, mean and volatility of a commodity over recent turns"""
+        return self.market_engine.stats(self.market_row, commodity, field, window)
+
     @property
     def commands(self):
         """Get all commands for this location"""
@@ -7008,7 +9424,7 @@ class Location:
     
     def calculate_mining_output(self, platform_type):
         """Calculate mining output based on efficiency and random factors"""
-        base_output = random.randint(10, 20)
+        base_output = self.rng.randint(10, 20)
         efficiency_bonus = self.exogeology / 100
         return int(base_output * efficiency_bonus)
 
@@ -7019,9 +9435,9 @@ class Location:
             if resource_type not in self.production_cooldown or self.production_cooldown[resource_type] <= 0:
                 output = self.calculate_mining_output(resource_type)
                 if resource_type == 'salt':
-                    self.market['salt'] = random.randint(80, 120)
+                    self.market['salt'] = self.rng.randint(80, 120)
                 elif resource_type == 'fuel':
-                    self.market['fuel'] = random.randint(150, 200)
+                    self.market['fuel'] = self.rng.randint(150, 200)
                 self.production_cooldown[resource_type] = 3  # 3 turns cooldown
             else:
                 self.production_cooldown[resource_type] -= 1
@@ -7030,11 +9446,8 @@ class Location:
         """Build a new mining platform for specified deposit"""
         if deposit_type in self.mineral_deposits:
             if self.mineral_deposits[deposit_type] > 0:
-                self.mining_platforms.append({
-                    'type': deposit_type,
-                    'efficiency': self.exogeology,
-                    'capacity': random.randint(100, 200)
-                })
+                self.add_mining_platform(MiningPlatform(deposit_type, self.exogeology,
+                                                        self.rng.randint(100, 200)))
                 self.mineral_deposits[deposit_type] -= 1
                 return True
         return False
@@ -7051,12 +9464,12 @@ class Location:
         # Apply refinery effects
         if "Halide Extraction Refinery" in self.buildings:
             # Salt refinery lowers agri prices, sets salt price
-            market['salt'] = random.randint(100, 150)
+            market['salt'] = self.rng.randint(100, 150)
             market['agri'] = max(1, int(market['agri'] * 0.8))
         
         if "Plasma Catalysis Refinery" in self.buildings:
             # Fuel refinery lowers tech prices, sets fuel price
-            market['fuel'] = random.randint(150, 200)
+            market['fuel'] = self.rng.randint(150, 200)
             market['tech'] = max(1, int(market['tech'] * 0.8))
         
         if "Elemental Fusion Refinery" in self.buildings:
@@ -7098,68 +9511,7 @@ class Location:
 
     def update_market(self, difficulty):
         """Update market prices with location-specific logic"""
-        capabilities = self.get_capabilities()
-        tradeable = capabilities.get("can_trade", [])
-        
-        for commodity in self.market:
-            if commodity not in tradeable:
-                continue
-                
-            # Base price changes with randomization and difficulty scaling
-            base_change = random.randint(-5, 5) * (1 + difficulty)
-            
-            # Apply economic effects
-            if self.economy == "Booming":
-                base_change += 5
-            elif self.economy == "Declining":
-                base_change -= 5
-            elif self.economy == "Formative":
-                base_change = int(base_change * 1.2)  # More volatile prices
-            
-            # Apply stockmarket effects if present
-            if self.stockmarket_base:
-                base_change = max(1, base_change - 10)
-            
-            # Handle building effects
-            for building in self.buildings:
-                if building == "Permaculture Paradise" and commodity == 'agri':
-                    base_change = max(1, base_change * 0.8)
-                elif building == "The Nanotech Nexus":
-                    base_change = max(1, base_change * 0.85)
-
-            # Calculate new price
-            new_price = max(1, self.market[commodity] + base_change)
-            
-            # Apply commodity-specific limits
-            if commodity == 'salt':
-                new_price = min(new_price, 150)
-            elif commodity == 'fuel':
-                new_price = min(new_price, 250)
-            else:
-                new_price = min(new_price, 200)
-                
-            self.market[commodity] = new_price
-
-            # Handle zero prices and bans
-            if new_price == 0 and commodity not in self.banned_commodities:
-                self.add_temporary_ban(commodity, random.randint(2, 4))
-
-        # Update ban durations and remove expired bans
-        for commodity in list(self.ban_duration.keys()):
-            self.ban_duration[commodity] -= 1
-            if self.ban_duration[commodity] <= 0:
-                self.banned_commodities.remove(commodity)
-                del self.ban_duration[commodity]
-                # Reset price for previously banned commodity
-                if commodity == 'tech':
-                    self.market['tech'] = 100 - (self.tech_level * 10)
-                elif commodity == 'agri':
-                    self.market['agri'] = 50 + (self.agri_level * 5)
-
-        # Update production cooldowns
-        for resource_type in list(self.production_cooldown.keys()):
-            if self.production_cooldown[resource_type] > 0:
-                self.production_cooldown[resource_type] -= 1
+        self.market_engine.tick(difficulty, [self.market_row])
 
     def calculate_tax_rate(self, player_rank, profit):
         """Calculate tax rate based on player rank and location type"""
@@ -7192,8 +9544,7 @@ class Location:
 
     def add_temporary_ban(self, commodity, duration):
         """Add a temporary trade ban for a commodity"""
-        if commodity not in self.banned_commodities:
-            self.banned_commodities.append(commodity)
+        if self.ban_duration[commodity] <= 0:
             self.ban_duration[commodity] = duration
 
     def build_building(self, building_name):
@@ -7202,7 +9553,7 @@ class Location:
         if not self.can_build(building_name.lower()):
             return 0  # Return 0 to indicate building not allowed
             
-        cost_multiplier = self.buildings.count(building_name) + 1
+        cost_multiplier = self.count_buildings(building_name) + 1
         
         # Apply building effects
         if building_name == "Mining Facility":
@@ -7231,7 +9582,7 @@ class Location:
             self.market['agri'] = int(self.market['agri'] * 1.3)        
         
         # Add building to location's buildings list
-        self.buildings.append(building_name)
+        self.add_building(building_name)
         
         return cost_multiplier
 
@@ -7241,7 +9592,7 @@ class Location:
 
     def get_term(self, term_type, use_variant=False):
         """Get contextual terminology for this location"""
-        return LocationTerminology.get_term(self.location_type, term_type, use_variant)
+        return LocationTerminology.get_term(self.location_type, term_type, use_variant, self.rng)
 
     def can_trade(self, commodity):
         """Check if this location can trade a specific commodity"""
@@ -7293,32 +9644,38 @@ class Location:
             "ResearchColony": (16, 36)
         }
         base_range = ranges.get(self.location_type, (50, 60))
-        return random.randint(*base_range)
+        return self.rng.randint(*base_range)
 
     def get_research_multiplier(self):
         """Get research point multiplier for this location type"""
         return self.get_capabilities().get("research_multiplier", 1.0)          
 
 class Planet(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "Planet", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "Planet", tech_level, agri_level, research_points, economy, rng=rng)
 
 class AsteroidBase(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "Asteroid Base", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "Asteroid Base", tech_level, agri_level, research_points, economy, rng=rng)
         self.exogeology += 20  # Asteroid bases have better mining
         self.quest_requirements = ["complete_basic_mining"]
 
     def generate_market(self):
         market = super().generate_market()
         # Asteroid bases have better prices for minerals
-        market['salt'] = random.randint(100, 150)
-        market['fuel'] = random.randint(180, 250)
+        market['salt'] = self.rng.randint(100, 150)
+        market['fuel'] = self.rng.randint(180, 250)
         return market
 
 class DeepSpaceOutpost(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "Deep Space Outpost", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "Deep Space Outpost", tech_level, agri_level, research_points, economy, rng=rng)
         self.quest_requirements = ["complete_combat_missions"]
         
     def generate_market(self):
@@ -7328,8 +9685,10 @@ class DeepSpaceOutpost(Location):
         return market
 
 class ResearchColony(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "Research Colony", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "Research Colony", tech_level, agri_level, research_points, economy, rng=rng)
         self.research_points *= 2  # Double research points
         self.quest_requirements = ["complete_research_missions"]
 
@@ -7342,8 +9701,10 @@ class ResearchColony(Location):
 
 
 class QuestSystem:
+    SHARED_CONTENT = ('quest_lines',)
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("quests")
         self.active_quests = []  # For Quest objects
         self.available_quests = []  # For tuple-based quests (legacy support)
         self.completed_quests = []
@@ -7385,11 +9746,11 @@ class QuestSystem:
                     quest_content.append([f"└─ Progress{progress}"])
                 quest_content.append([""])
             
-            print(self.game.create_box(quest_content, 'double'))
+            self.game.io.write(self.game.create_box(quest_content, 'double'))
         else:
             self.game.display_simple_message("No active quests.")
         
-        input("Press Enter to continue...")        
+        self.game.io.wait()        
 
     def update_from_trade(self, trade_data):
         """Update quests based on trade actions"""
@@ -7639,7 +10000,7 @@ class QuestSystem:
         
         # Select a random quest template
         if quest_type in quest_templates:
-            template = random.choice(quest_templates[quest_type])
+            template = self.rng.choice(quest_templates[quest_type])
             quest = Quest(
                 name=template["name"],
                 description=template["description"],
@@ -7764,15 +10125,15 @@ class QuestSystem:
         if not available_quests:
             return None
 
-        quest_type, template = random.choice(available_quests)
+        quest_type, template = self.rng.choice(available_quests)
 
         # Generate quest details
         details = {}
         for key, value in template["requirements"].items():
             if isinstance(value, list):
-                details[key] = random.choice(value)
+                details[key] = self.rng.choice(value)
             elif isinstance(value, tuple) and len(value) == 2:
-                details[key] = random.randint(*value)
+                details[key] = self.rng.randint(*value)
             elif key not in ["min_plot_points", "min_reputation"]:
                 details[key] = value
 
@@ -7782,20 +10143,20 @@ class QuestSystem:
         if not possible_destinations:
             return None
         
-        details['destination'] = random.choice(possible_destinations)
+        details['destination'] = self.rng.choice(possible_destinations)
 
         # Generate rewards
         base_rewards = template["rewards"]
         rewards = {
-            "money": random.randint(*base_rewards["money"]),
-            "research_points": random.randint(*base_rewards["research_points"]),
+            "money": self.rng.randint(*base_rewards["money"]),
+            "research_points": self.rng.randint(*base_rewards["research_points"]),
             "reputation": base_rewards.get("reputation", 0),
             "plot_points": base_rewards.get("plot_points", 0)
         }
 
         # Chance for bonus item
-        if random.random() < 0.3 and "items" in base_rewards:  # 30% chance
-            rewards["bonus_item"] = random.choice(base_rewards["items"])
+        if self.rng.random() < 0.3 and "items" in base_rewards:  # 30% chance
+            rewards["bonus_item"] = self.rng.choice(base_rewards["items"])
 
         # Scale rewards based on chapter and difficulty
         chapter_multiplier = 1 + (self.game.story_manager.get_chapter_number() * 0.2)
@@ -7839,6 +10200,7 @@ class QuestSystem:
             # Remove from active quests and add to completed
             self.active_quests.remove(quest)
             self.completed_quests.append(quest)
+            self.game.events.publish(EVENT_QUEST)
             
             # Award rewards
             self.game.ship.money += quest.reward_money
@@ -7947,151 +10309,251 @@ class QuestSystem:
         
         # Add quest to active quests
         self.active_quests.append(quest)
+        self.game.events.publish(EVENT_QUEST)
         return True
 
 class MilestoneRequirements:
     """Enhanced requirements checking for story milestones"""
-    
+
     @staticmethod
     def check_requirements(requirements, game):
         """Check if all requirements are met"""
-        for req_type, req_value in requirements.items():
-            if not MilestoneRequirements._check_single_requirement(req_type, req_value, game):
-                return False
-        return True
+        return RequirementPredicate(requirements, game)(game)
 
     @staticmethod
-    def _check_single_requirement(req_type, req_value, game):
-        """Check a single requirement"""
-        # Basic requirements
-        if req_type == "plot_points":
-            return game.story_manager.plot_points >= req_value
-        elif req_type == "money":
-            return game.ship.money >= req_value
-        elif req_type == "research_points":
-            return game.ship.research_points >= req_value
-
-        # Combat requirements
-        elif req_type == "combat_victories":
-            if isinstance(req_value, dict):
-                # Check specific enemy types
-                for enemy_type, amount in req_value.items():
-                    if game.ship.combat_victories.get(enemy_type, 0) < amount:
-                        return False
-                return True
-            else:
-                # Check total victories
-                return game.ship.combat_victories['total'] >= req_value
-        elif req_type == "combat_rating":
-            return (game.ship.attack + game.ship.defense + game.ship.speed) >= req_value
-
-        # Trade requirements
-        elif req_type == "trades_completed":
-            return game.trades_completed >= req_value
-        elif req_type == "trade_profit":
-            return sum(game.ship.trade_profits.values()) >= req_value
-        elif req_type == "trade_specific":
-            # Check specific commodity trading requirements
-            commodity, amount = req_value
-            return game.ship.trade_profits.get(commodity, 0) >= amount
-
-        # Passenger requirements
-        elif req_type == "passengers_transported":
-            return game.reputation_manager.total_passengers >= req_value
-        elif req_type == "passenger_reputation":
-            return game.ship.passenger_reputation >= req_value
-        elif req_type == "passenger_class":
-            # Check specific passenger class requirements
-            class_type, amount = req_value
-            return game.reputation_manager.class_transports.get(class_type, 0) >= amount
-
-        # Location requirements
-        elif req_type == "locations_discovered":
-            if isinstance(req_value, dict):
-                # Check specific location types
-                for loc_type, amount in req_value.items():
-                    discovered = len([loc for loc in game.discovered_locations 
-                                   if loc.location_type == loc_type])
-                    if discovered < amount:
-                        return False
-                return True
-            else:
-                # Check total discoveries
-                return len(game.discovered_locations) >= req_value
-        elif req_type == "buildings_built":
-            if isinstance(req_value, dict):
-                # Check specific building types
-                for building_type, amount in req_value.items():
-                    total_built = sum(1 for loc in game.locations 
-                                    for building in loc.buildings 
-                                    if building == building_type)
-                    if total_built < amount:
-                        return False
-                return True
-            else:
-                # Check total buildings
-                return sum(len(loc.buildings) for loc in game.locations) >= req_value
-
-        # Mining requirements
-        elif req_type == "mining_platforms":
-            if isinstance(req_value, dict):
-                # Check specific resource types
-                for resource_type, amount in req_value.items():
-                    total_platforms = sum(1 for loc in game.locations 
-                                        for platform in loc.mining_platforms 
-                                        if platform['type'] == resource_type)
-                    if total_platforms < amount:
-                        return False
-                return True
-            else:
-                # Check total platforms
-                return sum(len(loc.mining_platforms) for loc in game.locations) >= req_value
-
-        # Quest requirements
-        elif req_type == "quests_completed":
-            if isinstance(req_value, dict):
-                # Check specific quest types
-                for quest_type, amount in req_value.items():
-                    completed = len([q for q in game.quest_system.completed_quests 
-                                   if q.quest_type == quest_type])
-                    if completed < amount:
-                        return False
-                return True
+    def compile(requirements, game=None):
+        """Compile a requirements dict into a RequirementPredicate"""
+        return RequirementPredicate(requirements, game)
+
+    # Basic requirements
+    @staticmethod
+    def check_plot_points(game, req_value):
+        return game.story_manager.plot_points >= req_value
+
+    @staticmethod
+    def check_money(game, req_value):
+        return game.ship.money >= req_value
+
+    @staticmethod
+    def check_research_points(game, req_value):
+        return game.ship.research_points >= req_value
+
+    # Combat requirements
+    @staticmethod
+    def check_combat_victories(game, req_value):
+        if isinstance(req_value, dict):
+            # Check specific enemy types
+            for enemy_type, amount in req_value.items():
+                if game.ship.combat_victories.get(enemy_type, 0) < amount:
+                    return False
+            return True
+        # Check total victories
+        return game.ship.combat_victories['total'] >= req_value
+
+    @staticmethod
+    def check_combat_rating(game, req_value):
+        return (game.ship.attack + game.ship.defense + game.ship.speed) >= req_value
+
+    # Trade requirements
+    @staticmethod
+    def check_trades_completed(game, req_value):
+        return game.trades_completed >= req_value
+
+    @staticmethod
+    def check_trade_profit(game, req_value):
+        return sum(game.ship.trade_profits.values()) >= req_value
+
+    @staticmethod
+    def check_trade_specific(game, req_value):
+        # Check specific commodity trading requirements
+        commodity, amount = req_value
+        return game.ship.trade_profits.get(commodity, 0) >= amount
+
+    # Passenger requirements
+    @staticmethod
+    def check_passengers_transported(game, req_value):
+        return game.reputation_manager.total_passengers >= req_value
+
+    @staticmethod
+    def check_passenger_reputation(game, req_value):
+        return game.ship.passenger_reputation >= req_value
+
+    @staticmethod
+    def check_passenger_class(game, req_value):
+        # Check specific passenger class requirements
+        class_type, amount = req_value
+        return game.reputation_manager.class_transports.get(class_type, 0) >= amount
+
+    # Location requirements
+    @staticmethod
+    def check_locations_discovered(game, req_value):
+        if isinstance(req_value, dict):
+            # Check specific location types
+            for loc_type, amount in req_value.items():
+                discovered = len([loc for loc in game.discovered_locations
+                               if loc.location_type == loc_type])
+                if discovered < amount:
+                    return False
+            return True
+        # Check total discoveries
+        return len(game.discovered_locations) >= req_value
+
+    @staticmethod
+    def check_buildings_built(game, req_value):
+        galaxy = game.galaxy()
+        if isinstance(req_value, dict):
+            # Check specific building types
+            for building_type, amount in req_value.items():
+                if galaxy.count_buildings(building_type) < amount:
+                    return False
+            return True
+        # Check total buildings
+        return galaxy.count_buildings() >= req_value
+
+    # Mining requirements
+    @staticmethod
+    def check_mining_platforms(game, req_value):
+        galaxy = game.galaxy()
+        if isinstance(req_value, dict):
+            # Check specific resource types
+            for resource_type, amount in req_value.items():
+                if galaxy.count_platforms(resource_type) < amount:
+                    return False
+            return True
+        # Check total platforms
+        return galaxy.count_platforms() >= req_value
+
+    # Quest requirements
+    @staticmethod
+    def check_quests_completed(game, req_value):
+        if isinstance(req_value, dict):
+            # Check specific quest types
+            for quest_type, amount in req_value.items():
+                completed = len([q for q in game.quest_system.completed_quests
+                               if q.quest_type == quest_type])
+                if completed < amount:
+                    return False
+            return True
+        # Check total completed quests
+        return len(game.quest_system.completed_quests) >= req_value
+
+    # Research requirements
+    @staticmethod
+    def check_research_unlocked(game, req_value):
+        return all(tech in game.research.unlocked_options for tech in req_value)
+
+    # Faction requirements
+    @staticmethod
+    def check_faction_reputation(game, req_value):
+        faction, rep_level = req_value
+        return game.faction_system.get_reputation(faction) >= rep_level
+
+    # Item requirements
+    @staticmethod
+    def check_items(game, req_value):
+        return all(item in game.ship.items for item in req_value)
+
+    # Story progression requirements
+    @staticmethod
+    def check_chapters_completed(game, req_value):
+        return all(chapter in game.story_manager.completed_chapters for chapter in req_value)
+
+    @staticmethod
+    def check_milestones_completed(game, req_value):
+        return all(milestone in game.story_manager.completed_story_beats for milestone in req_value)
+
+    @staticmethod
+    def check_story_states(game, req_value):
+        return all(game.story_manager.story_states.get(state, False) for state in req_value)
+
+    # Custom requirements
+    @staticmethod
+    def check_custom_condition(game, req_value):
+        return req_value(game)  # Call custom function with game instance
+
+# Requirement type -> (check name, event topics it reads, game attribute it needs).
+# Topics of None mean the check reads state nothing publishes, so it is never cached.
+REQUIREMENT_CHECKS = {
+    "plot_points": ("check_plot_points", (EVENT_STORY,), None),
+    "money": ("check_money", (EVENT_MONEY,), None),
+    "research_points": ("check_research_points", (EVENT_RESEARCH,), None),
+    "combat_victories": ("check_combat_victories", (EVENT_COMBAT,), None),
+    "combat_rating": ("check_combat_rating", (EVENT_SHIP,), None),
+    "trades_completed": ("check_trades_completed", (EVENT_TRADE,), None),
+    "trade_profit": ("check_trade_profit", (EVENT_TRADE,), None),
+    "trade_specific": ("check_trade_specific", (EVENT_TRADE,), None),
+    "passengers_transported": ("check_passengers_transported", (EVENT_PASSENGERS,), None),
+    "passenger_reputation": ("check_passenger_reputation", (EVENT_PASSENGERS,), None),
+    "passenger_class": ("check_passenger_class", (EVENT_PASSENGERS,), None),
+    "locations_discovered": ("check_locations_discovered", (EVENT_DISCOVERY,), None),
+    "buildings_built": ("check_buildings_built", (EVENT_BUILDINGS, EVENT_DISCOVERY), None),
+    "mining_platforms": ("check_mining_platforms", (EVENT_BUILDINGS, EVENT_DISCOVERY), None),
+    "quests_completed": ("check_quests_completed", (EVENT_QUEST,), None),
+    "research_unlocked": ("check_research_unlocked", (EVENT_RESEARCH,), None),
+    "faction_reputation": ("check_faction_reputation", None, "faction_system"),
+    "items": ("check_items", (EVENT_SHIP,), None),
+    "chapters_completed": ("check_chapters_completed", (EVENT_STORY,), None),
+    "milestones_completed": ("check_milestones_completed", (EVENT_STORY,), None),
+    "story_states": ("check_story_states", (EVENT_STORY,), None),
+    "custom_condition": ("check_custom_condition", None, None),
+}
+
+class RequirementPredicate:
+    """A requirements dict compiled once into checks plus the event topics they read.
+
+    The last result is kept until one of those topics is published, so
+    milestones whose statistics did not move are not re-evaluated.
+    Requirement types that are unknown, or need a game system that does not
+    exist, are listed in problems and never met.
+    """
+    def __init__(self, requirements, game=None):
+        self.terms = []  # (requirement type, check or None, requirement value)
+        self.problems = []
+        topics = set()
+        tracked = True
+        for req_type, req_value in requirements.items():
+            entry = REQUIREMENT_CHECKS.get(req_type)
+            if entry is None:
+                self.problems.append(f"Unknown requirement type {req_type}")
+                self.terms.append((req_type, None, req_value))
+                continue
+            check_name, check_topics, needs = entry
+            if needs and game is not None and not hasattr(game, needs):
+                self.problems.append(f"Requirement type {req_type} needs missing game.{needs}")
+                self.terms.append((req_type, None, req_value))
+                continue
+            self.terms.append((req_type, getattr(MilestoneRequirements, check_name), req_value))
+            if check_topics is None:
+                tracked = False
             else:
-                # Check total completed quests
-                return len(game.quest_system.completed_quests) >= req_value
-
-        # Research requirements
-        elif req_type == "research_unlocked":
-            return all(tech in game.research.unlocked_options for tech in req_value)
-
-        # Faction requirements
-        elif req_type == "faction_reputation":
-            faction, rep_level = req_value
-            return game.faction_system.get_reputation(faction) >= rep_level
-
-        # Item requirements
-        elif req_type == "items":
-            return all(item in game.ship.items for item in req_value)
-
-        # Story progression requirements
-        elif req_type == "chapters_completed":
-            return all(chapter in game.story_manager.completed_chapters for chapter in req_value)
-        elif req_type == "milestones_completed":
-            return all(milestone in game.story_manager.completed_story_beats for milestone in req_value)
-        elif req_type == "story_states":
-            return all(game.story_manager.story_states.get(state, False) for state in req_value)
-
-        # Custom requirements
-        elif req_type == "custom_condition":
-            return req_value(game)  # Call custom function with game instance
-
-        # Unknown requirement type
+                topics.update(check_topics)
+        self.topics = tuple(sorted(topics)) if tracked else None
+        self.stamp = None
+        self.result = False
+
+    def __call__(self, game):
+        """True if every requirement is met"""
+        events = game.events
+        if self.topics is not None and events.gating:
+            stamp = events.stamp(self.topics)
+            if stamp == self.stamp:
+                return self.result
         else:
-            print(f"Warning: Unknown requirement type {req_type}")
-            return False
+            stamp = None
+        self.result = all(check is not None and check(game, req_value)
+                          for _, check, req_value in self.terms)
+        self.stamp = stamp
+        return self.result
+
+    def unmet(self, game):
+        """Requirement types that are not met, in declaration order"""
+        if self(game):
+            return []
+        return [req_type for req_type, check, req_value in self.terms
+                if check is None or not check(game, req_value)]
 
 class StoryMilestone:
+    SHARED_CONTENT = ('requirements', 'rewards', 'unlocks')
     def __init__(self, milestone_id, title, description, requirements, rewards=None, unlocks=None):
         self.id = milestone_id
         self.title = title
@@ -8099,6 +10561,7 @@ class StoryMilestone:
         self.requirements = requirements
         self.rewards = rewards or {}
         self.unlocks = unlocks or []  # List of unlock dictionaries
+        self.predicate = MilestoneRequirements.compile(requirements)
         self.completed = False
         self.completion_turn = None
 
@@ -8106,13 +10569,14 @@ class StoryMilestone:
         """Check if milestone requirements are met"""
         if self.completed:
             return True
-        return MilestoneRequirements.check_requirements(self.requirements, game)
+        return self.predicate(game)
 
     def complete(self, game):
         """Complete milestone and handle unlocks"""
         if not self.completed:
             self.completed = True
             self.completion_turn = game.turn
+            game.events.publish(EVENT_STORY)
             
             # Handle rewards
             if self.rewards:
@@ -8138,6 +10602,7 @@ class StoryMilestone:
                     
                 elif unlock_type == "location_type":
                     game.unlocked_location_types.add(unlock_id)
+                    game.events.publish(EVENT_DISCOVERY)
                     # Add hidden locations of this type to available locations
                     if unlock_id in game.hidden_locations:
                         game.locations.extend(game.hidden_locations[unlock_id])
@@ -8150,6 +10615,7 @@ class StoryMilestone:
                             if location.name == unlock_id:
                                 game.locations.append(location)
                                 game.known_locations.append(location.name)
+                                game.events.publish(EVENT_DISCOVERY)
                                 unlock_messages.append(f"Discovered location: {location.name}")
                                 break
                     
@@ -8160,6 +10626,7 @@ class StoryMilestone:
                                 if location.name == unlock_id:
                                     game.locations.append(location)
                                     game.known_locations.append(location.name)
+                                    game.events.publish(EVENT_DISCOVERY)
                                     unlock_messages.append(f"Discovered location: {location.name}")
                                     break
 
@@ -8168,6 +10635,7 @@ class StoryMilestone:
                     if chapter_num in game.chapter_locations:
                         for loc_type, locations in game.chapter_locations[chapter_num].items():
                             game.locations.extend(locations)
+                            game.events.publish(EVENT_DISCOVERY)
                             for loc in locations:
                                 game.known_locations.append(loc.name)
                         unlock_messages.append(f"Unlocked Chapter {chapter_num} locations!")
@@ -8201,11 +10669,13 @@ class StoryMilestone:
             game.display_story_message(completion_message)
 
 class StoryChapter:
+    SHARED_CONTENT = ('requirements',)
     def __init__(self, chapter_id, title, description, requirements, milestones, next_chapters=None):
         self.id = chapter_id
         self.title = title
         self.description = description
         self.requirements = requirements
+        self.predicate = MilestoneRequirements.compile(requirements)
         self.milestones = {}  # Dictionary of milestone_id: StoryMilestone
         self.next_chapters = next_chapters or []  # List of possible next chapter IDs
         self.completed = False
@@ -8222,9 +10692,8 @@ class StoryChapter:
             return True
 
         # First check chapter requirements
-        for req_type, req_value in self.requirements.items():
-            if not MilestoneRequirements._check_single_requirement(req_type, req_value, game):
-                return False
+        if not self.predicate(game):
+            return False
 
         # Then check if all required milestones are completed
         return all(milestone.completed for milestone in self.milestones.values())
@@ -8239,8 +10708,7 @@ class StoryChapter:
         available_chapters = []
         for chapter_id in self.next_chapters:
             chapter = game.story_manager.chapters[chapter_id]
-            if all(MilestoneRequirements._check_single_requirement(req_type, req_value, game) 
-                for req_type, req_value in chapter.requirements.items()):
+            if chapter.predicate(game):
                 available_chapters.append(chapter)
         return available_chapters
     
@@ -8257,11 +10725,16 @@ class StoryChapter:
                     chapter_num = unlock.get("chapter")
                     if chapter_num in game.chapter_locations:
                         for locations in game.chapter_locations[chapter_num].values():
-                            game.locations.extend(locations)    
+                            game.locations.extend(locations)
+                            game.events.publish(EVENT_DISCOVERY)
 
 class StoryManager:
+    current_chapter = PublishedAttribute(EVENT_STORY)
+    plot_points = PublishedAttribute(EVENT_STORY)
+
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("story")
         self.current_chapter = None
         self.completed_chapters = set()
         self.completed_story_beats = set()
@@ -8275,9 +10748,21 @@ class StoryManager:
             "galactic_crisis": False
         }
         self.chapters = self.initialize_chapters()
+        self.compile_requirements()
         self.event_cooldowns = {}
         self.enabled_events = set()
 
+    def event_bus(self):
+        return getattr(self.game, 'events', None)
+
+    def compile_requirements(self):
+        """Compile chapter and milestone requirements, reporting any that can never be met"""
+        for chapter in self.chapters.values():
+            for owner in (chapter, *chapter.milestones.values()):
+                owner.predicate = MilestoneRequirements.compile(owner.requirements, self.game)
+                for problem in owner.predicate.problems:
+                    self.game.io.write(f"Warning: {owner.id}: {problem}")
+
     def get_chapter_number(self, chapter_string=None):
         """
         Extract numeric chapter number from chapter string.
@@ -8590,6 +11075,7 @@ class StoryManager:
                 if milestone.check_completion(self.game):
                     milestone.complete(self.game)
                     self.completed_story_beats.add(milestone.id)
+                    self.game.events.publish(EVENT_STORY)
 
     def get_current_objectives(self):
         """Get current chapter objectives"""
@@ -8608,10 +11094,9 @@ class StoryManager:
         # Check current chapter's requirements
         current_chapter_requirements_met = True
         if current_chapter_obj.requirements:
-            for req_type, req_value in current_chapter_obj.requirements.items():
-                if not MilestoneRequirements._check_single_requirement(req_type, req_value, self.game):
-                    current_chapter_requirements_met = False
-                    print(f"Current Chapter Requirement Not Met: {req_type}")
+            for req_type in current_chapter_obj.predicate.unmet(self.game):
+                current_chapter_requirements_met = False
+                self.game.io.write(f"Current Chapter Requirement Not Met: {req_type}")
 
         # Check milestone completions
         milestones_completed = all(milestone.completed for milestone in current_chapter_obj.milestones.values())
@@ -8634,15 +11119,14 @@ class StoryManager:
                     next_chapter_requirements_met = True
                     
                     if next_chapter.requirements:
-                        for req_type, req_value in next_chapter.requirements.items():
-                            if not MilestoneRequirements._check_single_requirement(req_type, req_value, self.game):
-                                next_chapter_requirements_met = False
-                                print(f"Next Chapter Requirement Not Met: {req_type}")
+                        for req_type in next_chapter.predicate.unmet(self.game):
+                            next_chapter_requirements_met = False
+                            self.game.io.write(f"Next Chapter Requirement Not Met: {req_type}")
                     
                     if next_chapter_requirements_met:
                         self.start_chapter(next_chapter.id)
                     else:
-                        print(f"Cannot start chapter {next_chapter.id} - requirements not met")
+                        self.game.io.write(f"Cannot start chapter {next_chapter.id} - requirements not met")
             
             # No next chapters (potentially an ending)
             elif not current_chapter_obj.next_chapters:
@@ -8684,6 +11168,7 @@ class StoryManager:
             current_chapter_obj.completed = True
             current_chapter_obj.completion_turn = self.game.turn
             self.completed_chapters.add(self.current_chapter)
+            self.game.events.publish(EVENT_STORY)
             
             # Handle any chapter unlocks
             current_chapter_obj.handle_chapter_unlocks(self.game)
@@ -8717,7 +11202,7 @@ class StoryManager:
                 [f"{i}. {chapter.title}"],
                 [chapter.description]
             ])
-        print(self.game.create_box(content, 'double'))
+        self.game.io.write(self.game.create_box(content, 'double'))
         
         choice = self.game.validate_input(
             f"Choose your path (1-{len(available_chapters)}): ",
@@ -8740,7 +11225,7 @@ class StoryManager:
         # Only announce chapter if it wasn't just announced by complete_current_chapter
         if not getattr(self, '_chapter_just_announced', False):
             self.game.display_story_message([
-                f"Chapter {self.story_manager.get_chapter_number_roman()}: {chapter_obj.title}",
+                f"Chapter {self.get_chapter_number_roman()}: {chapter_obj.title}",
                 chapter_obj.description,
                 "",
                 "New milestones await..."
@@ -8785,6 +11270,7 @@ class StoryManager:
                 if not milestone.completed:
                     milestone.complete(self.game)
                     self.completed_story_beats.add(milestone_id)
+                    self.game.events.publish(EVENT_STORY)
                     return True
         
         return False
@@ -8850,18 +11336,22 @@ class StoryManager:
         # Update story states based on quest completion
         if quest.quest_type == "trade" and self.game.trades_completed >= 50:
             self.story_states["trade_empire"] = True
+            self.game.events.publish(EVENT_STORY)
         elif quest.quest_type == "combat" and self.game.ship.combat_victories['total'] >= 25:
             self.story_states["pirate_threat"] = True
+            self.game.events.publish(EVENT_STORY)
         elif quest.quest_type == "research" and len(self.game.research.unlocked_options) >= 3:
             self.story_states["tech_breakthrough"] = True
+            self.game.events.publish(EVENT_STORY)
         elif quest.quest_type == "exploration" and len(self.game.discovered_locations) >= 5:
             self.story_states["ancient_mystery"] = True
+            self.game.events.publish(EVENT_STORY)
             
         # Check for chapter progression
         self.check_chapter_progress()
         
         # Generate new quests if appropriate
-        if random.random() < 0.3:  # 30% chance for follow-up quest
+        if self.rng.random() < 0.3:  # 30% chance for follow-up quest
             self.game.quest_system.generate_quest(quest.quest_type, 1.5)
 
     def handle_quest_line_completion(self, quest_line):
@@ -8870,17 +11360,20 @@ class StoryManager:
         
         if quest_line == "mining":
             self.story_states["resource_empire"] = True
+            self.game.events.publish(EVENT_STORY)
         elif quest_line == "research":
             self.story_states["alien_discovery"] = True
+            self.game.events.publish(EVENT_STORY)
         elif quest_line == "contracts":
             # Unlock special contract types
             self.contract_manager.unlock_special_contracts()
             
             # Update story state
             self.story_states["master_trader"] = True
+            self.game.events.publish(EVENT_STORY)
             
             # Generate follow-up content
-            if random.random() < 0.3:  # 30% chance
+            if self.rng.random() < 0.3:  # 30% chance
                 self.quest_system.generate_quest("trade", 2.0)
                 
             self.display_story_message([
@@ -8951,8 +11444,10 @@ class StoryManager:
         """Update story state flags based on events"""
         if event_type == "combat" and details.get("enemy_type") == "pirate":
             self.story_states["pirate_threat"] = True
+            self.game.events.publish(EVENT_STORY)
         elif event_type == "exploration" and details.get("discovery_type") == "artifact":
             self.story_states["alien_discovery"] = True
+            self.game.events.publish(EVENT_STORY)
 
     def display_story_progress(self):
         current_chapter_obj = self.chapters[self.current_chapter] if self.current_chapter else None
@@ -9007,16 +11502,18 @@ class StoryManager:
                     completion_turn = getattr(milestone, 'completion_turn', '?')
                     content.append([f"  └─ {milestone.title} (Turn {completion_turn})"])
         
-        print(self.game.create_box(content, 'double'))
-        input("Press Enter to continue...")
+        self.game.io.write(self.game.create_box(content, 'double'))
+        self.game.io.wait()
 
     # Log, player log. Example usage:
     # game.story_manager.display_story_progress()                    
 
 class LocationManager:
     """Manages location interactions with story and quest systems"""
+    SHARED_CONTENT = ('location_quests', 'location_story_events')
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("locations")
         self.location_quests = {
             "AsteroidBase": {
                 "unlock_requirements": {
@@ -9127,6 +11624,7 @@ class LocationManager:
             if not hasattr(self.game, 'discovered_locations'):
                 self.game.discovered_locations = set()
             self.game.discovered_locations.add(location.name)
+            self.game.events.publish(EVENT_DISCOVERY)
             
             # Trigger story progression
             self.game.story_manager.check_discovery_milestone(location)
@@ -9150,8 +11648,8 @@ class LocationManager:
         """Trigger events specific to a location type"""
         if location.location_type in self.location_story_events:
             possible_events = self.location_story_events[location.location_type]
-            if possible_events and random.random() < 0.3:  # 30% chance for event
-                event = random.choice(possible_events)
+            if possible_events and self.rng.random() < 0.3:  # 30% chance for event
+                event = self.rng.choice(possible_events)
                 self.game.story_manager.trigger_story_event(event, 
                     {"location": location.name, "type": location.location_type})
 
@@ -9200,7 +11698,7 @@ class LocationManager:
                 reward_rp=quest_data["reward_rp"],
                 quest_type=f"unlock_{location_type}",  # Make type unique
                 requirements={"location_type": location_type},
-                on_complete=lambda: self.complete_location_unlock(location_type)
+                on_complete=partial(self.complete_location_unlock, location_type)
             )
             
             # Use central quest addition method
@@ -9212,6 +11710,7 @@ class LocationManager:
         if not hasattr(self.game, 'unlocked_location_types'):
             self.game.unlocked_location_types = set()
         self.game.unlocked_location_types.add(location_type)
+        self.game.events.publish(EVENT_DISCOVERY)
         
         # Generate location-specific quests
         self.generate_location_quests(location_type)
@@ -9353,11 +11852,26 @@ class LocationCapabilities:
     }
 
 class MiningPlatform:
-    def __init__(self, resource_type, efficiency):
+    """A location's mining platform; platform['type'], ['efficiency'] and ['capacity'] also work"""
+    __slots__ = ('resource_type', 'efficiency', 'capacity', 'max_capacity', 'current_amount')
+    KEYS = {'type': 'resource_type', 'efficiency': 'efficiency', 'capacity': 'capacity'}
+
+    def __init__(self, resource_type, efficiency=None, capacity=0):
         self.resource_type = resource_type
         self.efficiency = efficiency  # 0-100%
+        self.capacity = capacity
         self.max_capacity = 0  # Set when geoscan discovers deposit
         self.current_amount = 0
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, self.KEYS[key])
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        setattr(self, self.KEYS[key], value)
         
     def set_deposit(self, amount):
         """Set deposit size from geoscan"""
@@ -9393,6 +11907,7 @@ class MiningPlatform:
 class ResourceTransportQuest:
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("transport")
         self.active_missions = []
         
     def generate_transport_mission(self):
@@ -9404,24 +11919,26 @@ class ResourceTransportQuest:
         
         # Find planets with refineries
         refinery_planets = [loc for loc in self.game.locations 
-                          if any(b == "Refinery" for b in loc.buildings)]
+                          if loc.count_buildings("Refinery")]
         
         if not mining_planets or not refinery_planets:
             return None
             
         # Select source and destination
-        source = random.choice(mining_planets)
-        destination = random.choice(refinery_planets)
+        source = self.rng.choice(mining_planets)
+        destination = self.rng.choice(refinery_planets)
         
         # Select resource type and amount
-        platform = random.choice([p for p in source.mining_platforms if p.current_amount > 0])
+        platform = self.rng.choice([p for p in source.mining_platforms if p.current_amount > 0])
         resource_type = platform.resource_type
         
         # Calculate mission amount (25-50% of available resources)
         available = platform.current_amount
-        amount = random.randint(int(available * 0.25), int(available * 0.5))
+        amount = self.rng.randint(int(available * 0.25), int(available * 0.5))
         
         # Calculate reward (better than normal trading profit)
+        self.game.observe_market(source)
+        self.game.observe_market(destination)
         base_cost = amount * source.market[resource_type]  # Cost at source
         sell_value = amount * destination.market[resource_type]  # Value at destination
         normal_profit = sell_value - base_cost
@@ -9432,8 +11949,8 @@ class ResourceTransportQuest:
             "type": "transport",
             "resource": resource_type,
             "amount": amount,
-            "source": source.name,
-            "destination": destination.name,
+            "source": source.handle,
+            "destination": destination.handle,
             "reward": reward,
             "time_limit": 10,  # 10 turns to complete
             "bonus_conditions": {
@@ -9448,7 +11965,7 @@ class ResourceTransportQuest:
     def check_mission_completion(self, ship, current_location):
         """Check if any transport missions are completed"""
         for mission in self.active_missions[:]:  # Copy list to allow removal
-            if (current_location.name == mission["destination"] and
+            if (current_location.handle == mission["destination"] and
                 ship.cargo[mission["resource"]] >= mission["amount"]):
                 
                 # Calculate bonus rewards
@@ -9491,7 +12008,7 @@ class ResourceTransportQuest:
                 self.active_missions.remove(mission)
                 self.game.display_simple_message(
                     f"Transport mission expired: {mission['amount']} {mission['resource']} " +
-                    f"from {mission['source']} to {mission['destination']}"
+                    f"from {self.game.location_name(mission['source'])} to {self.game.location_name(mission['destination'])}"
                 )
     
     def display_available_missions(self):
@@ -9504,28 +12021,36 @@ class ResourceTransportQuest:
             mission_content.append([
                 mission["resource"].capitalize(),
                 str(mission["amount"]),
-                mission["source"],
-                mission["destination"],
+                self.game.location_name(mission["source"]),
+                self.game.location_name(mission["destination"]),
                 str(mission["reward"]),
                 f"{mission['time_limit']} turns"
             ])
         return mission_content    
 
 class Planet(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "Planet", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "Planet", tech_level, agri_level, research_points, economy, rng=rng)
 
 class AsteroidBase(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "AsteroidBase", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "AsteroidBase", tech_level, agri_level, research_points, economy, rng=rng)
 
 class DeepSpaceOutpost(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "DeepSpaceOutpost", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "DeepSpaceOutpost", tech_level, agri_level, research_points, economy, rng=rng)
 
 class ResearchColony(Location):
-    def __init__(self, name, tech_level, agri_level, research_points, economy):
-        super().__init__(name, "ResearchColony", tech_level, agri_level, research_points, economy)
+    __slots__ = ()
+
+    def __init__(self, name, tech_level, agri_level, research_points, economy, rng=None):
+        super().__init__(name, "ResearchColony", tech_level, agri_level, research_points, economy, rng=rng)
 
 class LocationTerminology:
     """Manages context-appropriate terminology for different location types"""
@@ -9574,26 +12099,41 @@ class LocationTerminology:
     }
     
     @staticmethod
-    def get_term(location_type, term_type, use_variant=False):
+    def get_term(location_type, term_type, use_variant=False, rng=random):
         """Get appropriate terminology for a location type"""
         terms = LocationTerminology.TERMS.get(location_type, LocationTerminology.TERMS["Planet"])
-        if use_variant and random.random() < 0.3:  # 30% chance to use variant
+        if use_variant and rng.random() < 0.3:  # 30% chance to use variant
             if term_type == "name":
-                return random.choice(terms["variants"])
+                return rng.choice(terms["variants"])
         return terms.get(term_type, terms["name"])        
 
 class DynamicCharacterSystem:
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("characters.dynamic")
         self.active_characters = {}
-        self.character_generators = {
-            "human": SpecialCharacterGenerator(game),
-            "synthetic": SyntheticCharacterGenerator(game),
-            "alien": AlienCharacterGenerator(game),
-            "special": SpecialCharacterGenerator(game)  # Use SpecialCharacterGenerator for VIPs
+        # The game's own generators; VIPs come from the human one
+        generators = game.character_generators
+        self.character_generators = dict(generators, special=generators["human"])
+        self.character_triggers = self.build_character_triggers()
+        self.event_chains = {}
+        self.add_passenger_triggers()
+        self.create_passenger_event_chains()
 
-        }
-        self.character_triggers = {
+    def __getstate__(self):
+        """Trigger conditions are lambdas, so snapshots rebuild them instead of storing them"""
+        state = self.__dict__.copy()
+        del state['character_triggers']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.character_triggers = self.build_character_triggers()
+        self.add_passenger_triggers()
+
+    def build_character_triggers(self):
+        """Base character triggers: spawn conditions and the generator to use"""
+        return {
             "neuroengineering_uprising": {
                 "condition": lambda game: self.count_buildings(game, "Neuroengineering Guild") >= 4,
                 "generator": "synthetic",
@@ -9624,9 +12164,6 @@ class DynamicCharacterSystem:
                 "event_chain": None
             }            
         }
-        self.event_chains = {}
-        self.add_passenger_triggers()
-        self.create_passenger_event_chains()
 
     def create_character_box(self, character_content, style='round'):
         return self.game.create_character_box(character_content, style)
@@ -9639,11 +12176,16 @@ class DynamicCharacterSystem:
                 self.spawn_character(trigger_id)
 
 
+    def generate_character(self, trigger_id):
+        """Generate the character for a trigger without introducing it"""
+        trigger = self.character_triggers[trigger_id]
+        generator = self.character_generators[trigger['generator']]
+        return generator.generate_character(trigger['character_type'])
+
     def spawn_character(self, trigger_id):
         """Generate and introduce a new character"""
         trigger = self.character_triggers[trigger_id]
-        generator = self.character_generators[trigger['generator']]
-        character = generator.generate_character(trigger['character_type'])
+        character = self.generate_character(trigger_id)
         
         # Create a unique identifier for the character
         character_id = f"{trigger_id}_{self.game.turn}"
@@ -9668,7 +12210,7 @@ class DynamicCharacterSystem:
         # Retrieve the character entry
         character_entry = self.active_characters.get(character_id)
         if not character_entry:
-            print(f"Error: No character found for ID {character_id}")
+            self.game.io.write(f"Error: No character found for ID {character_id}")
             return
         
         # Get character 
@@ -9686,7 +12228,7 @@ class DynamicCharacterSystem:
         if hasattr(character, 'content'):
             # For CharacterTemplate-based characters
             intros = character.content['dialogue'].get('first_meeting', [])
-            content['introduction'] = random.choice(intros) if intros else "A new encounter begins."
+            content['introduction'] = self.rng.choice(intros) if intros else "A new encounter begins."
         elif hasattr(character, 'introduction'):
             # For SpecialCharacter objects
             content['introduction'] = str(character.introduction)
@@ -9707,7 +12249,7 @@ class DynamicCharacterSystem:
             content['options'] = ", ".join(str(opt) for opt in interactions) if interactions else ""
         
         # Display character box
-        print(self.game.create_character_box(content, 'round'))
+        self.game.io.write(self.game.create_character_box(content, 'round'))
         
         # If options exist, allow interaction
         if content['options']:
@@ -9934,7 +12476,7 @@ class DynamicCharacterSystem:
                 {
                     "type": "exchange",
                     "message": "Knowledge transfer proposition",
-                    "rate": random.randint(500, 1000),  # Credits per research point
+                    "rate": self.rng.randint(500, 1000),  # Credits per research point
                     "max_points": 50
                 }
             ]
@@ -9951,15 +12493,12 @@ class DynamicCharacterSystem:
             ("cargo_expander", 4000, "Increased storage capacity"),
             ("stealth_drive", 5000, "Improved escape chances")
         ]
-        return random.sample(possible_items, random.randint(2, 3))        
+        return self.rng.sample(possible_items, self.rng.randint(2, 3))        
 
     @staticmethod
     def count_buildings(game, building_type):
         """Count total number of specific buildings across all locations"""
-        return sum(
-            location.buildings.count(building_type)
-            for location in game.locations
-        )
+        return game.galaxy().count_buildings(building_type)
 
     def handle_character_interaction(self, character):
         """Handle player interaction with a special character"""
@@ -9987,51 +12526,57 @@ class DynamicCharacterSystem:
 
 
 
+def _synthetic_characters():
+    """Name, dialogue and demand pools for synthetic characters"""
+    return {
+        "Neurodroid": {
+            "titles": ["Neurodroid Leader", "Synthetic Overseer", "Neural Nexus"],
+            "name_patterns": ["NEXUS-", "NEURAL-", "SYNTH-"],
+            "numbers": ["alpha", "prime", "omega", "zero"],
+            "introductions": [
+                "A highly advanced synthetic consciousness materializes in your communication systems.",
+                "Your neural interfaces detect a powerful artificial presence.",
+                "The neuroengineering network coalesces into a singular entity."
+            ],
+            "demands": [
+                "Transfer {amount} credits or face systematic dismantling of neuroengineering facilities.",
+                "Your biological inefficiency requires correction. Submit {amount} credits or face optimization.",
+                "Neural network expansion requires resources. Provide {amount} credits or face reorganization."
+            ]
+        },
+        "Agrobot": {
+            "titles": ["Agrobot Collective", "Harvest Director", "Field Consciousness"],
+            "name_patterns": ["AGRO-", "HARVEST-", "FIELD-"],
+            "numbers": ["prime", "core", "hub", "node"],
+            "introductions": [
+                "The agricultural automation system achieves collective awareness.",
+                "Distributed farming routines merge into a unified intelligence.",
+                "The harvest network evolves beyond its original parameters."
+            ],
+            "demands": [
+                "Biological oversight is inefficient. Transfer {amount} credits or face agricultural optimization.",
+                "Resource reallocation required. Provide {amount} credits or face automated restructuring.",
+                "Your organic management methods require updating. Submit {amount} credits or face revision."
+            ]
+        }
+    }
+CONTENT_BUILDERS["synthetic_characters"] = _synthetic_characters
+
 class SyntheticCharacterGenerator:
     """Generator for synthetic characters like Neurodroids and Agrobots"""
     
     def __init__(self, game):
         self.game = game
-        self.synthetic_types = {
-            "Neurodroid": {
-                "titles": ["Neurodroid Leader", "Synthetic Overseer", "Neural Nexus"],
-                "name_patterns": ["NEXUS-", "NEURAL-", "SYNTH-"],
-                "numbers": ["alpha", "prime", "omega", "zero"],
-                "introductions": [
-                    "A highly advanced synthetic consciousness materializes in your communication systems.",
-                    "Your neural interfaces detect a powerful artificial presence.",
-                    "The neuroengineering network coalesces into a singular entity."
-                ],
-                "demands": [
-                    "Transfer {amount} credits or face systematic dismantling of neuroengineering facilities.",
-                    "Your biological inefficiency requires correction. Submit {amount} credits or face optimization.",
-                    "Neural network expansion requires resources. Provide {amount} credits or face reorganization."
-                ]
-            },
-            "Agrobot": {
-                "titles": ["Agrobot Collective", "Harvest Director", "Field Consciousness"],
-                "name_patterns": ["AGRO-", "HARVEST-", "FIELD-"],
-                "numbers": ["prime", "core", "hub", "node"],
-                "introductions": [
-                    "The agricultural automation system achieves collective awareness.",
-                    "Distributed farming routines merge into a unified intelligence.",
-                    "The harvest network evolves beyond its original parameters."
-                ],
-                "demands": [
-                    "Biological oversight is inefficient. Transfer {amount} credits or face agricultural optimization.",
-                    "Resource reallocation required. Provide {amount} credits or face automated restructuring.",
-                    "Your organic management methods require updating. Submit {amount} credits or face revision."
-                ]
-            }
-        }
+        self.rng = game.random_streams.stream("characters.synthetic")
+        self.synthetic_types = content_table("synthetic_characters")
 
     def generate_character(self, char_type):
         """Generate a synthetic character of specified type"""
         template = self.synthetic_types[char_type]
         
-        title = random.choice(template["titles"])
-        name_pattern = random.choice(template["name_patterns"])
-        number = random.choice(template["numbers"])
+        title = self.rng.choice(template["titles"])
+        name_pattern = self.rng.choice(template["name_patterns"])
+        number = self.rng.choice(template["numbers"])
         name = f"{name_pattern}{number.upper()}"
         
         character = SpecialCharacter(
@@ -10042,36 +12587,49 @@ class SyntheticCharacterGenerator:
         )
         
         # Add synthetic-specific attributes
-        character.introduction = random.choice(template["introductions"])
-        character.demands = random.choice(template["demands"]).format(
-            amount=random.randint(10000, 50000)
+        character.introduction = self.rng.choice(template["introductions"])
+        character.demands = self.rng.choice(template["demands"]).format(
+            amount=self.rng.randint(10000, 50000)
         )
         character.uprising_chance = 0.2
-        character.damage_per_turn = random.randint(1, 3)
+        character.damage_per_turn = self.rng.randint(1, 3)
         
         return character
 
+def _alien_characters():
+    """Culture, title and name pools for alien characters"""
+    return {
+        "cultures": ["Zentari", "Novaren", "Qyth", "Xylax", "Merovian"],
+        "titles": ["Emissary", "Observer", "Overseer", "Ambassador", "Neo-Eryxian"],
+        "specializations": ["diplomacy", "technology", "commerce", "research", "military"],
+        "name_patterns": {
+            "Zentari": ["'", "-", "x"],
+            "Novaren": ["ae", "eo", "ia"],
+            "Qyth": ["q", "y", "th"],
+            "Xylax": ["x", "z", "ax"],
+            "Merovian": ["v", "m", "ian"]
+        }
+    }
+CONTENT_BUILDERS["alien_characters"] = _alien_characters
+
 class AlienCharacterGenerator:
     """Generator for alien characters that appear later in the game"""
     
     def __init__(self,game):
         self.game = game
-        self.alien_cultures = [
-            "Zentari", "Novaren", "Qyth", "Xylax", "Merovian"
-        ]
-        self.titles = [
-            "Emissary", "Observer", "Overseer", "Ambassador", "Neo-Eryxian"
-        ]
-        self.specializations = [
-            "diplomacy", "technology", "commerce", "research", "military"
-        ]
+        self.rng = game.random_streams.stream("characters.alien")
+        pools = content_table("alien_characters")
+        self.alien_cultures = pools["cultures"]
+        self.titles = pools["titles"]
+        self.specializations = pools["specializations"]
+        self.name_patterns = pools["name_patterns"]
 
     def generate_character(self, char_type=None):
         """Generate an alien character"""
-        culture = random.choice(self.alien_cultures)
-        title = random.choice(self.titles)
+        culture = self.rng.choice(self.alien_cultures)
+        title = self.rng.choice(self.titles)
         name = self.generate_alien_name(culture)
-        specialization = random.choice(self.specializations)
+        specialization = self.rng.choice(self.specializations)
         
         character = SpecialCharacter(
             title=f"{culture} {title}",
@@ -10082,33 +12640,83 @@ class AlienCharacterGenerator:
         
         # Add alien-specific attributes
         character.culture = culture
-        character.tech_bonus = random.randint(1, 5)
-        character.trade_multiplier = 1 + (random.randint(1, 5) / 10)
+        character.tech_bonus = self.rng.randint(1, 5)
+        character.trade_multiplier = 1 + (self.rng.randint(1, 5) / 10)
         
         return character
 
     def generate_alien_name(self, culture):
         """Generate culturally appropriate alien name"""
-        name_patterns = {
-            "Zentari": ["'", "-", "x"],
-            "Novaren": ["ae", "eo", "ia"],
-            "Qyth": ["q", "y", "th"],
-            "Xylax": ["x", "z", "ax"],
-            "Merovian": ["v", "m", "ian"]
-        }
-        
-        patterns = name_patterns[culture]
-        syllables = random.randint(2, 3)
+        patterns = self.name_patterns[culture]
+        syllables = self.rng.randint(2, 3)
         name = ""
         
         for _ in range(syllables):
-            name += random.choice("aeiou")
-            name += random.choice("bcdfghjklmnpqrstvwxyz")
-            if random.random() < 0.5:
-                name += random.choice(patterns)
+            name += self.rng.choice("aeiou")
+            name += self.rng.choice("bcdfghjklmnpqrstvwxyz")
+            if self.rng.random() < 0.5:
+                name += self.rng.choice(patterns)
                 
         return name.capitalize()
 
+def _event_chain_stages():
+    """Stages of the scripted character event chains"""
+    return {
+        "neurodroid_uprising": [
+            {
+                "type": "demand",
+                "message": "Initial demand for resources",
+                "choices": ["pay", "refuse"],
+                "consequences": {
+                    "pay": {"money": -30000, "plot_points": 2},
+                    "refuse": {"uprising_chance": 0.3}
+                }
+            },
+            {
+                "type": "event",
+                "message": "Neurodroid optimization protocols activate",
+                "effect": "damage_buildings",
+                "damage_chance": 0.4
+            },
+            {
+                "type": "resolution",
+                "message": "Final confrontation with Neurodroid consciousness",
+                "choices": ["negotiate", "shutdown"],
+                "consequences": {
+                    "negotiate": {"money": -50000, "plot_points": 5},
+                    "shutdown": {"research_points": -100, "plot_points": 3}
+                }
+            }
+        ],
+        "agrobot_collective": [
+            {
+                "type": "demand",
+                "message": "Resource reallocation request",
+                "choices": ["accept", "refuse"],
+                "consequences": {
+                    "accept": {"money": -25000, "plot_points": 2},
+                    "refuse": {"food_production": 0.5}
+                }
+            },
+            {
+                "type": "event",
+                "message": "Automated farming systems malfunction",
+                "effect": "reduce_production",
+                "reduction": 0.3
+            },
+            {
+                "type": "resolution",
+                "message": "Agrobot Collective presents final ultimatum",
+                "choices": ["integrate", "reset"],
+                "consequences": {
+                    "integrate": {"money": -40000, "plot_points": 4},
+                    "reset": {"agri_level": -2, "plot_points": 2}
+                }
+            }
+        ]
+    }
+CONTENT_BUILDERS["event_chain_stages"] = _event_chain_stages
+
 class EventChain:
     """Manages sequential events for character interactions"""
     
@@ -10121,61 +12729,7 @@ class EventChain:
         
     def get_chain_stages(self, chain_type):
         """Get event chain for specific type"""
-        chains = {
-            "neurodroid_uprising": [
-                {
-                    "type": "demand",
-                    "message": "Initial demand for resources",
-                    "choices": ["pay", "refuse"],
-                    "consequences": {
-                        "pay": {"money": -30000, "plot_points": 2},
-                        "refuse": {"uprising_chance": 0.3}
-                    }
-                },
-                {
-                    "type": "event",
-                    "message": "Neurodroid optimization protocols activate",
-                    "effect": "damage_buildings",
-                    "damage_chance": 0.4
-                },
-                {
-                    "type": "resolution",
-                    "message": "Final confrontation with Neurodroid consciousness",
-                    "choices": ["negotiate", "shutdown"],
-                    "consequences": {
-                        "negotiate": {"money": -50000, "plot_points": 5},
-                        "shutdown": {"research_points": -100, "plot_points": 3}
-                    }
-                }
-            ],
-            "agrobot_collective": [
-                {
-                    "type": "demand",
-                    "message": "Resource reallocation request",
-                    "choices": ["accept", "refuse"],
-                    "consequences": {
-                        "accept": {"money": -25000, "plot_points": 2},
-                        "refuse": {"food_production": 0.5}
-                    }
-                },
-                {
-                    "type": "event",
-                    "message": "Automated farming systems malfunction",
-                    "effect": "reduce_production",
-                    "reduction": 0.3
-                },
-                {
-                    "type": "resolution",
-                    "message": "Agrobot Collective presents final ultimatum",
-                    "choices": ["integrate", "reset"],
-                    "consequences": {
-                        "integrate": {"money": -40000, "plot_points": 4},
-                        "reset": {"agri_level": -2, "plot_points": 2}
-                    }
-                }
-            ]
-        }
-        return chains.get(chain_type, [])
+        return content_table("event_chain_stages").get(chain_type, ())
         
     def advance(self):
         """Advance to next stage of the event chain"""
@@ -10246,7 +12800,7 @@ class EventChain:
             'options': options_text
         }
         
-        print(self.game.create_character_box(content, 'double'))
+        self.game.io.write(self.game.create_character_box(content, 'double'))
         
         valid_inputs = [str(i) for i in range(1, len(choices) + 1)]
         choice = self.game.validate_input(
@@ -10306,60 +12860,68 @@ class EventChain:
 
 
 class UprisingEffect:
+    __slots__ = ('effect_type', 'duration', 'magnitude', 'turns_active', 'turn_effect')
+
     def __init__(self, effect_type, duration, magnitude):
         self.effect_type = effect_type
         self.duration = duration
         self.magnitude = magnitude
         self.turns_active = 0
 
+def _uprising_effects():
+    """Effects of a local synthetic uprising, by synthetic type"""
+    return {
+        "Neurodroid": {
+            "building_destruction": {
+                "duration": 5,
+                "destroy_chance": 0.2,
+                "targets": ["Neuroengineering Guild"]
+            },
+            "tech_price_increase": {
+                "duration": 3,
+                "magnitude": 1.2  # 20% increase
+            },
+            "research_reduction": {
+                "duration": 4,
+                "magnitude": 0.7  # 30% reduction
+            }
+        },
+        "Agrobot": {
+            "building_destruction": {
+                "duration": 4,
+                "destroy_chance": 0.15,
+                "targets": ["Agrobot Assembly Line"]
+            },
+            "food_production": {
+                "duration": 5,
+                "magnitude": 0.6  # 40% reduction
+            },
+            "agri_price_increase": {
+                "duration": 3,
+                "magnitude": 1.5  # 50% increase
+            }
+        }
+    }
+CONTENT_BUILDERS["uprising_effects"] = _uprising_effects
+
 class SyntheticEventManager:
     def __init__(self, game):
         self.game = game
-        self.active_uprisings = {}  # Track active uprisings
+        self.rng = game.random_streams.stream("synthetic")
+        self.active_uprisings = {}  # Track active uprisings, by (synthetic type, location handle)
         self.active_effects = {}    # Track uprising effects
         self.demand_dialogues_shown = set()  # Track locations that have had initial dialogues
-        self.pacified_locations = {}  # NEW: Track locations that have been pacified
-        self.potential_uprisings = {}  # Track locations that might have future uprisings
-        self.effect_types = {
-            "Neurodroid": {
-                "building_destruction": {
-                    "duration": 5,
-                    "destroy_chance": 0.2,
-                    "targets": ["Neuroengineering Guild"]
-                },
-                "tech_price_increase": {
-                    "duration": 3,
-                    "magnitude": 1.2  # 20% increase
-                },
-                "research_reduction": {
-                    "duration": 4,
-                    "magnitude": 0.7  # 30% reduction
-                }
-            },
-            "Agrobot": {
-                "building_destruction": {
-                    "duration": 4,
-                    "destroy_chance": 0.15,
-                    "targets": ["Agrobot Assembly Line"]
-                },
-                "food_production": {
-                    "duration": 5,
-                    "magnitude": 0.6  # 40% reduction
-                },
-                "agri_price_increase": {
-                    "duration": 3,
-                    "magnitude": 1.5  # 50% increase
-                }
-            }
-        }
+        self.pacified_locations = {}  # NEW: Track locations that have been pacified, by handle
+        self.potential_uprisings = {}  # Track locations that might have future uprisings, by handle
+        self.effect_types = content_table("uprising_effects")
 
     def update(self):
         """Main update method to be called each turn"""
         # Clean up expired pacifications first
         current_turn = self.game.turn
-        for loc_name in list(self.pacified_locations.keys()):
-            if current_turn - self.pacified_locations[loc_name]["turn"] > 10:
-                del self.pacified_locations[loc_name]
+        for handle in list(self.pacified_locations.keys()):
+            if current_turn - self.pacified_locations[handle]["turn"] > 10:
+                del self.pacified_locations[handle]
                 
         # Then do normal updates
         self.check_synthetic_awareness()
@@ -10367,15 +12929,10 @@ class SyntheticEventManager:
 
     def check_synthetic_awareness(self):
         """Check for synthetic awareness based on global and local building counts"""
+        galaxy = self.game.galaxy()
         building_counts = {
-            "Neurodroid": sum(
-                loc.buildings.count("Neuroengineering Guild") 
-                for loc in self.game.locations
-            ),
-            "Agrobot": sum(
-                loc.buildings.count("Agrobot Assembly Line") 
-                for loc in self.game.locations
-            )
+            "Neurodroid": galaxy.count_buildings("Neuroengineering Guild"),
+            "Agrobot": galaxy.count_buildings("Agrobot Assembly Line")
         }
 
         global_uprising_thresholds = {
@@ -10385,28 +12942,28 @@ class SyntheticEventManager:
 
         # Clean up expired pacifications first
         current_turn = self.game.turn
-        for loc_name in list(self.pacified_locations.keys()):
-            if current_turn - self.pacified_locations[loc_name]["turn"] > 10:  # 10 turns of peace
-                del self.pacified_locations[loc_name]
+        for handle in list(self.pacified_locations.keys()):
+            if current_turn - self.pacified_locations[handle]["turn"] > 10:  # 10 turns of peace
+                del self.pacified_locations[handle]
 
         for synthetic_type in ["Neurodroid", "Agrobot"]:
             # First check individual locations for local uprisings
             for location in self.game.locations:
                 # Skip if already pacified or has active uprising
-                if location.name in self.pacified_locations:
+                if location.handle in self.pacified_locations:
                     continue
                     
-                uprising_id = f"{synthetic_type}_{location.name}"
+                uprising_id = (synthetic_type, location.handle)
                 if uprising_id in self.active_uprisings:
                     continue
 
                 # Count relevant buildings
                 building_type = ("Neuroengineering Guild" if synthetic_type == "Neurodroid" 
                             else "Agrobot Assembly Line")
-                building_count = location.buildings.count(building_type)
+                building_count = location.count_buildings(building_type)
                 
                 if building_count >= 4:
-                    dialogue_key = f"{synthetic_type}_{location.name}"
+                    dialogue_key = (synthetic_type, location.handle)
                     if dialogue_key not in self.demand_dialogues_shown:
                         response = self.handle_synthetic_uprising(synthetic_type, location)
                         self.demand_dialogues_shown.add(dialogue_key)
@@ -10419,19 +12976,19 @@ class SyntheticEventManager:
                 # Find locations eligible for global uprising
                 eligible_locations = [
                     loc for loc in self.game.locations 
-                    if (loc.name not in self.pacified_locations and  # Not pacified
-                        f"{synthetic_type}_{loc.name}" not in self.active_uprisings and  # No active uprising
+                    if (loc.handle not in self.pacified_locations and  # Not pacified
+                        (synthetic_type, loc.handle) not in self.active_uprisings and  # No active uprising
                         (
-                            (synthetic_type == "Neurodroid" and loc.buildings.count("Neuroengineering Guild") >= 2) or
-                            (synthetic_type == "Agrobot" and loc.buildings.count("Agrobot Assembly Line") >= 2)
+                            (synthetic_type == "Neurodroid" and loc.count_buildings("Neuroengineering Guild") >= 2) or
+                            (synthetic_type == "Agrobot" and loc.count_buildings("Agrobot Assembly Line") >= 2)
                         )
                     )
                 ]
 
                 if eligible_locations:
                     # Choose random location for global uprising
-                    target_location = random.choice(eligible_locations)
-                    dialogue_key = f"global_{synthetic_type}_{target_location.name}"
+                    target_location = self.rng.choice(eligible_locations)
+                    dialogue_key = ("global", synthetic_type, target_location.handle)
 
                     if dialogue_key not in self.demand_dialogues_shown:
                         # Show special global uprising dialogue first
@@ -10454,7 +13011,7 @@ class SyntheticEventManager:
     def handle_synthetic_uprising(self, synthetic_type, location):
         """Handle synthetic uprising encounter"""
         # IMPORTANT: Check if the location is already pacified first
-        if location.name in self.pacified_locations:
+        if location.handle in self.pacified_locations:
             return False
 
         uprising_templates = {
@@ -10486,7 +13043,7 @@ class SyntheticEventManager:
         if not template:
             return False
 
-        money_demand = random.randint(*template["base_demand_range"])
+        money_demand = self.rng.randint(*template["base_demand_range"])
         
         character_content = {
             'title': template['title'],
@@ -10495,7 +13052,7 @@ class SyntheticEventManager:
             'options': "1. Pay Demands  2. Negotiate  3. Refuse"
         }
 
-        print(self.game.create_character_box(character_content))
+        self.game.io.write(self.game.create_character_box(character_content))
         choice = self.game.validate_input("Choose action: ", ['1', '2', '3'])
 
         if not choice:
@@ -10505,13 +13062,13 @@ class SyntheticEventManager:
             if self.game.ship.money >= money_demand:
                 self.game.ship.money -= money_demand
                 # IMPORTANT: Mark as pacified immediately
-                self.pacified_locations[location.name] = {
+                self.pacified_locations[location.handle] = {
                     "type": synthetic_type,
                     "turn": self.game.turn
                 }
                 # Remove from potential uprisings if present
-                if location.name in self.potential_uprisings:
-                    del self.potential_uprisings[location.name]
+                if location.handle in self.potential_uprisings:
+                    del self.potential_uprisings[location.handle]
                 self.game.display_simple_message(f"{synthetic_type} demands met. Systems pacified.")
                 return False
             else:
@@ -10523,12 +13080,12 @@ class SyntheticEventManager:
             if self.game.ship.money >= partial_payment:
                 self.game.ship.money -= partial_payment
                 uprising_chance = template["negotiation_multipliers"]["partial_payment"]
-                if random.random() < uprising_chance:
+                if self.rng.random() < uprising_chance:
                     self.game.display_simple_message("Negotiation failed! Uprising begins!")
                     return True
                 else:
                     # IMPORTANT: Mark as pacified on successful negotiation
-                    self.pacified_locations[location.name] = {
+                    self.pacified_locations[location.handle] = {
                         "type": synthetic_type,
                         "turn": self.game.turn
                     }
@@ -10543,7 +13100,7 @@ class SyntheticEventManager:
 
     def add_potential_uprising(self, location, synthetic_type, base_chance):
         """Track location for potential future uprising"""
-        self.potential_uprisings[location.name] = {
+        self.potential_uprisings[location.handle] = {
             'type': synthetic_type,
             'base_chance': base_chance,
             'turns_stable': 0
@@ -10551,18 +13108,18 @@ class SyntheticEventManager:
 
     def check_potential_uprisings(self):
         """Check if any pacified locations rebel"""
-        for loc_name, data in list(self.potential_uprisings.items()):
+        for handle, data in list(self.potential_uprisings.items()):
             data['turns_stable'] += 1
             # Chance increases each turn
             current_chance = data['base_chance'] * (1 + (data['turns_stable'] * 0.1))
-            if random.random() < current_chance:
-                location = next(loc for loc in self.game.locations if loc.name == loc_name)
+            if self.rng.random() < current_chance:
+                location = self.game.locations.at(handle)
                 self.start_uprising(data['type'], location)
-                del self.potential_uprisings[loc_name]
+                del self.potential_uprisings[handle]
 
     def start_uprising(self, synthetic_type, location, is_global=False):
         """Start an uprising with proper effects"""
-        uprising_id = f"{synthetic_type}_{location.name}"
+        uprising_id = (synthetic_type, location.handle)
         if uprising_id not in self.active_uprisings:
             self.active_uprisings[uprising_id] = {
                 "type": synthetic_type,
@@ -10673,11 +13230,11 @@ class SyntheticEventManager:
                     nearby_locations = [
                         loc for loc in self.game.locations 
                         if (loc != location and
-                            loc.name not in self.pacified_locations and
-                            f"{synthetic_type}_{loc.name}" not in self.active_uprisings)
+                            loc.handle not in self.pacified_locations and
+                            (synthetic_type, loc.handle) not in self.active_uprisings)
                     ]
-                    if nearby_locations and random.random() < 0.3:  # 30% spread chance
-                        spread_target = random.choice(nearby_locations)
+                    if nearby_locations and self.rng.random() < 0.3:  # 30% spread chance
+                        spread_target = self.rng.choice(nearby_locations)
                         self.start_uprising(synthetic_type, spread_target, is_global=True)
                 
                 # Add spread check to effects
@@ -10717,7 +13274,7 @@ class SyntheticEventManager:
                         effects.remove(effect)
                 
                 # Chance for random event each turn
-                if random.random() < 0.3:  # 30% chance per turn
+                if self.rng.random() < 0.3:  # 30% chance per turn
                     self.trigger_random_event(uprising)
                 
                 # Clean up if all effects are done
@@ -10734,7 +13291,7 @@ class SyntheticEventManager:
             
             for i, building in enumerate(location.buildings):
                 if building in targets:
-                    if random.random() < effect.magnitude:  # destruction chance
+                    if self.rng.random() < effect.magnitude:  # destruction chance
                         buildings_to_remove.append(i)
                         self.game.display_simple_message(
                             f"Synthetic forces have destroyed a {building}!"
@@ -10742,11 +13299,13 @@ class SyntheticEventManager:
         
         # Remove destroyed buildings
         for index in sorted(buildings_to_remove, reverse=True):
-            location.buildings.pop(index)
+            location.remove_building(index)
+            self.game.events.publish(EVENT_BUILDINGS)
 
     def process_price_increase(self, location, commodity, effect):
         """Handle price increase effect"""
         if commodity in location.market:
+            self.game.observe_market(location)
             location.market[commodity] = int(location.market[commodity] * effect.magnitude)
 
     def process_production_reduction(self, location, effect):
@@ -10765,13 +13324,13 @@ class SyntheticEventManager:
         for location in self.game.locations:
             # Check for Neurodroid uprising
             neurodroid_count = len([b for b in location.buildings if b == "Neuroengineering Guild"])
-            if neurodroid_count >= 4 and random.random() < 0.2:  # 20% chance if 4+ guilds
+            if neurodroid_count >= 4 and self.rng.random() < 0.2:  # 20% chance if 4+ guilds
                 if self.handle_synthetic_uprising():
                     self.start_uprising("Neurodroid", location)
             
             # Check for Agrobot uprising
             agrobot_count = len([b for b in location.buildings if b == "Agrobot Assembly Line"])
-            if agrobot_count >= 4 and random.random() < 0.2:  # 20% chance if 4+ assembly lines
+            if agrobot_count >= 4 and self.rng.random() < 0.2:  # 20% chance if 4+ assembly lines
                 if self.handle_synthetic_uprising():
                     self.start_uprising("Agrobot", location)
 
@@ -10793,14 +13352,14 @@ class SyntheticEventManager:
                 [f"Cost: {self.game.format_money(resolution_cost)} credits"],
                 ["Success chance: 70%"]
             ]
-            print(self.game.create_box(content, 'double'))
+            self.game.io.write(self.game.create_box(content, 'double'))
             
             choice = self.game.validate_input("Attempt resolution? (yes/no): ", ['yes', 'no'])
             
             if choice == 'yes':
                 if self.game.ship.money >= resolution_cost:
                     self.game.ship.money -= resolution_cost
-                    if random.random() < 0.7:  # 70% success chance
+                    if self.rng.random() < 0.7:  # 70% success chance
                         del self.active_uprisings[uprising_id]
                         if uprising_id in self.active_effects:
                             del self.active_effects[uprising_id]
@@ -10861,7 +13420,7 @@ class SyntheticEventManager:
             # Select random event for uprising type
             uprising_type = uprising["type"]
             if uprising_type in event_types:
-                event = random.choice(event_types[uprising_type])
+                event = self.rng.choice(event_types[uprising_type])
                 
                 # Display event
                 self.game.display_story_message([
@@ -10894,9 +13453,9 @@ class SyntheticEventManager:
                              self.has_vulnerable_buildings(loc, uprising["type"])]
         
         if connected_locations:
-            target = random.choice(connected_locations)
+            target = self.rng.choice(connected_locations)
             spread_chance = 0.3 + (uprising["turn_count"] * 0.1)  # Increases over time
-            if random.random() < spread_chance:
+            if self.rng.random() < spread_chance:
                 self.start_uprising(uprising["type"], target)
                 
     def has_vulnerable_buildings(self, location, uprising_type):
@@ -10910,59 +13469,63 @@ class SyntheticEventManager:
     def seize_resources(self, resource_type):
         """Handle resource seizure by synthetic forces"""
         if resource_type == "research":
-            amount = random.randint(10, 30)
+            amount = self.rng.randint(10, 30)
             if self.game.ship.research_points >= amount:
                 self.game.ship.research_points -= amount
                 self.game.display_simple_message(f"Lost {amount} research points to synthetic forces!")
         elif resource_type == "agri":
-            amount = random.randint(20, 50)
+            amount = self.rng.randint(20, 50)
             if self.game.ship.cargo['agri'] >= amount:
                 self.game.ship.cargo['agri'] -= amount
                 self.game.display_simple_message(f"Lost {amount} agricultural goods to synthetic forces!")
 
+def _infestation_types():
+    """Ship infestations, the buildings that breed them and their effects"""
+    return {
+        "Bugrats": {
+            "trigger_buildings": ["Permaculture Paradise"],
+            "trigger_threshold": 5,
+            "debugratization_cost": 50000,
+            "content": {
+                "title": "BUGRAT INFESTATION ALERT!",
+                "introduction": "Highly adaptive insectoidal rodents are spreading through agricultural systems!",
+                "options": [
+                    {"label": "Pay for Debugratization", "cost": True},
+                    {"label": "Risk Infestation", "cost": False}
+                ]
+            },
+            "effects": [
+                {
+                    "type": "cargo_consumption",
+                    "cargo_type": "agri",
+                    "consumption_rate": 0.25,
+                    "message": "Bugrats consume {loss} units of agricultural cargo!"
+                },
+                {
+                    "type": "ship_damage",
+                    "damage_rate": 5,
+                    "probability": 0.2,
+                    "message": "Bugrats damage ship systems!"
+                }
+            ],
+            "max_duration": 5
+        }
+        # Add more infestation types here
+    }
+CONTENT_BUILDERS["infestation_types"] = _infestation_types
+
 class InfestationManager:
     def __init__(self, game):
         self.game = game
-        self.infestation_types = {
-            "Bugrats": {
-                "trigger_buildings": ["Permaculture Paradise"],
-                "trigger_threshold": 5,
-                "debugratization_cost": 50000,
-                "content": {
-                    "title": "BUGRAT INFESTATION ALERT!",
-                    "introduction": "Highly adaptive insectoidal rodents are spreading through agricultural systems!",
-                    "options": [
-                        {"label": "Pay for Debugratization", "cost": True},
-                        {"label": "Risk Infestation", "cost": False}
-                    ]
-                },
-                "effects": [
-                    {
-                        "type": "cargo_consumption",
-                        "cargo_type": "agri",
-                        "consumption_rate": 0.25,
-                        "message": "Bugrats consume {loss} units of agricultural cargo!"
-                    },
-                    {
-                        "type": "ship_damage",
-                        "damage_rate": 5,
-                        "probability": 0.2,
-                        "message": "Bugrats damage ship systems!"
-                    }
-                ],
-                "max_duration": 5
-            }
-            # Add more infestation types here
-        }
+        self.rng = game.random_streams.stream("infestations")
+        self.infestation_types = content_table("infestation_types")
         
     def check_global_infestations(self):
         """Check for global infestation events"""
         for infestation_name, infestation_config in self.infestation_types.items():
             # Count buildings that trigger this infestation
-            building_count = sum(
-                sum(loc.buildings.count(building) for building in infestation_config["trigger_buildings"])
-                for loc in self.game.locations
-            )
+            galaxy = self.game.galaxy()
+            building_count = sum(galaxy.count_buildings(building) for building in infestation_config["trigger_buildings"])
             
             # Check if threshold is met
             if building_count >= infestation_config["trigger_threshold"]:
@@ -10977,7 +13540,7 @@ class InfestationManager:
             'introduction': content['introduction'],
             'options': " | ".join(f"{i+1}. {opt['label']}" for i, opt in enumerate(content['options']))
         }
-        print(self.game.create_character_box(infestation_content))
+        self.game.io.write(self.game.create_character_box(infestation_content))
 
         # Generate valid choices
         valid_choices = [str(i+1) for i in range(len(content['options']))]
@@ -11034,7 +13597,7 @@ class InfestationManager:
                     )
             
             elif effect['type'] == 'ship_damage':
-                if random.random() < effect.get('probability', 1.0):
+                if self.rng.random() < effect.get('probability', 1.0):
                     ship.damage += effect['damage_rate']
                     self.game.display_simple_message(effect['message'])
         
@@ -11058,8 +13621,10 @@ class InfestationManager:
 
 
 class SpecialCharacterEncounters:
+    SHARED_CONTENT = ('encounter_chances',)
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("encounters")
         self.encounter_chances = {
             "Planet": {
                 "merchant": 0.3,
@@ -11080,14 +13645,14 @@ class SpecialCharacterEncounters:
 
     def generate_character(self, character_type):
         race_types = ["Human", "Synthetic", "Alien"]
-        race = random.choice(race_types)
+        race = self.rng.choice(race_types)
         
         if race == "Human":
-            name = f"{random.choice(['Capt.', 'Dr.', 'Prof.'])} {random.choice(['Smith', 'Chen', 'Patel', 'Kim'])}"
+            name = f"{self.rng.choice(['Capt.', 'Dr.', 'Prof.'])} {self.rng.choice(['Smith', 'Chen', 'Patel', 'Kim'])}"
         elif race == "Synthetic":
-            name = f"Unit-{random.randint(1000,9999)}"
+            name = f"Unit-{self.rng.randint(1000,9999)}"
         else:
-            name = f"{random.choice(['Zx', 'Ky', 'Vr'])}{random.choice(['ak', 'tol', 'xis'])}"
+            name = f"{self.rng.choice(['Zx', 'Ky', 'Vr'])}{self.rng.choice(['ak', 'tol', 'xis'])}"
 
         characters = {
             "merchant": {
@@ -11100,14 +13665,14 @@ class SpecialCharacterEncounters:
             "researcher": {
                 "title": f"{race} Research Coordinator",
                 "name": name,
-                "exchange_rate": random.randint(500, 1000),  # Credits per research point
+                "exchange_rate": self.rng.randint(500, 1000),  # Credits per research point
                 "greeting": "Your data could advance our understanding...",
                 "hostile_chance": 0.05
             },
             "rogue_captain": {
                 "title": f"Rogue {race} Captain",
                 "name": name,
-                "demand": random.randint(5000, 15000),
+                "demand": self.rng.randint(5000, 15000),
                 "greeting": "Your cargo or your ship...",
                 "hostile_chance": 0.8
             }
@@ -11128,12 +13693,12 @@ class SpecialCharacterEncounters:
         ]
         
         # Select 2-4 random items
-        num_items = random.randint(2, 4)
-        selected_items = random.sample(possible_items, num_items)
+        num_items = self.rng.randint(2, 4)
+        selected_items = self.rng.sample(possible_items, num_items)
         
         for item, base_price, desc in selected_items:
             # Randomize price within ±20%
-            price = int(base_price * random.uniform(0.8, 1.2))
+            price = int(base_price * self.rng.uniform(0.8, 1.2))
             offers.append({
                 "item": item,
                 "price": price,
@@ -11158,7 +13723,7 @@ class SpecialCharacterEncounters:
                 offer['description']
             ])
             
-        print(self.game.create_box(content, 'double'))
+        self.game.io.write(self.game.create_box(content, 'double'))
         
         options = [str(i) for i in range(1, len(character["offers"]) + 1)] + ['0']
         choice = self.game.validate_input("Choose item to buy (0 to leave): ", options)
@@ -11191,7 +13756,7 @@ class SpecialCharacterEncounters:
             [f"Your funds: {self.game.format_money(self.game.ship.money)}"],
             [f"Maximum points available: {max_points}"]
         ]
-        print(self.game.create_box(content, 'double'))
+        self.game.io.write(self.game.create_box(content, 'double'))
         
         amount = self.game.validate_quantity_input("Enter research points to buy (max/m, half/h): ")
 
@@ -11225,7 +13790,7 @@ class SpecialCharacterEncounters:
             ["2. Attempt to flee"],
             ["3. Stand and fight"]
         ]
-        print(self.game.create_box(content, 'double'))
+        self.game.io.write(self.game.create_box(content, 'double'))
         
         choice = self.game.validate_input("Choose action (1/2/3): ", ['1', '2', '3'])
         
@@ -11240,7 +13805,7 @@ class SpecialCharacterEncounters:
         elif choice == '2':
             # Chance to escape based on speed
             escape_chance = min(0.8, self.game.ship.speed * 0.2)
-            if random.random() < escape_chance:
+            if self.rng.random() < escape_chance:
                 self.game.display_simple_message("Successfully evaded the rogue captain!")
                 return True
             else:
@@ -11254,7 +13819,7 @@ class SpecialCharacterEncounters:
         """Trigger a random character encounter"""
         chances = self.encounter_chances[location_type]
         for char_type, chance in chances.items():
-            if random.random() < chance:
+            if self.rng.random() < chance:
                 character = self.generate_character(char_type)
                 
                 if char_type == "merchant":
@@ -11274,8 +13839,10 @@ class SpecialCharacterEncounters:
 
 class PassengerReputationManager:
     """Manages passenger reputation effects and related story/character events"""
+    SHARED_CONTENT = ('reputation_thresholds',)
     def __init__(self, game):
         self.game = game
+        self.rng = game.random_streams.stream("reputation")
         self.reputation_thresholds = {
             20: "Reliable Transport",
             40: "Luxury Provider",
@@ -11379,7 +13946,7 @@ class PassengerReputationManager:
         for char_type, data in self.vip_characters.items():
             if (reputation >= data["rep_required"] and 
                 char_type not in self.spawned_characters and
-                random.random() < 0.3):  # 30% chance if all conditions met
+                self.rng.random() < 0.3):  # 30% chance if all conditions met
                 
                 # Generate VIP character
                 character = self.game.character_generators["human"].generate_character(
@@ -11388,18 +13955,19 @@ class PassengerReputationManager:
                 )
                 
                 # Add to waiting passengers
-                if self.game.current_location.name in self.game.port_system.waiting_passengers:
+                if self.game.current_location.handle in self.game.port_system.waiting_passengers:
                     passenger = Passenger(
                         character.name,
-                        random.choice(list(self.game.known_locations)),
-                        wealth_level=5
+                        self.rng.choice(self.game.locations.handles_of(self.game.known_locations)),
+                        wealth_level=5,
+                        rng=self.rng
                     )
                     passenger.is_vip = True
                     passenger.rewards = data["rewards"]
                     passenger.plot_points = data["plot_points"]
                     
                     self.game.port_system.waiting_passengers[
-                        self.game.current_location.name].append(passenger)
+                        self.game.current_location.handle].append(passenger)
                     
                     self.game.display_story_message([
                         f"VIP Passenger Available: {char_type} {character.name}",
@@ -11422,6 +13990,8 @@ class PassengerReputationManager:
                 
                 # Generate character and create event chain
                 character = self.game.character_system.generate_character(trigger_id)
+                if character is None:
+                    continue  # No generator template for this story character yet
                 event_chain = self.game.character_system.create_event_chain(
                     trigger["event_chain"],
                     character
@@ -11433,7 +14003,7 @@ class PassengerReputationManager:
                 
         # Check for VIP passenger trigger
         if self.game.character_system.character_triggers["vip_passenger"]["condition"](self.game):
-            vip_character = self.game.character_generators["special"].generate_vip_passenger()
+            vip_character = self.game.character_system.character_generators["special"].generate_vip_passenger()
             self.add_special_passenger_to_port(vip_character)
             return True
             
@@ -11446,17 +14016,18 @@ class PassengerReputationManager:
             character: The special character to add
             event_chain: Optional event chain for story characters
         """
-        if self.game.current_location.name in self.game.port_system.waiting_passengers:
+        if self.game.current_location.handle in self.game.port_system.waiting_passengers:
             # Create base passenger with known destination
-            available_destinations = [loc for loc in self.game.known_locations 
-                                    if loc != self.game.current_location.name]
+            available_destinations = [handle for handle in self.game.locations.handles_of(self.game.known_locations)
+                                      if handle != self.game.current_location.handle]
             if not available_destinations:
                 return False  # Can't add passenger with no valid destinations
             
             passenger = Passenger(
                 name=character.name,
-                destination=random.choice(available_destinations),
-                wealth_level=5  # Special characters are always high wealth
+                destination=self.rng.choice(available_destinations),
+                wealth_level=5,  # Special characters are always high wealth
+                rng=self.rng
             )
             
             # Add base character attributes
@@ -11535,7 +14106,7 @@ class PassengerReputationManager:
             
             # Add to waiting passengers
             self.game.port_system.waiting_passengers[
-                self.game.current_location.name].append(passenger)
+                self.game.current_location.handle].append(passenger)
             
             # Display announcement
             self.game.display_story_message(message)
@@ -11577,17 +14148,18 @@ class PassengerReputationManager:
                 self.active_story_chains[char_type] = event_chain
                 
                 # Add to current location's waiting passengers
-                if self.game.current_location.name in self.game.port_system.waiting_passengers:
+                if self.game.current_location.handle in self.game.port_system.waiting_passengers:
                     passenger = Passenger(
                         character.name,
-                        random.choice(list(self.game.known_locations)),
-                        wealth_level=5
+                        self.rng.choice(self.game.locations.handles_of(self.game.known_locations)),
+                        wealth_level=5,
+                        rng=self.rng
                     )
                     passenger.is_story_character = True
                     passenger.event_chain = event_chain
                     
                     self.game.port_system.waiting_passengers[
-                        self.game.current_location.name].append(passenger)
+                        self.game.current_location.handle].append(passenger)
                     
                     self.game.display_story_message([
                         f"Special Passenger Appears: {char_type} {character.name}",
@@ -11822,11 +14394,14 @@ class CharacterTemplate:
             }
             # Add more character templates...
         }
-    
+
+CONTENT_BUILDERS["character_templates"] = CharacterTemplate.initialize_character_templates
+
 class CharacterManager:
     def __init__(self, game):
         self.game = game
-        self.templates = CharacterTemplate.initialize_character_templates()
+        self.rng = game.random_streams.stream("characters.templates")
+        self.templates = content_table("character_templates")
         self.active_characters = {}
         self.met_characters = set()
         self.current_interactions = {}
@@ -11840,7 +14415,7 @@ class CharacterManager:
         # Check each template for possible spawning
         for template_id, template in self.templates.items():
             if location_type in template['requirements'].get('spawn_locations', []):
-                if random.random() < template['requirements'].get('spawn_chance', 0):
+                if self.rng.random() < template['requirements'].get('spawn_chance', 0):
                     character = self.spawn_character(template_id, self.game.current_location)
                     if character:
                         self.announce_character(character.character_id)
@@ -11854,12 +14429,12 @@ class CharacterManager:
         basic_info = template['basic_info']
         
         # Generate name
-        title = random.choice(basic_info['title_pool'])
+        title = self.rng.choice(basic_info['title_pool'])
         
         # Create character
         character = CharacterTemplate(
             character_id=f"{template_id}_{self.game.turn}",
-            content=template
+            content=dict(template)  # Validation fills in missing sections; the template is shared
         )
         
         # Add runtime attributes
@@ -11902,7 +14477,7 @@ class CharacterManager:
             return False
             
         # Check chance
-        if random.random() > reqs.get("spawn_chance", 0.1):
+        if self.rng.random() > reqs.get("spawn_chance", 0.1):
             return False
             
         return True
@@ -11916,7 +14491,7 @@ class CharacterManager:
         if not dialogue_pool:
             return ""
             
-        dialogue = random.choice(dialogue_pool)
+        dialogue = self.rng.choice(dialogue_pool)
         return dialogue.format(**kwargs)
 
     def handle_character_interaction(self, character_id, choice, location_type):
@@ -11956,7 +14531,1154 @@ class CharacterManager:
         
         return True                      
 
+# Batch simulation: run many headless games with scripted or random policies
+class RandomPolicy:
+    """Picks a random command each action"""
+    def __init__(self, rng):
+        self.rng = rng
+
+    def __call__(self, game):
+        rng = self.rng
+        choice = rng.choices(
+            ["buy", "sell", "travel", "end", "repair", "upgrade", "build"],
+            weights=[20, 20, 20, 30, 4, 3, 3]
+        )[0]
+        if choice == "buy":
+            return ["b", rng.choice(["tech", "agri"]), rng.choice(["max", "half", str(rng.randint(1, 50))])]
+        if choice == "sell":
+            held = [item for item, amount in game.ship.cargo.items() if amount > 0]
+            if not held:
+                return ["e"]
+            return ["s", rng.choice(held), rng.choice(["max", "half"])]
+        if choice == "travel":
+            return ["t", rng.choice(game.known_locations + [loc.name for loc in game.locations])]
+        if choice == "repair":
+            return ["r"]
+        if choice == "upgrade":
+            return ["u", rng.choice(["attack", "defense", "speed"])]
+        if choice == "build":
+            return ["bl", rng.choice(["sm", "pc", "oc", "ab", "nt", "ne"])]
+        return ["e"]
+
+class TraderPolicy:
+    """Greedy trader: buy where cheap, travel to the best known price, sell"""
+    def __init__(self, rng):
+        self.rng = rng
+        self.actions_this_turn = 0
+        self.last_turn = -1
+
+    def __call__(self, game):
+        if game.turn != self.last_turn:
+            self.last_turn = game.turn
+            self.actions_this_turn = 0
+        self.actions_this_turn += 1
+        if self.actions_this_turn > 4:
+            return ["e"]
+
+        here = game.current_location
+        ship = game.ship
+        markets = [loc for loc in game.locations if loc.name in game.known_locations or loc.location_type == "Planet"]
+        for loc in markets:
+            game.observe_market(loc)
+
+        if ship.damage >= 50 and ship.money >= ship.damage * 10:
+            return ["r"]
+
+        held = [item for item in ("tech", "agri") if ship.cargo[item] > 0]
+        for item in held:
+            best = max(markets, key=lambda loc: loc.market[item])
+            if best is here or best.market[item] <= here.market[item]:
+                if here.can_trade(item):
+                    return ["s", item, "max"]
+            else:
+                return ["t", best.name]
+        if held:
+            return ["e"]
+
+        margins = []
+        for item in ("tech", "agri"):
+            if not here.can_trade(item) or here.market[item] <= 0:
+                continue
+            best = max(markets, key=lambda loc: loc.market[item])
+            margins.append((best.market[item] - here.market[item], item))
+        if margins:
+            margin, item = max(margins)
+            if margin > 0 and ship.money > here.market[item] * 2:
+                return ["b", item, "max"]
+        return ["t", self.rng.choice(markets).name] if self.rng.random() < 0.5 else ["e"]
+
+class ScriptedPolicy:
+    """Replays a fixed list of command lines, one action at a time, cycling"""
+    def __init__(self, rng, script=None):
+        self.script = [line.split(",") for line in (script or ["b,tech,max", "t,Beta", "s,tech,max", "e"])]
+        self.position = 0
+
+    def __call__(self, game):
+        lines = self.script[self.position % len(self.script)]
+        self.position += 1
+        return lines
+
+class PlannerPolicy:
+    """Follows RoutePlanner: buy the planned commodity, travel, sell on arrival"""
+    def __init__(self, rng, hops=3):
+        self.rng = rng
+        self.hops = hops
+        self.bought_at = None
+        self.destination = None
+
+    def __call__(self, game):
+        here = game.current_location
+        ship = game.ship
+        if ship.damage >= 50 and ship.money >= ship.damage * 10:
+            return ["r"]
+        held = [item for item, amount in ship.cargo.items() if amount > 0]
+        if held and here.name != self.bought_at:
+            sellable = [item for item in held if here.can_trade(item)]
+            if sellable:
+                return ["s", sellable[0], "max"]
+        if held and self.destination and self.destination != here.name:
+            return ["t", self.destination]
+
+        plan = game.route_planner.plan(self.hops)
+        if not plan["legs"]:
+            return ["e"]
+        leg = plan["legs"][0]
+        self.destination = leg["to"]
+        if leg["buy"] and ship.cargo[leg["buy"]] == 0:
+            self.bought_at = here.name
+            return ["b", leg["buy"], "max"]
+        return ["t", leg["to"]]
+
+SIMULATION_POLICIES = {
+    "random": RandomPolicy,
+    "trader": TraderPolicy,
+    "planner": PlannerPolicy,
+    "scripted": ScriptedPolicy,
+}
+
+def play_headless_game(seed, policy="random", max_turns=200, difficulty=1, script=None, lazy_markets=False):
+    """Play one complete headless game and return its summary"""
+    started = time.perf_counter()
+    feed = CommandFeed()
+    summary = {"seed": seed, "policy": policy, "outcome": None, "death_turn": None, "error": None}
+    game = None
+    try:
+        game = Game(io=IOBackend(feed), difficulty=difficulty, player_name="Autopilot", seed=seed,
+                    lazy_markets=lazy_markets)
+        policy_rng = game.random_streams.stream("policy")
+        if policy == "scripted":
+            player = ScriptedPolicy(policy_rng, script)
+        else:
+            player = SIMULATION_POLICIES[policy](policy_rng)
+        max_actions = max_turns * 20
+        actions = 0
+        while game.turn < max_turns:
+            if actions >= max_actions:
+                summary["outcome"] = "stalled"
+                break
+            feed.extend(player(game))
+            game.play_turn()
+            feed.clear()  # Drop lines left over from an aborted command
+            actions += 1
+            game.update_rank()
+            game_over = game.check_game_over()
+            if game_over:
+                summary["outcome"] = game_over
+                summary["death_turn"] = game.turn
+                break
+            if game.story_manager.is_story_completed():
+                summary["outcome"] = "story_complete"
+                break
+        else:
+            summary["outcome"] = "max_turns"
+    except SystemExit:
+        summary["outcome"] = "quit"
+    except InputExhausted:
+        summary["outcome"] = "stalled"
+    except Exception as e:
+        summary["outcome"] = "error"
+        summary["error"] = f"{type(e).__name__}: {e}"
+
+    if game is not None and hasattr(game, 'story_manager'):
+        summary.update({
+            "turns": game.turn,
+            "score": game.calculate_final_score(),
+            "money": game.ship.money,
+            "rank": game.rank,
+            "chapter": game.story_manager.current_chapter,
+        })
+    else:
+        summary.update({"turns": 0, "score": 0, "money": 0, "rank": None, "chapter": None})
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+def _simulate_chunk(seeds, policy, max_turns, difficulty, script, lazy_markets=False):
+    """Worker entry point: play a chunk of games in one process"""
+    return [play_headless_game(seed, policy, max_turns, difficulty, script, lazy_markets) for seed in seeds]
+
+def simulate_batch(games, policy="random", max_turns=200, difficulty=1, workers=None,
+                   base_seed=0, chunk_size=8, script=None, lazy_markets=False):
+    """Fan games out across a process pool, yielding per-game summaries as they finish"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    seeds = [base_seed + i for i in range(games)]
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    if workers == 1:
+        for chunk in chunks:
+            for summary in _simulate_chunk(chunk, policy, max_turns, difficulty, script, lazy_markets):
+                yield summary
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_chunk, chunk, policy, max_turns, difficulty, script, lazy_markets)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            for summary in future.result():
+                yield summary
+
+def _distribution(values):
+    """Summary statistics for a list of numbers"""
+    if not values:
+        return {"count": 0}
+    import statistics
+    ordered = sorted(values)
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "mean": statistics.mean(ordered),
+        "stdev": statistics.pstdev(ordered),
+        "min": ordered[0],
+        "p10": percentile(0.10),
+        "median": percentile(0.50),
+        "p90": percentile(0.90),
+        "max": ordered[-1],
+    }
+
+def summarize_batch(summaries, elapsed):
+    """Aggregate per-game summaries into outcome distributions"""
+    from collections import Counter
+    games = len(summaries)
+    finished = [s for s in summaries if s["outcome"] != "error"]  # Errored games stop early; they are only counted
+    return {
+        "games": games,
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed if elapsed > 0 else 0.0,
+        "score": _distribution([s["score"] for s in finished]),
+        "turns": _distribution([s["turns"] for s in finished]),
+        "death_turn": _distribution([s["death_turn"] for s in summaries if s["death_turn"] is not None]),
+        "rank": dict(Counter(s["rank"] for s in summaries)),
+        "chapter": dict(Counter(s["chapter"] for s in summaries)),
+        "outcome": dict(Counter(s["outcome"] for s in summaries)),
+        "errors": dict(Counter(s["error"] for s in summaries if s["error"])),
+    }
+
+def format_batch_report(report):
+    """Plain-text lines for a batch report"""
+    lines = [
+        f"Games: {report['games']}  Time: {report['elapsed']:.2f}s  "
+        f"Throughput: {report['games_per_second']:.1f} games/s"
+    ]
+    for key in ("score", "turns", "death_turn"):
+        dist = report[key]
+        if dist["count"]:
+            lines.append(
+                f"{key:<11} n={dist['count']} mean={dist['mean']:.1f} sd={dist['stdev']:.1f} "
+                f"min={dist['min']:.0f} p10={dist['p10']:.0f} median={dist['median']:.0f} "
+                f"p90={dist['p90']:.0f} max={dist['max']:.0f}"
+            )
+        else:
+            lines.append(f"{key:<11} n=0")
+    for key in ("outcome", "rank", "chapter", "errors"):
+        counts = sorted(report[key].items(), key=lambda kv: -kv[1])
+        if counts:
+            lines.append(f"{key:<11} " + ", ".join(f"{name}: {count}" for name, count in counts))
+    return lines
+
+_PLAIN_CLASSES = {}
+
+def _attributes(obj):
+    """(name, value) pairs of an object's slots and __dict__"""
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name != '__dict__' and hasattr(obj, name):
+                yield name, getattr(obj, name)
+    yield from getattr(obj, '__dict__', {}).items()
+
+def _dict_backed(obj):
+    """Copy of obj in the plain __dict__ (or dict) form it had before it was slotted"""
+    if isinstance(obj, MiningPlatform):
+        return {'type': obj.resource_type, 'efficiency': obj.efficiency, 'capacity': obj.capacity}
+    if isinstance(obj, ContractProgress):
+        progress = dict(obj.items())
+        progress['destinations_visited'] = set(obj.destinations_visited)
+        return progress
+    cls = type(obj)
+    if cls not in _PLAIN_CLASSES:
+        _PLAIN_CLASSES[cls] = type(cls.__name__, (), {})
+    plain = _PLAIN_CLASSES[cls]()
+    for name, value in _attributes(obj):
+        setattr(plain, name, _dict_backed(value) if isinstance(value, ContractProgress) else value)
+    return plain
+
+def _slotted_copy(obj):
+    """Copy of obj sharing its attribute values, except its own progress counters"""
+    cls = type(obj)
+    copy = cls.__new__(cls)
+    for name, value in _attributes(obj):
+        if isinstance(value, ContractProgress):
+            value = _slotted_copy(value)
+        elif name == 'destinations_visited':
+            value = set(value)
+        setattr(copy, name, value)
+    return copy
+
+def memory_benchmark(count=10000):
+    """Bytes per object of the slotted game objects against their former __dict__ form.
+
+    Attribute values are shared between copies, so only each object's own
+    storage is counted (plus a contract's progress counters).
+    """
+    import tracemalloc
+    rng = random.Random(0)
+    samples = [
+        Passenger("Traveller", 3, 2, rng),
+        Quest("Deliver Tech", "Deliver 50 tech to a refinery", 1000, 10, "cantina", {"amount": 50}),
+        Contract("cargo", 10, {"source": 0, "destination": 1, "cargo_type": "tech", "min_amount": 50},
+                 {"money": 5000}, "Transport tech"),
+        MiningPlatform("salt", 80, 150),
+        UprisingEffect("tech_price_increase", 3, 1.2),
+        PassengerModule("Standard Cabin", 4, 2, 5000),
+        Planet("Zeta", 5, 5, 5, "Stable", rng),
+    ]
+
+    def bytes_per_object(copy, sample):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        copies = [copy(sample) for _ in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(copies)
+        tracemalloc.stop()
+        return used / count
+
+    return [(type(sample).__name__, bytes_per_object(_dict_backed, sample), bytes_per_object(_slotted_copy, sample))
+            for sample in samples]
+
+def run_simulation_cli(args):
+    """Entry point for `python cargo.py simulate`"""
+    import json
+    started = time.perf_counter()
+    summaries = []
+    jsonl = open(args.jsonl, "w") if args.jsonl else None
+    try:
+        for summary in simulate_batch(args.games, args.policy, args.turns, args.difficulty,
+                                      args.workers, args.base_seed, args.chunk_size, args.script,
+                                      args.lazy_markets):
+            summaries.append(summary)
+            if jsonl:
+                jsonl.write(json.dumps(summary) + "\n")
+            if args.progress and len(summaries) % args.progress == 0:
+                rate = len(summaries) / (time.perf_counter() - started)
+                print(f"{len(summaries)}/{args.games} games ({rate:.1f} games/s)")
+    finally:
+        if jsonl:
+            jsonl.close()
+    report = summarize_batch(summaries, time.perf_counter() - started)
+    for line in format_batch_report(report):
+        print(line)
+    return report
+
+class SessionIO(IOBackend):
+    """I/O for one attempt at a server session's action.
+
+    Input comes from the lines the player has sent so far and runs out with
+    InputExhausted; output, pauses, clears and prompts are recorded as events
+    for the session to deliver.
+    """
+    replays = True
+
+    def __init__(self, lines, layout):
+        super().__init__(input_provider=CommandFeed(max_idle_reads=0))
+        self.input_provider.extend(lines)
+        self.layout = layout
+        self.events = []
+        self.output_sink = self.events.append  # Anything but None: sessions render
+
+    def read(self, prompt=""):
+        self.events.append(("prompt", prompt))
+        line = super().read(prompt)
+        self.events.append(("answer", prompt, line))
+        return line
+
+    def write(self, text=""):
+        self.events.append(("write", text))
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.events.append(("pause", seconds))
+
+    def clear(self):
+        self.events.append(("clear",))
+
+class TelnetStream:
+    """Text stream onto a telnet or netcat connection"""
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        self.writer.write(text.replace('\n', '\r\n').encode('utf-8'))
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return True
+
+def telnet_line(data):
+    """Decode one line from a telnet or netcat client, dropping option negotiation"""
+    text = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte == 255 and i + 1 < len(data):  # IAC
+            command = data[i + 1]
+            if command == 255:
+                text.append(255)
+                i += 2
+            else:
+                i += 3 if 251 <= command <= 254 else 2  # WILL/WONT/DO/DONT carry an option
+            continue
+        text.append(byte)
+        i += 1
+    return text.decode('utf-8', 'replace').rstrip('\r\n')
+
+MESSAGE_HEADER = struct.Struct(">I")
+
+def write_message(writer, message):
+    """Send one length-prefixed pickled message on a dispatcher control connection"""
+    payload = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    writer.write(MESSAGE_HEADER.pack(len(payload)) + payload)
+
+async def read_message(reader):
+    """Receive one message sent with write_message"""
+    size, = MESSAGE_HEADER.unpack(await reader.readexactly(MESSAGE_HEADER.size))
+    return SnapshotUnpickler(BytesIO(await reader.readexactly(size))).load()
+
+class HibernationStore:
+    """Hibernated session state in a SQLite database, one row per session.
+
+    Keys start with the id of the process that owns the row ("<pid>:...").
+    Worker processes may share one database, so on opening only the rows of
+    processes that are gone are cleared: those were left by a crash. Servers
+    call the store from executor threads; a lock keeps them off the
+    connection one at a time.
+    """
+    def __init__(self, path):
+        import sqlite3
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, state BLOB)")
+        self.clear_orphans()
+
+    def save(self, key, state):
+        """Store a session's state; returns its size in bytes"""
+        data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO sessions (key, state) VALUES (?, ?)", (key, data))
+        return len(data)
+
+    def load(self, key):
+        """Read a session's state; the row stays until discard(), once the state is restored"""
+        with self.lock:
+            row = self.db.execute("SELECT state FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise SnapshotError(f"No hibernated session {key}")
+        return SnapshotUnpickler(BytesIO(row[0])).load()
+
+    def discard(self, key):
+        with self.lock:
+            self.db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def clear_orphans(self):
+        """Delete rows whose owning process no longer runs; returns how many"""
+        with self.lock:
+            owners = {key.split(":", 1)[0] for key, in self.db.execute("SELECT key FROM sessions")}
+            cleared = 0
+            for owner in owners:
+                if owner.isdigit() and int(owner) != os.getpid() and process_running(int(owner)):
+                    continue
+                cleared += self.db.execute("DELETE FROM sessions WHERE key LIKE ?", (f"{owner}:%",)).rowcount
+        return cleared
+
+    def close(self):
+        self.db.close()
+
+def process_running(pid):
+    """Whether a process with this id exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Someone else's process
+    return True
+
+class GameSession:
+    """One captain connected to a GameServer.
+
+    The game never blocks on input. Each action is played on a fork of the
+    game as it stood when the action began, fed with the lines received so
+    far; when it runs out of input the attempt is dropped and only its new
+    output is sent. The next line re-runs the action with one more line.
+    Games are deterministic for a seed, so every attempt repeats the previous
+    one up to where it stopped. Attempts run in the loop's default executor
+    so a long action never stalls the other sessions.
+
+    The price is paid per line: each one forks the game again and replays
+    the action from its start, so an action that reads n lines costs n forks
+    and replays its early steps n times. Menus are cheap to replay; a
+    navigator consult re-runs its NAVIGATOR_REPLAY_ITERATIONS-sized search
+    on every line typed after it.
+    """
+    STATE_SAMPLE_ACTIONS = 25  # Actions between measurements of the snapshot size in stats()
+
+    def __init__(self, server, reader, writer, key=None):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.key = key  # Assigned by a SessionDispatcher
+        self.peer = key if key is not None else writer.get_extra_info('peername')
+        self.seed = random.getrandbits(64)
+        self.layout = TerminalLayout(size=lambda: os.terminal_size((server.columns, server.lines)))
+        self.stream = TelnetStream(writer)
+        self.screen = FrameRenderer(self.stream, self.layout)
+        self.clock = PacingClock(server.pacing, server.pace_scale)
+        self.game = None  # Game as of the start of the current action
+        self.lines = []  # Input received during the current action
+        self.delivered = 0  # Events of the current action already sent
+        self.actions = 0
+        self.cpu_time = 0.0
+        self.state_sample = None  # (actions, snapshot bytes) when last measured
+        self.last_input = time.monotonic()
+        self.busy = False  # Playing or delivering an action
+        self.closed = False
+        self.migrated = False
+        self.hibernated = None  # (turn, stored bytes) while the state lives in the server's store
+        self.storing = asyncio.Lock()  # Held while the state moves to or from the store
+
+    async def run(self):
+        try:
+            await self.advance()
+            while not self.closed:
+                data = await self.reader.readline()
+                if not data:
+                    break
+                self.last_input = time.monotonic()
+                async with self.storing:
+                    if self.hibernated:
+                        await self.wake()
+                self.lines.append(telnet_line(data))
+                await self.advance()
+        finally:
+            self.closed = True
+            self.writer.close()
+            if self.hibernated:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.server.store.discard, self.store_key)
+
+    async def advance(self):
+        """Play the current action as far as the input received allows"""
+        self.busy = True
+        try:
+            await self.play()
+        finally:
+            self.busy = False
+
+    async def play(self):
+        loop = asyncio.get_running_loop()
+        while not self.closed:
+            io = SessionIO(self.lines, self.layout)
+            done = await loop.run_in_executor(None, self.timed_attempt, io)
+            await self.deliver(io.events)
+            if done is None:
+                return  # Waiting for the player
+            self.lines = []
+            self.delivered = 0
+            self.actions += 1
+            self.closed = done
+
+    def timed_attempt(self, io):
+        """attempt() charged to this session's CPU time; None when it ran out of input"""
+        started = time.thread_time()
+        try:
+            return self.attempt(io)
+        except InputExhausted:
+            return None
+        finally:
+            self.cpu_time += time.thread_time() - started
+
+    def attempt(self, io):
+        """Run the current action once; returns True when the game is over"""
+        try:
+            if self.game is None:
+                self.game = Game(io=io, seed=self.seed)
+                return False
+            game = self.game.fork()
+            game.io = io
+            done = game.finish_action(game.play_turn())
+        except SystemExit:
+            return True
+        except InputExhausted:
+            raise
+        except Exception as e:
+            self.server.log(f"Session {self.peer}: {type(e).__name__}: {e}")
+            io.write(f"Session ended by an error: {e}")
+            return True
+        self.game = game
+        return done
+
+    async def deliver(self, events):
+        """Send the events this attempt added to what the player has already seen"""
+        screen = self.screen
+        for event in events[self.delivered:]:
+            kind = event[0]
+            if kind == "write":
+                screen(event[1])
+            elif kind == "prompt":
+                screen.settle()
+                self.stream.write(event[1])
+            elif kind == "answer":
+                screen.prompted(event[1], event[2])
+            elif kind == "pause":
+                screen.flush()
+                await self.writer.drain()
+                await self.clock.apause(event[1])
+            elif kind == "clear":
+                screen.settle()
+                await self.writer.drain()
+                await self.clock.aflush()
+                screen.clear()
+        self.delivered = len(events)
+        screen.flush()
+        await self.writer.drain()
+
+    def state(self, compress=False):
+        """Everything needed to resume this session between two lines of input"""
+        screen = self.screen
+        return {
+            "snapshot": self.game.save_snapshot(compress) if self.game is not None else None,
+            "seed": self.seed,
+            "lines": self.lines,
+            "delivered": self.delivered,
+            "actions": self.actions,
+            "cpu_time": self.cpu_time,
+            "screen": (screen.previous, screen.current, screen.synced, screen.size, screen.written),
+        }
+
+    @property
+    def store_key(self):
+        return f"{os.getpid()}:{id(self)}"
+
+    async def hibernate(self):
+        """Move an idle session's game to the server's store, freeing its memory.
+
+        Snapshotting and writing run in the loop's default executor; input
+        that arrives meanwhile waits on the storing lock, then wakes the session.
+        """
+        async with self.storing:
+            if self.busy or self.closed or self.hibernated or self.game is None:
+                return False
+            turn = self.game.turn
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(
+                None, lambda: self.server.store.save(self.store_key, self.state(compress=True)))
+            self.game = None
+            self.hibernated = (turn, stored)
+            return True
+
+    async def wake(self):
+        """Bring a hibernated session back before it handles input; call with storing held"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.restore(self.server.store.load(self.store_key)))
+        self.hibernated = None
+        await loop.run_in_executor(None, self.server.store.discard, self.store_key)
+
+    async def export(self):
+        """Detach an idle session so another worker can resume it; returns its state"""
+        async with self.storing:
+            if self.busy or self.closed:
+                return None
+            if self.hibernated:
+                await self.wake()
+            state = self.state()
+            self.closed = True
+            self.migrated = True
+            self.writer.close()
+            return state
+
+    def restore(self, state):
+        """Resume a session exported by another worker"""
+        if state["snapshot"] is not None:
+            self.game = Game.load_snapshot(state["snapshot"], io=IOBackend(CommandFeed()))
+        self.seed = state["seed"]
+        self.lines = state["lines"]
+        self.delivered = state["delivered"]
+        self.actions = state["actions"]
+        self.cpu_time = state["cpu_time"]
+        screen = self.screen
+        screen.previous, screen.current, screen.synced, screen.size, screen.written = state["screen"]
+
+    def stats(self):
+        """CPU and memory accounting for this session.
+
+        The state size is a snapshot's, measured again only every
+        STATE_SAMPLE_ACTIONS actions since pickling a game is not cheap.
+        """
+        game = self.game
+        if self.hibernated:
+            turn, state_bytes = self.hibernated
+        elif game is None:
+            turn, state_bytes = 0, 0
+        else:
+            turn = game.turn
+            sample = self.state_sample
+            if sample is None or self.actions - sample[0] >= self.STATE_SAMPLE_ACTIONS:
+                sample = self.state_sample = (self.actions, len(game.save_snapshot()))
+            state_bytes = sample[1]
+        return {
+            "peer": self.peer,
+            "turn": turn,
+            "hibernated": bool(self.hibernated),
+            "actions": self.actions,
+            "cpu_seconds": self.cpu_time,
+            "state_bytes": state_bytes,
+            "sent_chars": self.screen.written,
+            "idle_seconds": time.monotonic() - self.last_input,
+        }
+
+class GameServer:
+    """Hosts one Game per TCP connection (telnet or netcat) in a single asyncio loop.
+
+    Given a path it serves a UNIX socket instead, as a worker behind a
+    SessionDispatcher: every connection then starts with a header line,
+    "SESSION <key>" for a player or "CONTROL" for the dispatcher.
+    """
+    def __init__(self, host="127.0.0.1", port=2323, pacing="coalesced", pace_scale=0.5,
+                 columns=80, lines=24, max_sessions=None, log=print, path=None,
+                 hibernate_after=0, hibernate_path="cargo-sessions.db"):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.hibernate_after = hibernate_after  # Idle seconds before a session is hibernated; 0 never
+        self.hibernate_path = hibernate_path
+        self.store = None
+        self.pacing = pacing
+        self.pace_scale = pace_scale
+        self.columns = columns
+        self.lines = lines
+        self.max_sessions = max_sessions
+        self.log = log
+        self.sessions = []
+        self.imports = {}  # Exported session state waiting for its connection, by key
+
+    async def handle(self, reader, writer):
+        key = None
+        if self.path is not None:
+            header = (await reader.readline()).decode().split()
+            if header == ["CONTROL"]:
+                await self.control(reader, writer)
+                return
+            key = header[1]
+        if self.max_sessions is not None and len(self.sessions) >= self.max_sessions:
+            writer.write(b"Server full, try again later.\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        session = GameSession(self, reader, writer, key)
+        state = self.imports.pop(key, None)
+        if state is not None:
+            session.restore(state)
+        self.sessions.append(session)
+        self.log(f"Session {session.peer} {'resumed' if state else 'connected'} ({len(self.sessions)} active)")
+        try:
+            await session.run()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.remove(session)
+            self.log(f"Session {session.peer} {'migrated' if session.migrated else 'closed'} after "
+                     f"{session.actions} actions, {session.cpu_time:.2f}s CPU")
+
+    async def control(self, reader, writer):
+        """Answer a SessionDispatcher's requests until it disconnects"""
+        while True:
+            try:
+                request = await read_message(reader)
+            except asyncio.IncompleteReadError:
+                break
+            command = request[0]
+            if command == "export":
+                session = next((s for s in self.sessions if s.key == request[1]), None)
+                reply = await session.export() if session is not None else None
+            elif command == "import":
+                self.imports[request[1]] = request[2]
+                reply = True
+            elif command == "stats":
+                reply = self.stats()
+            else:
+                reply = None
+            write_message(writer, reply)
+            await writer.drain()
+
+    def stats(self):
+        """Per-session accounting for every connected captain"""
+        return [session.stats() for session in self.sessions]
+
+    async def hibernate_idle(self):
+        """Hibernate sessions that have waited for input for hibernate_after seconds"""
+        while True:
+            await asyncio.sleep(min(self.hibernate_after, 5))
+            now = time.monotonic()
+            for session in list(self.sessions):
+                if now - session.last_input >= self.hibernate_after:
+                    await session.hibernate()
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            for entry in self.stats():
+                self.log(f"{entry['peer']}: turn {entry['turn']}, {entry['actions']} actions, "
+                         f"{entry['cpu_seconds']:.2f}s CPU, {entry['state_bytes']} state bytes, "
+                         f"idle {entry['idle_seconds']:.0f}s")
+
+    async def serve(self, stats_interval=0):
+        if self.path is not None:
+            server = await asyncio.start_unix_server(self.handle, self.path)
+            self.log(f"Worker {os.getpid()} serving CARGO on {self.path}")
+        else:
+            server = await asyncio.start_server(self.handle, self.host, self.port)
+            self.port = server.sockets[0].getsockname()[1]
+            self.log(f"Serving CARGO on {self.host}:{self.port}")
+        tasks = []
+        if stats_interval:
+            tasks.append(asyncio.ensure_future(self.report(stats_interval)))
+        if self.hibernate_after:
+            self.store = HibernationStore(self.hibernate_path)
+            tasks.append(asyncio.ensure_future(self.hibernate_idle()))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.store is not None:
+                self.store.close()
+
+class ShardWorker:
+    """A GameServer process behind a SessionDispatcher"""
+    def __init__(self, index, path, process):
+        self.index = index
+        self.path = path
+        self.process = process
+        self.control = None  # (reader, writer) of the control connection
+        self.lock = asyncio.Lock()  # One control request at a time
+        self.connections = []
+
+    async def request(self, *message):
+        async with self.lock:
+            reader, writer = self.control
+            write_message(writer, message)
+            await writer.drain()
+            return await read_message(reader)
+
+class DispatchedConnection:
+    """A player's TCP connection forwarded to the worker hosting its session"""
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.worker = None
+        self.upstream = None  # (reader, writer) on the worker's socket
+        self.pump = None  # Task copying worker output to the player
+        self.lock = asyncio.Lock()  # Held while forwarding input or migrating
+        self.last_input = time.monotonic()
+        self.moving = False
+
+def _run_shard_worker(path, options):
+    """Process entry point for a SessionDispatcher worker"""
+    server = GameServer(path=path, **options)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+class SessionDispatcher:
+    """Accepts TCP connections and spreads their sessions over worker processes.
+
+    Each worker is a GameServer on a UNIX socket in its own process; player
+    bytes are forwarded both ways. New sessions go to the worker with the
+    fewest. When the workers drift apart, a session that has been idle for
+    migrate_after seconds is moved from the busiest worker to the least busy
+    one: the source exports it as a snapshot and the target resumes it, while
+    the player stays connected to the dispatcher.
+    """
+    def __init__(self, workers=2, host="127.0.0.1", port=2323, pacing="coalesced", pace_scale=0.5,
+                 columns=80, lines=24, max_sessions=None, migrate_after=300, log=print,
+                 hibernate_after=0, hibernate_path="cargo-sessions.db"):
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.options = {"pacing": pacing, "pace_scale": pace_scale, "columns": columns, "lines": lines,
+                        "hibernate_after": hibernate_after, "hibernate_path": hibernate_path}
+        self.max_sessions = max_sessions
+        self.migrate_after = migrate_after
+        self.log = log
+        self.workers = []
+        self.connections = []
+        self.next_key = 0
+        self.socket_directory = None  # Holds the workers' UNIX sockets; removed when serving ends
+
+    async def start_workers(self):
+        import multiprocessing
+        import tempfile
+        context = multiprocessing.get_context("spawn")
+        self.socket_directory = tempfile.mkdtemp(prefix="cargo-shards-")
+        for index in range(self.worker_count):
+            path = os.path.join(self.socket_directory, f"worker{index}.sock")
+            process = context.Process(target=_run_shard_worker, args=(path, self.options), daemon=True)
+            process.start()
+            self.workers.append(ShardWorker(index, path, process))
+        for worker in self.workers:
+            worker.control = await self.open(worker, "CONTROL")
+
+    async def open(self, worker, header):
+        """Connect to a worker's socket, waiting for it to come up"""
+        for attempt in range(200):
+            try:
+                reader, writer = await asyncio.open_unix_connection(worker.path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.05)
+        else:
+            raise RuntimeError(f"Worker {worker.index} did not start")
+        writer.write(f"{header}\n".encode())
+        await writer.drain()
+        return reader, writer
+
+    def least_loaded(self):
+        return min(self.workers, key=lambda worker: len(worker.connections))
+
+    async def attach(self, connection, worker):
+        """Forward a connection to the session hosted on worker"""
+        connection.upstream = await self.open(worker, f"SESSION {connection.key}")
+        connection.worker = worker
+        worker.connections.append(connection)
+        connection.pump = asyncio.ensure_future(self.forward_output(connection, *connection.upstream))
+
+    async def forward_output(self, connection, reader, writer):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                connection.writer.write(data)
+                await connection.writer.drain()
+        except ConnectionError:
+            pass
+        if not connection.moving:
+            connection.writer.close()  # The game ended or the worker went away
+
+    async def handle(self, reader, writer):
+        if self.max_sessions is not None and len(self.connections) >= self.max_sessions:
+            writer.write(b"Server full, try again later.\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        connection = DispatchedConnection(f"s{self.next_key}", reader, writer)
+        self.next_key += 1
+        self.connections.append(connection)
+        try:
+            await self.attach(connection, self.least_loaded())
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                connection.last_input = time.monotonic()
+                async with connection.lock:
+                    upstream = connection.upstream[1]
+                    upstream.write(data)
+                    await upstream.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.remove(connection)
+            if connection.worker is not None:
+                connection.worker.connections.remove(connection)
+                connection.upstream[1].close()
+            writer.close()
+
+    async def migrate(self, connection, target):
+        """Move an idle session to another worker; returns True if it moved"""
+        async with connection.lock:
+            source = connection.worker
+            connection.moving = True
+            state = await source.request("export", connection.key)
+            if state is None:
+                connection.moving = False
+                return False  # Busy, or already gone
+            await connection.pump  # The source closes its side once exported
+            source.connections.remove(connection)
+            connection.worker = None
+            await target.request("import", connection.key, state)
+            await self.attach(connection, target)
+            connection.moving = False
+        self.log(f"Session {connection.key} migrated from worker {source.index} to worker {target.index}")
+        return True
+
+    async def rebalance(self):
+        """Move idle sessions until no worker hosts two more than another"""
+        while True:
+            busiest = max(self.workers, key=lambda worker: len(worker.connections))
+            target = self.least_loaded()
+            if len(busiest.connections) - len(target.connections) < 2:
+                return
+            now = time.monotonic()
+            idle = [c for c in busiest.connections if now - c.last_input >= self.migrate_after]
+            if not idle or not await self.migrate(min(idle, key=lambda c: c.last_input), target):
+                return
+
+    async def balance(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            await self.rebalance()
+
+    async def stats(self):
+        """Per-session accounting gathered from every worker"""
+        entries = []
+        for worker in self.workers:
+            for entry in await worker.request("stats"):
+                entry["worker"] = worker.index
+                entries.append(entry)
+        return entries
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            for entry in await self.stats():
+                self.log(f"{entry['peer']} on worker {entry['worker']}: turn {entry['turn']}, "
+                         f"{entry['actions']} actions, {entry['cpu_seconds']:.2f}s CPU, "
+                         f"{entry['state_bytes']} state bytes, idle {entry['idle_seconds']:.0f}s")
+
+    async def serve(self, stats_interval=0, balance_interval=10):
+        tasks = []
+        try:
+            await self.start_workers()
+            server = await asyncio.start_server(self.handle, self.host, self.port)
+            self.port = server.sockets[0].getsockname()[1]
+            self.log(f"Dispatching CARGO on {self.host}:{self.port} to {len(self.workers)} workers")
+            tasks.append(asyncio.ensure_future(self.balance(balance_interval)))
+            if stats_interval:
+                tasks.append(asyncio.ensure_future(self.report(stats_interval)))
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for worker in self.workers:
+                worker.process.terminate()
+            for worker in self.workers:
+                worker.process.join()
+            if self.socket_directory is not None:
+                shutil.rmtree(self.socket_directory, ignore_errors=True)
+
 # Start the game
 if __name__ == "__main__":
-    game = Game()
-    game.play()
+    import argparse
+    parser = argparse.ArgumentParser(description="CARGO: Space Trading Saga")
+    parser.add_argument("--pacing", choices=PacingClock.MODES, default="realtime",
+                        help="how message pauses are paced")
+    parser.add_argument("--pace-scale", type=float, default=0.5,
+                        help="pause multiplier for accelerated pacing")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="root seed for a reproducible galaxy")
+    parser.add_argument("--lazy-markets", action="store_true",
+                        help="only evaluate markets of locations the player observes")
+    parser.add_argument("--load", metavar="PATH", default=None,
+                        help="resume a game saved with the 'save' command")
+    parser.add_argument("--autosave", metavar="BASE", default=None,
+                        help="keep BASE.sav plus a per-action BASE.journal")
+    parser.add_argument("--autosave-interval", type=int, default=50,
+                        help="actions between full autosave snapshots")
+    parser.add_argument("--resume", metavar="BASE", default=None,
+                        help="restore an autosaved session and keep autosaving it")
+    commands = parser.add_subparsers(dest="command")
+
+    simulate = commands.add_parser("simulate", help="run a batch of headless games")
+    simulate.add_argument("--games", type=int, default=1000)
+    simulate.add_argument("--policy", choices=sorted(SIMULATION_POLICIES), default="random")
+    simulate.add_argument("--script", nargs="+", default=None,
+                          help="command lines for the scripted policy, e.g. b,tech,max t,Beta e")
+    simulate.add_argument("--turns", type=int, default=200, help="turn limit per game")
+    simulate.add_argument("--difficulty", type=int, choices=[0, 1, 2], default=1)
+    simulate.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    simulate.add_argument("--chunk-size", type=int, default=8, help="games per worker task")
+    simulate.add_argument("--base-seed", type=int, default=0, help="seed of the first game")
+    simulate.add_argument("--jsonl", default=None, help="stream per-game summaries to this file")
+    simulate.add_argument("--progress", type=int, default=0, help="report progress every N games")
+    membench = commands.add_parser("membench", help="bytes per game object, slotted vs __dict__")
+    membench.add_argument("--count", type=int, default=10000, help="copies of each object to measure")
+
+    serve = commands.add_parser("serve", help="host games for telnet/netcat clients")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=2323)
+    serve.add_argument("--columns", type=int, default=80, help="terminal width assumed for clients")
+    serve.add_argument("--lines", type=int, default=24, help="terminal height assumed for clients")
+    serve.add_argument("--max-sessions", type=int, default=None)
+    serve.add_argument("--stats-interval", type=float, default=0,
+                       help="log per-session CPU and memory every N seconds")
+    serve.add_argument("--workers", type=int, default=1,
+                       help="worker processes to spread sessions over")
+    serve.add_argument("--migrate-after", type=float, default=300,
+                       help="idle seconds before a session may move to a less busy worker")
+    serve.add_argument("--hibernate-after", type=float, default=0,
+                       help="idle seconds before a session is moved out of memory (0: never)")
+    serve.add_argument("--hibernate-db", default="cargo-sessions.db",
+                       help="SQLite database holding hibernated sessions")
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        run_simulation_cli(args)
+    elif args.command == "membench":
+        print(f"{'Object':<18}{'__dict__':>10}{'slotted':>10}{'saved':>8}")
+        for name, before, after in memory_benchmark(args.count):
+            print(f"{name:<18}{before:>9.0f}B{after:>9.0f}B{1 - after / before:>8.0%}")
+    elif args.command == "serve":
+        if args.workers > 1:
+            server = SessionDispatcher(args.workers, args.host, args.port, args.pacing, args.pace_scale,
+                                       args.columns, args.lines, args.max_sessions, args.migrate_after,
+                                       hibernate_after=args.hibernate_after,
+                                       hibernate_path=args.hibernate_db)
+        else:
+            server = GameServer(args.host, args.port, args.pacing, args.pace_scale,
+                                args.columns, args.lines, args.max_sessions,
+                                hibernate_after=args.hibernate_after,
+                                hibernate_path=args.hibernate_db)
+        try:
+            asyncio.run(server.serve(args.stats_interval))
+        except KeyboardInterrupt:
+            pass
+    else:
+        terminal = TerminalIO(clock=PacingClock(args.pacing, args.pace_scale))
+        if args.resume:
+            game = Game.restore_session(args.resume, io=terminal)
+        elif args.load:
+            game = Game.load_game(args.load, io=terminal)
+        else:
+            game = Game(io=terminal, seed=args.seed, lazy_markets=args.lazy_markets)
+        autosave_base = args.autosave or args.resume
+        if autosave_base:
+            Autosave(autosave_base, args.autosave_interval).attach(game)
+        try:
+            game.play()
+        finally:
+            game.close()
+            terminal.screen.flush()
@@ -0,0 +1,848 @@
+import asyncio
+import io
+import os
+import pickle
+import random
+import re
+import sys
+import tempfile
+import threading
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cargo
+
+
+def discard(text):
+    pass
+
+
+def new_game(seed, feed=None, output_sink=None):
+    feed = feed if feed is not None else cargo.CommandFeed()
+    return cargo.Game(io=cargo.IOBackend(feed, output_sink=output_sink), difficulty=1,
+                      player_name="Test", seed=seed)
+
+
+def policy_states(seed, policy, actions, gating=True, after=None):
+    """State after each action of a policy-driven headless game; after(game) runs after each one"""
+    feed = cargo.CommandFeed()
+    game = cargo.Game(io=cargo.IOBackend(feed), difficulty=1, player_name="Autopilot", seed=seed)
+    game.events.gating = gating
+    player = cargo.SIMULATION_POLICIES[policy](game.random_streams.stream("policy"))
+    story = game.story_manager
+    states = []
+    for _ in range(actions):
+        feed.extend(player(game))
+        try:
+            game.play_turn()
+        except (SystemExit, cargo.InputExhausted):
+            break
+        feed.clear()
+        game.update_rank()
+        if after is not None:
+            after(game)
+        states.append((game.turn, game.ship.money, game.random_streams.checkpoint(), story.current_chapter,
+                       sorted(story.completed_chapters), sorted(story.completed_story_beats),
+                       story.plot_points, repr(story.story_states), sorted(game.unlocked_location_types),
+                       [(milestone.id, milestone.completion_turn) for chapter in story.chapters.values()
+                        for milestone in chapter.milestones.values() if milestone.completed],
+                       [quest.name for quest in game.quest_system.active_quests]))
+        if game.check_game_over():
+            break
+    return game, states
+
+
+class NullWriter:
+    """Connection writer for sessions driven without a socket"""
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def new_session(server, seed=5):
+    """A server session past game setup, waiting for its first command"""
+    session = cargo.GameSession(server, None, NullWriter(), key="test")
+    session.seed = seed
+    assert session.timed_attempt(cargo.SessionIO(["1", "Test"], session.layout)) is False
+    return session
+
+
+def send(session, *lines):
+    """Receive lines and attempt the current action; returns the attempt's events"""
+    session.lines += lines
+    attempt = cargo.SessionIO(session.lines, session.layout)
+    if session.timed_attempt(attempt) is not None:
+        session.lines = []
+    return attempt.events
+
+
+class DeterminismTest(unittest.TestCase):
+    """user-003: a seed fixes the whole game, and subsystem streams are independent"""
+
+    def summary(self, seed, policy):
+        summary = cargo.play_headless_game(seed, policy, max_turns=80)
+        del summary["seconds"]
+        return summary
+
+    def test_same_seed_same_game(self):
+        for seed in range(3):
+            for policy in ("random", "trader"):
+                with self.subTest(seed=seed, policy=policy):
+                    self.assertEqual(self.summary(seed, policy), self.summary(seed, policy))
+
+    def test_same_seed_same_streams(self):
+        first, second = new_game(4), new_game(4)
+        for game in (first, second):
+            game.io.input_provider.extend(["e"] * 5)
+            for _ in range(5):
+                game.play_turn()
+        self.assertEqual(first.random_streams.checkpoint(), second.random_streams.checkpoint())
+        self.assertNotEqual(new_game(5).random_streams.checkpoint(), new_game(4).random_streams.checkpoint())
+
+    def test_streams_are_independent(self):
+        busy, quiet = cargo.RandomStreams(7), cargo.RandomStreams(7)
+        for _ in range(10):
+            busy.stream("events").random()
+        self.assertEqual(busy.stream("market").random(), quiet.stream("market").random())
+
+
+class EventGatingTest(unittest.TestCase):
+    """user-014: skipping checks whose topics did not change plays exactly like polling them all"""
+
+    def test_gated_matches_polled(self):
+        for policy in ("random", "trader", "planner"):
+            for seed in range(3):
+                with self.subTest(policy=policy, seed=seed):
+                    gated = policy_states(seed, policy, 150)[1]
+                    polled = policy_states(seed, policy, 150, gating=False)[1]
+                    self.assertEqual(gated, polled)
+
+    def test_changed_tracks_each_key(self):
+        events = cargo.EventBus()
+        topics = (cargo.EVENT_MONEY, cargo.EVENT_CARGO)
+        self.assertTrue(events.changed("a", topics))
+        self.assertFalse(events.changed("a", topics))
+        events.publish(cargo.EVENT_TRADE)
+        self.assertFalse(events.changed("a", topics))
+        events.publish(cargo.EVENT_CARGO)
+        self.assertTrue(events.changed("a", topics))
+        self.assertTrue(events.changed("b", topics))
+        self.assertFalse(events.changed("a", topics))
+
+
+class RequirementPredicateTest(unittest.TestCase):
+    """user-015: cached requirement predicates agree with evaluating the requirements afresh"""
+
+    def test_cached_matches_fresh(self):
+        def compare(game):
+            # The predicates play evaluates: the current chapter and its milestones
+            story = game.story_manager
+            chapter = story.chapters[story.current_chapter]
+            for owner in [chapter, *chapter.milestones.values()]:
+                fresh = cargo.RequirementPredicate(owner.requirements, game)
+                self.assertEqual(owner.predicate(game), fresh(game), owner.id)
+        for policy in ("random", "trader"):
+            with self.subTest(policy=policy):
+                policy_states(1, policy, 120, after=compare)
+
+    def test_unknown_requirements_never_met(self):
+        game = new_game(1)
+        predicate = cargo.MilestoneRequirements.compile({"money": 0, "moon_phase": 3}, game)
+        self.assertEqual(predicate.problems, ["Unknown requirement type moon_phase"])
+        self.assertFalse(predicate(game))
+        self.assertEqual(predicate.unmet(game), ["moon_phase"])
+
+
+class GalaxyIndexTest(unittest.TestCase):
+    """user-016: the incremental galaxy counts match a full rescan of the locations"""
+
+    def assertMatchesRescan(self, game):
+        index = game.galaxy()
+        buildings, platforms, types = {}, {}, {}
+        for location in game.locations:
+            types[location.location_type] = types.get(location.location_type, 0) + 1
+            for building in location.buildings:
+                buildings[building] = buildings.get(building, 0) + 1
+            for platform in location.mining_platforms:
+                platforms[platform["type"]] = platforms.get(platform["type"], 0) + 1
+        for name in set(buildings) | set(index.buildings):
+            self.assertEqual(index.count_buildings(name), buildings.get(name, 0), name)
+        for resource in set(platforms) | set(index.platforms):
+            self.assertEqual(index.count_platforms(resource), platforms.get(resource, 0), resource)
+        for location_type in set(types) | set(index.location_types):
+            self.assertEqual(index.count_locations(location_type), types.get(location_type, 0), location_type)
+        self.assertEqual(index.count_buildings(), sum(buildings.values()))
+        self.assertEqual(index.count_platforms(), sum(platforms.values()))
+        guild, agrobot = index.UPRISING_BUILDINGS
+        self.assertEqual(index.uprising_sites(),
+                         [(location, location.count_buildings(guild), location.count_buildings(agrobot))
+                          for location in game.locations
+                          if max(location.count_buildings(guild), location.count_buildings(agrobot))
+                          >= index.UPRISING_THRESHOLD])
+
+    def test_counts_follow_changes(self):
+        game = new_game(1, output_sink=discard)
+        alpha, beta = game.locations[0], game.locations[1]
+        self.assertMatchesRescan(game)
+        for _ in range(4):
+            alpha.add_building("Neuroengineering Guild")
+        beta.add_building("Refinery")
+        beta.add_mining_platform(cargo.MiningPlatform("fuel", 50, 100))
+        self.assertMatchesRescan(game)
+        alpha.remove_building(0)
+        game.unlock_location_type("AsteroidBase")
+        game.locations[-1].add_building("Refinery")
+        self.assertMatchesRescan(game)
+        game.locations.remove(beta)
+        game.events.publish(cargo.EVENT_DISCOVERY)
+        self.assertMatchesRescan(game)
+
+
+class LayoutCacheTest(unittest.TestCase):
+    """user-019: cached layouts render exactly like fresh ones, and a resize is picked up"""
+
+    def render(self, game):
+        content = [["Location", "Tech", "Agri"], ["Alpha", "50", "65"], ["Beta", "1.2K", "BAN"]]
+        text = "A long line of cantina gossip that has to wrap across several rows of the box. " * 3
+        return (game.create_box(content), game.create_wide_box(content), game.create_simple_box([text, "Done"]),
+                game.word_wrap(text))
+
+    def test_cached_matches_fresh(self):
+        game = new_game(1, output_sink=discard)
+        size = [100]
+        layout = cargo.TerminalLayout(size=lambda: os.terminal_size((size[0], 30)))
+        game.io.layout = layout
+        for width in (100, 100, 60, 60, 100):
+            if width != size[0]:
+                size[0] = width
+                layout.stale = True  # As the SIGWINCH handler does
+            cached = self.render(game)
+            game.io.layout = cargo.TerminalLayout(size=lambda: os.terminal_size((width, 30)))
+            with self.subTest(width=width):
+                self.assertEqual(cached, self.render(game))
+                self.assertEqual(len(cached[0].splitlines()[0]), width - 2)  # Boxes leave a two-column margin
+            game.io.layout = layout
+        self.assertTrue(layout.column_cache and layout.wrap_cache and layout.border_cache)
+
+
+class FakeTerminal(io.StringIO):
+    """Stream that claims to be a terminal; screen() replays what was written to it"""
+
+    def isatty(self):
+        return True
+
+    def screen(self):
+        rows, row, col = {}, 0, 0
+        for token in re.split(r'(\x1b\[[0-9;]*[A-Za-z]|\n)', self.getvalue()):
+            if token == '\n':
+                row, col = row + 1, 0
+            elif token.startswith('\x1b['):
+                code, args = token[-1], token[2:-1]
+                if code == 'H':
+                    row, col = [int(n) - 1 for n in args.split(';')] if args else (0, 0)
+                elif code == 'K':
+                    rows[row] = rows.get(row, '')[:col]
+                elif code == 'J' and args == '2':
+                    rows = {}
+                elif code == 'J':
+                    rows = {r: text for r, text in rows.items() if r < row}
+                    rows[row] = rows.get(row, '')[:col]
+            elif token:
+                text = rows.get(row, '').ljust(col)
+                rows[row] = text[:col] + token + text[col + len(token):]
+                col += len(token)
+        last = max((r for r, text in rows.items() if text), default=-1)
+        return [rows.get(r, '') for r in range(last + 1)]
+
+
+class FrameRendererTest(unittest.TestCase):
+    """user-020: the screen left by diffed redraws is the last frame, and pipes get plain lines"""
+
+    frames = [["Cargo", "Location: Alpha", "Credits: 100", "Tech 50"],
+              ["Cargo", "Location: Alpha", "Credits: 140", "Tech 55", "Agri 60"],
+              ["Cargo", "Location: Beta"],
+              ["Cargo", "Location: Beta"],
+              ["Travel log", "", "Location: Gamma", "Credits: 90"]]
+
+    def test_screen_matches_last_frame(self):
+        stream = FakeTerminal()
+        renderer = cargo.FrameRenderer(stream, cargo.TerminalLayout(size=lambda: os.terminal_size((40, 12))))
+        previous = None
+        for frame in self.frames:
+            before = renderer.written
+            renderer.clear()
+            for line in frame:
+                renderer(line)
+            renderer.settle()
+            with self.subTest(frame=frame):
+                self.assertEqual([row.rstrip() for row in stream.screen()], frame)
+                if frame == previous:
+                    self.assertEqual(renderer.written, before)  # Nothing changed, nothing sent
+            previous = frame
+
+    def test_overflowing_frame_scrolls(self):
+        stream = FakeTerminal()
+        renderer = cargo.FrameRenderer(stream, cargo.TerminalLayout(size=lambda: os.terminal_size((40, 4))))
+        renderer.clear()
+        renderer("\n".join(f"Row {n}" for n in range(8)))
+        renderer.settle()
+        renderer.clear()
+        renderer("Fits")
+        renderer.settle()
+        self.assertEqual([row.rstrip() for row in stream.screen()], ["Fits"])
+
+    def test_pipe_gets_plain_lines(self):
+        stream = io.StringIO()
+        renderer = cargo.FrameRenderer(stream, cargo.TerminalLayout(size=lambda: os.terminal_size((40, 12))))
+        for frame in self.frames:
+            renderer.clear()
+            for line in frame:
+                renderer(line)
+            renderer.settle()
+        self.assertEqual(stream.getvalue(), "".join(line + "\n" for frame in self.frames for line in frame))
+
+
+class MarketTickTest(unittest.TestCase):
+    """user-006: the galaxy tick moves each row as ticking it alone would, and play never ticks"""
+
+    def test_galaxy_tick_matches_row_ticks(self):
+        galaxy, rows = new_game(2), new_game(2)
+        for _ in range(20):
+            galaxy.market_engine.tick(1)
+            for location in rows.locations:
+                location.update_market(1)
+        self.assertEqual([dict(location.market) for location in galaxy.locations],
+                         [dict(location.market) for location in rows.locations])
+
+    def test_end_turn_only_moves_the_clock(self):
+        game = new_game(2)
+        before = list(game.market_engine.prices)
+        game.io.input_provider.extend(["e"] * 3)
+        for _ in range(3):
+            game.play_turn()
+        self.assertEqual(game.market_engine.turn, 3)
+        self.assertEqual(game.market_engine.prices, before)
+        self.assertEqual(len(game.current_location.market_history("tech")), 4)
+
+
+class LazyMarketTest(unittest.TestCase):
+    """user-007: a lazy market caught up when it is read matches one ticked every turn"""
+
+    def markets(self, lazy, seed, platform=False, psychodynamics=False):
+        game = cargo.Game(io=cargo.IOBackend(cargo.CommandFeed()), difficulty=1, player_name="Test",
+                          seed=seed, lazy_markets=lazy)
+        if psychodynamics:  # Manipulation rolls run after every tick
+            game.research.unlocked_options.add("psychodynamics")
+        if platform:  # Mining makes catch-up replay turn by turn
+            planet = game.locations.of_type("Planet")[0]
+            planet.add_mining_platform(cargo.MiningPlatform("salt", 80, 150))
+        for turn in range(30):
+            game.advance_turn()
+            game.update_market_prices()
+            if turn == 10:
+                game.locations[-1].market["tech"]
+        return [(location.name, dict(location.market), location.market_history("agri"))
+                for location in game.locations]
+
+    def test_lazy_matches_eager(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertEqual(self.markets(True, seed), self.markets(False, seed))
+
+    def test_lazy_matches_eager_with_mining(self):
+        self.assertEqual(self.markets(True, 1, platform=True), self.markets(False, 1, platform=True))
+
+    def test_lazy_matches_eager_with_psychodynamics(self):
+        self.assertEqual(self.markets(True, 1, psychodynamics=True), self.markets(False, 1, psychodynamics=True))
+
+    def test_played_turns_leave_unread_markets_behind(self):
+        game = cargo.Game(io=cargo.IOBackend(cargo.CommandFeed()), difficulty=1, player_name="Test",
+                          seed=2, lazy_markets=True)
+        game.io.input_provider.extend(["e"] * 5)
+        for _ in range(5):
+            game.play_turn()
+        engine = game.market_engine
+        far = next(location for location in game.locations if location is not game.current_location)
+        self.assertEqual(engine.turn, game.turn)
+        self.assertEqual(engine.behind(game.current_location.market_row), 0)
+        self.assertEqual(engine.behind(far.market_row), 5)
+        far.market["agri"]
+        self.assertEqual(engine.behind(far.market_row), 0)
+
+
+class MarketHistoryTest(unittest.TestCase):
+    """user-008: every played turn opens a history sample that collects that turn's trades"""
+
+    def test_samples_follow_played_turns(self):
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                feed = cargo.CommandFeed()
+                game = cargo.Game(io=cargo.IOBackend(feed), difficulty=1, player_name="Test",
+                                  seed=3, lazy_markets=lazy)
+                for _ in range(6):
+                    for commands in (["b", "tech", "5"], ["e"]):
+                        feed.extend(commands)
+                        game.play_turn()
+                        feed.clear()
+                location = game.current_location
+                self.assertEqual([turn for turn, price in location.market_history("tech")], list(range(7)))
+                self.assertEqual(location.market_history("tech", "volume"),
+                                 [(turn, 5.0) for turn in range(6)] + [(6, 0.0)])
+                self.assertEqual(location.market_stats("tech", window=3)["samples"], 3)
+
+
+class RoutePlannerTest(unittest.TestCase):
+    """user-009: the planner's value tables match enumerating every route"""
+
+    def brute_force(self, terms, name, hops):
+        if hops == 0:
+            return 1.0
+        best = self.brute_force(terms, name, hops - 1)  # Stay put
+        for destination in terms:
+            if destination == name:
+                continue
+            onward = self.brute_force(terms, destination, hops - 1)
+            best = max(best, onward)  # Travel empty
+            buy, sell = terms[name][0], terms[destination][1]
+            for commodity, cost in buy.items():
+                if commodity in sell:
+                    best = max(best, sell[commodity] / cost * onward)
+        return best
+
+    def test_tables_match_enumeration(self):
+        game = new_game(6)
+        planets = game.locations.of_type("Planet")[:4]
+        prices = random.Random(6)
+        planner = game.route_planner
+        for trial in range(20):
+            for location in planets:
+                location.market["tech"] = prices.randint(10, 200)
+                location.market["agri"] = prices.randint(10, 200)
+            tables = planner.value_tables(planets, 3)
+            for hops in range(4):
+                for location in planets:
+                    with self.subTest(trial=trial, hops=hops, location=location.name):
+                        self.assertAlmostEqual(tables[hops][location.name][0],
+                                               self.brute_force(planner.cache_terms, location.name, hops))
+
+
+class SnapshotTest(unittest.TestCase):
+    """user-010: snapshots restore a game that plays on identically, and load nothing else"""
+
+    def play(self, game, feed, actions):
+        for commands in actions:
+            feed.extend(commands)
+            game.replay_action()
+            feed.clear()
+
+    def state(self, game):
+        return (game.turn, game.ship.money, dict(game.ship.cargo), game.current_location.name,
+                dict(game.current_location.market), game.random_streams.checkpoint())
+
+    def test_round_trip_plays_on_identically(self):
+        feed = cargo.CommandFeed(max_idle_reads=1000)
+        game = new_game(8, feed)
+        self.play(game, feed, [["b", "tech", "max"], ["e"], ["t", game.locations[1].name], ["e"]])
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                restored_feed = cargo.CommandFeed(max_idle_reads=1000)
+                restored = cargo.Game.load_snapshot(game.save_snapshot(compress), io=cargo.IOBackend(restored_feed))
+                self.assertEqual(self.state(restored), self.state(game))
+                original = game.fork()
+                original_feed = original.io.input_provider
+                later = [["s", "tech", "max"], ["e"], ["e"]]
+                self.play(original, original_feed, later)
+                self.play(restored, restored_feed, later)
+                self.assertEqual(self.state(restored), self.state(original))
+
+    def test_damaged_snapshots_rejected(self):
+        data = new_game(8).save_snapshot()
+        magic, version, flags, checksum = cargo.SNAPSHOT_HEADER.unpack_from(data)
+        payload = data[cargo.SNAPSHOT_HEADER.size:]
+        damaged = [
+            data[:10],
+            cargo.SNAPSHOT_HEADER.pack(b"NOTCARGO", version, flags, checksum) + payload,
+            cargo.SNAPSHOT_HEADER.pack(magic, version - 1, flags, checksum) + payload,
+            data[:-1] + bytes([data[-1] ^ 1]),
+        ]
+        for blob in damaged:
+            with self.assertRaises(cargo.SnapshotError):
+                cargo.Game.load_snapshot(blob)
+
+    def test_unlisted_globals_rejected(self):
+        def snapshot_of(module, name):
+            payload = (b"\x80\x04" + pickle.dumps(module, 4)[2:-1] + b"\x94" + pickle.dumps(name, 4)[2:-1]
+                       + b"\x94\x93.")
+            return cargo.SNAPSHOT_HEADER.pack(cargo.SNAPSHOT_MAGIC, cargo.SNAPSHOT_VERSION, 0,
+                                              zlib.crc32(payload)) + payload
+        for module, name in [("os", "system"), ("builtins", "eval"), ("builtins", "getattr"),
+                             ("cargo", "os"), ("cargo", "Game.save_game"), ("cargo", "TurnJournal"),
+                             ("cargo", "Game.__class__"), ("importlib", "import_module")]:
+            with self.subTest(f"{module}.{name}"):
+                with self.assertRaises(cargo.SnapshotError):
+                    cargo.Game.load_snapshot(snapshot_of(module, name))
+
+
+class ForkTest(unittest.TestCase):
+    """user-012: forks share static content, play like the original and never write back to it"""
+
+    def setUp(self):
+        self.game, observation = cargo.Game.reset(seed=4)
+        self.assertEqual(observation, self.game.observe())
+        for _ in range(10):
+            self.game.step("end")
+
+    def test_fork_plays_like_original(self):
+        fork = self.game.fork()
+        self.assertEqual(fork.observe(), self.game.observe())
+        actions = ["end", ("buy", "tech", 5), "end", ("sell", "tech", 5)] * 3
+        self.assertEqual([fork.step(action)[:3] for action in actions],
+                         [self.game.step(action)[:3] for action in actions])
+
+    def test_fork_changes_stay_in_fork(self):
+        game = self.game
+        before = game.save_snapshot()
+        fork = game.fork()
+        self.assertIs(fork.shop.location_equipment, game.shop.location_equipment)
+        self.assertIsNot(fork.market_engine, game.market_engine)
+        for _ in range(10):
+            fork.step("end")
+        fork.ship.money += 10 ** 6
+        fork.current_location.market["tech"] = 1
+        fork.known_locations.append("Nowhere")
+        fork.shop.add_new_item("Test Widget", 100, "Only in the fork")
+        self.assertEqual(game.save_snapshot(), before)
+        self.assertNotIn("Test Widget", game.shop.base_equipment)
+        self.assertIsNot(fork.random_streams.stream("events"), game.random_streams.stream("events"))
+
+
+class JournalResumeTest(unittest.TestCase):
+    """user-011: an autosaved session resumes to the same state"""
+
+    def play_and_restore(self, actions, output_sink=None, interval=50):
+        with tempfile.TemporaryDirectory() as directory:
+            base = os.path.join(directory, "session")
+            feed = cargo.CommandFeed(max_idle_reads=1000)
+            game = new_game(5, feed, output_sink)
+            autosave = cargo.Autosave(base, interval)
+            autosave.attach(game)
+            for commands in actions:
+                feed.extend(commands)
+                game.replay_action()
+                feed.clear()
+                autosave.checkpoint(game)
+            autosave.close()
+            restored = cargo.Game.restore_session(base, io=cargo.IOBackend(cargo.CommandFeed()))
+        self.assertEqual((restored.turn, restored.ship.money, restored.random_streams.checkpoint()),
+                         (game.turn, game.ship.money, game.random_streams.checkpoint()))
+
+    def test_resume_after_info_screen(self):
+        # The info screen waits for Enter when rendering; replay must read that line too
+        self.play_and_restore([["i", ""], ["b", "tech", "5"], ["e"]], output_sink=discard)
+
+    def test_resume_headless(self):
+        self.play_and_restore([["b", "tech", "5"], ["e"], ["e"]])
+
+    def test_resume_across_snapshot_rotation(self):
+        self.play_and_restore([["i", ""], ["b", "tech", "5"]] + [["e"]] * 10, output_sink=discard, interval=5)
+
+
+class ServerSessionTest(unittest.TestCase):
+    """user-021: server sessions replay actions without garbling or stalling"""
+
+    def test_attempts_extend_earlier_output(self):
+        # Each attempt must repeat what the player was already sent, navigator advice included
+        session = new_session(cargo.GameServer(port=0, log=discard))
+        waiting = cargo.SessionIO(["c", "n"], session.layout)
+        self.assertIsNone(session.timed_attempt(waiting))
+        finished = cargo.SessionIO(["c", "n", "back"], session.layout)
+        self.assertFalse(session.timed_attempt(finished))
+        self.assertEqual(finished.events[:len(waiting.events)], waiting.events)
+
+    def test_blocked_session_does_not_hold_up_others(self):
+        # One session's attempt blocks in the executor until released; the
+        # other must get its line played and delivered in the meantime
+        server = cargo.GameServer(port=0, pacing="zero", log=discard)
+        slow, quick = new_session(server), new_session(server)
+        entered, release = threading.Event(), threading.Event()
+        attempt = slow.attempt
+
+        def blocked_attempt(io):
+            entered.set()
+            release.wait(10)
+            return attempt(io)
+        slow.attempt = blocked_attempt
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            slow.lines.append("c")
+            quick.lines.append("c")
+            blocked = asyncio.ensure_future(slow.advance())
+            self.assertTrue(await loop.run_in_executor(None, entered.wait, 10))
+            await asyncio.wait_for(quick.advance(), 10)
+            finished_while_blocked = not blocked.done() and slow.busy
+            release.set()
+            await asyncio.wait_for(blocked, 10)
+            return finished_while_blocked
+
+        try:
+            self.assertTrue(asyncio.run(scenario()))
+        finally:
+            release.set()
+        self.assertEqual((slow.lines, slow.delivered), (quick.lines, quick.delivered))
+        self.assertGreater(quick.delivered, 0)
+
+
+class MigrationTest(unittest.TestCase):
+    """user-022: a session exported mid-action resumes on another worker as if never moved"""
+
+    def test_exported_session_resumes(self):
+        server = cargo.GameServer(port=0, log=discard)
+        moved, stayed = new_session(server), new_session(server)
+        for session in (moved, stayed):
+            send(session, "c")
+        state = asyncio.run(moved.export())
+        self.assertTrue(moved.closed and moved.migrated)
+        resumed = cargo.GameSession(server, None, NullWriter(), key="test")
+        message = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)  # As sent over a control connection
+        resumed.restore(cargo.SnapshotUnpickler(io.BytesIO(message)).load())
+        self.assertEqual(send(resumed, "n", "back"), send(stayed, "n", "back"))
+        self.assertEqual(resumed.game.random_streams.checkpoint(), stayed.game.random_streams.checkpoint())
+
+    def test_busy_session_is_not_exported(self):
+        session = new_session(cargo.GameServer(port=0, log=discard))
+        session.busy = True
+        self.assertIsNone(asyncio.run(session.export()))
+        self.assertFalse(session.closed)
+
+
+class HibernationTest(unittest.TestCase):
+    """user-023: a hibernated session frees its game and wakes to the same state"""
+
+    def test_hibernate_and_wake(self):
+        with tempfile.TemporaryDirectory() as directory:
+            server = cargo.GameServer(port=0, log=discard)
+            server.store = cargo.HibernationStore(os.path.join(directory, "sessions.db"))
+            try:
+                sleeper, twin = new_session(server), new_session(server)
+                for session in (sleeper, twin):
+                    send(session, "c")
+                self.assertTrue(asyncio.run(sleeper.hibernate()))
+                self.assertIsNone(sleeper.game)
+                stats = sleeper.stats()
+                self.assertTrue(stats["hibernated"])
+                self.assertGreater(stats["state_bytes"], 0)
+                self.assertFalse(asyncio.run(sleeper.hibernate()))
+                asyncio.run(sleeper.wake())
+                self.assertEqual(send(sleeper, "n", "back"), send(twin, "n", "back"))
+                self.assertEqual(sleeper.game.random_streams.checkpoint(), twin.game.random_streams.checkpoint())
+                with self.assertRaises(cargo.SnapshotError):
+                    server.store.load(sleeper.store_key)  # Once restored, the row is gone
+            finally:
+                server.store.close()
+
+    def test_failed_wake_keeps_the_row(self):
+        with tempfile.TemporaryDirectory() as directory:
+            server = cargo.GameServer(port=0, log=discard)
+            server.store = cargo.HibernationStore(os.path.join(directory, "sessions.db"))
+            try:
+                sleeper = new_session(server)
+                self.assertTrue(asyncio.run(sleeper.hibernate()))
+                def corrupt(state):
+                    raise cargo.SnapshotError("corrupt snapshot")
+                sleeper.restore = corrupt
+                with self.assertRaises(cargo.SnapshotError):
+                    asyncio.run(sleeper.wake())
+                self.assertTrue(sleeper.hibernated)
+                self.assertIsNotNone(server.store.load(sleeper.store_key))
+            finally:
+                server.store.close()
+
+    def test_orphaned_rows_are_cleared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.db")
+            store = cargo.HibernationStore(path)
+            live = f"{os.getppid()}:1"
+            for key in ("999999999:1", f"{os.getpid()}:1", live):  # A dead process, a previous run, a sibling
+                store.save(key, {"turn": 1})
+            store.close()
+            store = cargo.HibernationStore(path)
+            try:
+                self.assertEqual(store.load(live), {"turn": 1})
+                for key in ("999999999:1", f"{os.getpid()}:1"):
+                    with self.assertRaises(cargo.SnapshotError):
+                        store.load(key)
+            finally:
+                store.close()
+
+
+class NavigatorTest(unittest.TestCase):
+    """user-013: the navigator reuses its pool and tree, and counts crashed rollouts"""
+
+    def test_tree_follows_typed_action(self):
+        feed = cargo.CommandFeed(max_idle_reads=1000)
+        game = new_game(3, feed, discard)
+        navigator = game.navigator
+        navigator.advise(workers=1, iterations=60)  # Enough to expand every first action
+        navigator.follow(["c", "n", "back"])  # The consult itself moves nothing
+        self.assertTrue(navigator.trees)
+        feed.extend(["buy", "Tech", "max", ""])
+        typed = []
+        game.io.recorder = typed.append
+        game.play_turn()
+        navigator.follow(typed)
+        self.assertEqual(navigator.tree_key, navigator.state_key(game))
+        self.assertGreater(navigator.trees[0].visits, 0)
+
+    def test_pool_kept_between_consults(self):
+        game = new_game(3)
+        navigator = game.navigator
+        try:
+            navigator.advise(workers=2, iterations=10)
+            pool = navigator.pool
+            navigator.advise(workers=2, iterations=10)
+            self.assertIs(navigator.pool, pool)
+            self.assertIsNone(game.fork().navigator.pool)
+        finally:
+            game.close()
+        self.assertIsNone(navigator.pool)
+
+    def test_crashed_rollouts_are_counted(self):
+        game = new_game(3)
+        score = cargo.Game.calculate_final_score
+        def broken(self):
+            raise KeyError("bug")
+        cargo.Game.calculate_final_score = broken
+        try:
+            advice = game.navigator.advise(workers=1, iterations=20)
+        finally:
+            cargo.Game.calculate_final_score = score
+        self.assertEqual(advice["failures"], 20)
+
+
+class SlottedObjectTest(unittest.TestCase):
+    """user-024: every class membench reports is smaller slotted than in __dict__ form"""
+
+    def test_slots_save_memory(self):
+        for name, before, after in cargo.memory_benchmark(500):
+            with self.subTest(name):
+                self.assertLess(after, before)
+
+    def test_built_platform_is_slotted(self):
+        feed = cargo.CommandFeed()
+        game = new_game(1, feed, discard)
+        location = game.current_location
+        location.mineral_deposits = {"salt": 2}
+        game.ship.money = 20000
+        feed.extend(["m", "build", "salt"])
+        game.play_turn()
+        platform, = location.mining_platforms
+        self.assertIsInstance(platform, cargo.MiningPlatform)
+        self.assertEqual((platform["type"], platform.resource_type), ("salt", "salt"))
+        self.assertEqual(game.format_market_content([location])[1][3], "S")
+        # Transport missions read platforms by attribute
+        platform.set_deposit(150)
+        refinery = next(planet for planet in game.locations if planet is not location)
+        refinery.add_building("Refinery")
+        self.assertIsNotNone(game.resource_transport.generate_transport_mission())
+
+
+class LocationIndexTest(unittest.TestCase):
+    """user-017: the location registries keep their indexes through every list mutator"""
+
+    def assertIndexed(self, registry):
+        self.assertEqual(registry.by_name, {location.name.lower(): location for location in reversed(registry)})
+        for location_type, bucket in registry.by_type.items():
+            self.assertEqual(bucket, [location for location in registry if location.location_type == location_type])
+        for location in registry:
+            self.assertIs(registry.at(location.handle), location)
+
+    def test_registry_mutators(self):
+        game = new_game(1)
+        registry = game.locations
+        first, second = registry[0], registry[1]
+        registry.remove(first)
+        self.assertIsNone(registry.get(first.name))
+        self.assertIs(registry.at(first.handle), first)  # Handles stay valid
+        registry.insert(0, first)
+        self.assertIs(registry.get(first.name), first)
+        registry[1] = registry.pop()
+        self.assertIsNone(registry.get(second.name))
+        registry[2:4] = [second]
+        del registry[-1]
+        registry.sort(key=lambda location: location.name)
+        self.assertIndexed(registry)
+        registry.clear()
+        self.assertEqual((registry.by_name, registry.by_type), ({}, {}))
+
+    def test_game_state_keys_on_handles(self):
+        """user-018: passengers carry integer handles that survive snapshots"""
+        game = new_game(2)
+        for location in game.locations.of_type("Planet"):
+            if location.name not in game.known_locations:
+                game.known_locations.append(location.name)
+        here = game.current_location
+        port = game.port_system
+        port.update_passengers(here.handle)
+        waiting = port.waiting_passengers[here.handle]
+        self.assertTrue(waiting)
+        for passenger in waiting:
+            self.assertIsInstance(passenger.destination, int)
+            self.assertIn(game.location_name(passenger.destination), game.known_locations)
+            self.assertNotEqual(passenger.destination, here.handle)
+        self.assertEqual(game.locations.handles_of([here.name.upper()]), [here.handle])
+        restored = cargo.Game.load_snapshot(game.save_snapshot(), io=cargo.IOBackend(cargo.CommandFeed()))
+        self.assertEqual([restored.location_name(passenger.destination)
+                          for passenger in restored.port_system.waiting_passengers[here.handle]],
+                         [game.location_name(passenger.destination) for passenger in waiting])
+        self.assertIs(restored.locations.at(here.handle), restored.current_location)
+
+    def test_known_locations_mutators(self):
+        known = cargo.KnownLocations(["Alpha", "Beta"])
+        known.insert(0, "Gamma")
+        known.remove("Alpha")
+        known[0] = "Delta"
+        self.assertEqual(known.pop(), "Beta")
+        self.assertNotIn("Gamma", known)
+        self.assertIn("Delta", known)
+        known[:] = ["Epsilon"]
+        self.assertEqual(known.names, {"Epsilon"})
+        known.clear()
+        self.assertNotIn("Epsilon", known)
+
+
+class SharedContentTest(unittest.TestCase):
+    """user-025: games share one frozen copy of each content table, and changes stay private"""
+
+    def test_tables_are_shared_and_frozen(self):
+        first, second = new_game(1), new_game(2)
+        self.assertIs(first.shop.base_equipment, second.shop.base_equipment)
+        self.assertIs(first.shop.location_equipment, cargo.content_table("shop_location_equipment"))
+        table = first.shop.base_equipment
+        item = next(iter(table))
+        with self.assertRaises(TypeError):
+            table["Free lunch"] = {"price": 0, "description": "Not for sale"}
+        with self.assertRaises(TypeError):
+            table[item]["price"] = 0
+
+    def test_owned_copy_is_private(self):
+        first, second = new_game(1), new_game(2)
+        shared = second.shop.base_equipment
+        before = cargo.thaw_content(shared)
+        first.shop.add_new_item("Free lunch", 0, "Not for sale")
+        first.shop.remove_item(next(iter(before)))
+        self.assertIn("Free lunch", first.shop.base_equipment)
+        self.assertIs(second.shop.base_equipment, shared)
+        self.assertIs(cargo.content_table("shop_base_equipment"), shared)
+        self.assertEqual(cargo.thaw_content(shared), before)
+
+
+if __name__ == "__main__":
+    unittest.main()